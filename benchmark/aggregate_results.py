@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+
+"""
+Collect the per-instance 'summary.txt' files from a downloaded Work
+Requirement directory tree into a single typed table, add the statistics of
+the repeated benchmark trials and the latency metrics from the result records
+in the accompanying 'results.jsonl' files, add the instance prices, and write
+it out as CSV and (if 'pyarrow' is available) Parquet. The points of the
+sweeps in the result records, e.g., latency by working set size, are written
+to a separate CSV file. So are the system samples taken during each
+instance's run, and its phase timings, with the mean of each sample metric
+(e.g., CPU utilisation and frequency) during each phase. Any benchmark Tasks
+that were skipped, as repeated runs on the same node, are reported.
+- First command line parameter is the directory to search for summary files.
+- Second command line parameter is the pathname of the summary CSV file. The
+  Parquet file is written alongside it, with a '.parquet' extension, the
+  sweeps file with a '-sweeps.csv' suffix, and the system samples and phases
+  files with '-samples.csv' and '-phases.csv' suffixes.
+"""
+
+import csv
+import math
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import (
+    PHASE_COLUMNS,
+    SAMPLE_METRICS,
+    SWEEP_COLUMNS,
+    phases_file,
+    samples_file,
+    sweep_file,
+)
+from benchmark_registry import (
+    INSTANCE_COLUMNS,
+    LATENCY_REGISTRY,
+    PRICE_COLUMN,
+    TIMING_COLUMNS,
+    Benchmark,
+    Sweep,
+    selected_benchmarks,
+    selected_sweeps,
+    summary_columns,
+)
+from get_instance_price import get_prices, open_cache
+from price_cache import PriceCache
+from result_parsers import RESULTS_FILE, load_records
+from system_sampler import SAMPLE_COLUMNS, SAMPLES_FILE
+from trial_statistics import add_trial_statistics
+
+SUMMARY_FILE = "summary.txt"
+SKIPPED_FILE = "skipped.txt"
+PHASE_TIMINGS_FILE = "phase-timings.csv"
+
+# The format of the start and end times in a 'summary.txt' line
+TIME_FORMAT = "%Y-%m-%d_%H%M%S_UTC"
+
+# The position of the free-text CPU model in a 'summary.txt' line. Any surplus
+# fields in a line are commas within the CPU model.
+CPU_MODEL_INDEX = INSTANCE_COLUMNS.index(os.getenv("H_CPU_MODEL"))
+
+STRING_COLUMNS = [
+    os.getenv("H_PROVIDER"),
+    os.getenv("H_INSTANCE_TYPE"),
+    os.getenv("H_REGION"),
+    os.getenv("H_CPU_MODEL"),
+]
+
+
+def find_summaries(root: str) -> List[str]:
+    """
+    Find all the summary files below the root directory.
+    """
+    return [
+        os.path.join(directory, SUMMARY_FILE)
+        for directory, _, files in os.walk(root)
+        if SUMMARY_FILE in files
+    ]
+
+
+def find_skipped(root: str) -> List[str]:
+    """
+    The reasons recorded by the benchmark Tasks below the root directory that
+    were skipped, e.g., as repeated runs on the same node.
+    """
+    reasons = []
+    for directory, _, files in os.walk(root):
+        if SKIPPED_FILE in files:
+            with open(os.path.join(directory, SKIPPED_FILE)) as f:
+                reasons.append(f.read().strip())
+    return reasons
+
+
+def parse_summary_line(line: str, num_columns: int) -> Optional[List[str]]:
+    """
+    Split a 'summary.txt' line into exactly 'num_columns' fields.
+    """
+    fields = [field.strip() for field in line.strip().split(",")]
+    if len(fields) < len(INSTANCE_COLUMNS):
+        return None
+    surplus = len(fields) - num_columns
+    if surplus > 0:
+        fields[CPU_MODEL_INDEX : CPU_MODEL_INDEX + surplus + 1] = [
+            ", ".join(fields[CPU_MODEL_INDEX : CPU_MODEL_INDEX + surplus + 1])
+        ]
+    elif surplus < 0:
+        fields += [""] * -surplus
+    return fields
+
+
+def record_trials(
+    records: List[Dict[str, Any]], benchmarks: List[Benchmark]
+) -> pd.DataFrame:
+    """
+    Extract the trial values of each benchmark from an instance's result
+    records. Trials are numbered in record order, since a single trial can
+    produce more than one record (e.g., CoreMark's two runs).
+    """
+    rows = []
+    for record in records:
+        if "error" in record:
+            print(f"Error in result record for '{record.get('source')}':", end=" ")
+            print(record["error"])
+        for benchmark in benchmarks:
+            if benchmark.record == record.get("test"):
+                rows.append(
+                    (
+                        benchmark.column_title,
+                        record.get("metrics", {}).get(benchmark.metric),
+                    )
+                )
+    trials = pd.DataFrame(rows, columns=["benchmark", "value"])
+    trials["value"] = pd.to_numeric(trials["value"], errors="coerce")
+    trials["trial"] = trials.groupby("benchmark").cumcount() + 1
+    return trials
+
+
+def record_sweeps(records: List[Dict[str, Any]], sweeps: List[Sweep]) -> pd.DataFrame:
+    """
+    Extract the points of each sweep from an instance's result records, with
+    their trial numbers and their positions in the sweep.
+    """
+    rows = []
+    trial_numbers: Dict[str, int] = {}
+    for record in records:
+        for sweep in sweeps:
+            if sweep.record != record.get("test"):
+                continue
+            trial = trial_numbers[sweep.chart_title] = (
+                trial_numbers.get(sweep.chart_title, 0) + 1
+            )
+            for metric, value in record.get("metrics", {}).items():
+                match = re.fullmatch(sweep.metric_pattern, metric)
+                if match is not None:
+                    position = match.groupdict()
+                    rows.append(
+                        (
+                            sweep.chart_title,
+                            trial,
+                            position.get("panel"),
+                            float(position["x"]),
+                            float(position["y"]) if "y" in position else None,
+                            value,
+                        )
+                    )
+    points = pd.DataFrame(rows, columns=SWEEP_COLUMNS[1:])
+    points["value"] = pd.to_numeric(points["value"], errors="coerce")
+    return points
+
+
+def read_activity_file(pathname: str) -> List[Dict[str, str]]:
+    """
+    Read the lines of a system samples or phase timings file, keyed by its
+    header. An unreadable file gives no lines.
+    """
+    try:
+        with open(pathname, newline="") as f:
+            return list(csv.DictReader(f))
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        print(f"Skipping unreadable file '{pathname}': {e}")
+        return []
+
+
+def to_float(value: Optional[str]) -> float:
+    """
+    Convert a CSV field to a float, giving NaN if it is empty or malformed.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def instance_activity(directory: str, row: int) -> Tuple[List[list], List[list]]:
+    """
+    Load the system samples and phase timings of an instance's run as lists
+    of rows, each starting with the instance's 'row', with their times in
+    seconds since the start of the run (the earlier of the first sample and
+    the start of the first phase). The rows of all the instances are built
+    into DataFrames once, by 'load_summaries'.
+    """
+    samples_path = os.path.join(directory, SAMPLES_FILE)
+    phases_path = os.path.join(directory, PHASE_TIMINGS_FILE)
+    if not os.path.exists(samples_path) and not os.path.exists(phases_path):
+        return [], []
+
+    samples = []
+    if os.path.exists(samples_path):
+        for line in read_activity_file(samples_path):
+            values = [to_float(line.get(column)) for column in SAMPLE_COLUMNS]
+            if not math.isnan(values[0]):
+                samples.append(values)
+    phases = []
+    if os.path.exists(phases_path):
+        for line in read_activity_file(phases_path):
+            phases.append(
+                [line.get("phase"), line.get("kind")]
+                + [to_float(line.get(column)) for column in PHASE_COLUMNS[3:6]]
+            )
+
+    times = [sample[0] for sample in samples] + [
+        phase[2] for phase in phases if not math.isnan(phase[2])
+    ]
+    start = min(times, default=0.0)
+    return (
+        [[row, sample[0] - start] + sample[1:] for sample in samples],
+        [
+            [row, name, kind, begin - start, end - start, seconds]
+            for name, kind, begin, end, seconds in phases
+        ],
+    )
+
+
+def add_phase_means(samples: pd.DataFrame, phases: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the mean of each sample metric over the samples taken during each
+    phase (inclusive of its start and end) by its instance to the phases.
+    """
+    samples = samples.sort_values(["row", "time"], kind="stable")
+    # Search all the instances' samples at once by offsetting each instance's
+    # times beyond the span of the previous instances' times
+    times = samples["time"].to_numpy("float64")
+    starts = phases["start"].to_numpy("float64")
+    ends = phases["end"].to_numpy("float64")
+    span = np.nanmax(np.concatenate([times, starts, ends, [0.0]])) + 1
+    keys = samples["row"].to_numpy("float64") * span + times
+    offsets = phases["row"].to_numpy("float64") * span
+    first = np.searchsorted(keys, offsets + starts)
+    last = np.searchsorted(keys, offsets + ends, side="right")
+    # Gather the samples of every phase into one table and average them by phase
+    counts = np.where(
+        np.isfinite(starts) & np.isfinite(ends) & (first < last), last - first, 0
+    )
+    phase_numbers = np.repeat(np.arange(len(phases)), counts)
+    positions = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(
+        counts.sum()
+    )
+    means = (
+        samples[SAMPLE_METRICS]
+        .iloc[positions]
+        .astype("float64")
+        .groupby(phase_numbers)
+        .mean()
+        .reindex(range(len(phases)))
+    )
+    return pd.concat(
+        [phases.reset_index(drop=True), means.reset_index(drop=True)], axis=1
+    )
+
+
+def load_summaries(
+    root: str,
+    columns: List[str],
+    record_benchmarks: List[Benchmark],
+    sweeps: List[Sweep],
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Parse all the summary files below the root directory into a DataFrame,
+    with typed columns. Also return the trials of the 'record_benchmarks', and
+    the points of the 'sweeps', from the result records file alongside each
+    summary file, and the system samples and phases of each instance's run,
+    with a 'row' column holding the index of their instance in the DataFrame.
+    """
+    rows = []
+    trials = []
+    points = []
+    samples = []
+    phases = []
+    for summary_file in find_summaries(root):
+        first_row = len(rows)
+        with open(summary_file) as f:
+            for line in f:
+                fields = parse_summary_line(line, len(columns))
+                if fields is not None:
+                    rows.append(fields)
+                elif line.strip() != "":
+                    print(f"Skipping malformed line in '{summary_file}': {line}")
+        if len(rows) == first_row + 1:
+            instance_samples, instance_phases = instance_activity(
+                os.path.dirname(summary_file), first_row
+            )
+            samples += instance_samples
+            phases += instance_phases
+        results_file = os.path.join(os.path.dirname(summary_file), RESULTS_FILE)
+        if len(rows) == first_row + 1 and os.path.exists(results_file):
+            try:
+                records = load_records(results_file)
+            except OSError as e:
+                print(f"Skipping unreadable results file '{results_file}': {e}")
+                continue
+            instance_trials = record_trials(records, record_benchmarks)
+            instance_trials["row"] = first_row
+            trials.append(instance_trials)
+            instance_points = record_sweeps(records, sweeps)
+            instance_points["row"] = first_row
+            points.append(instance_points)
+
+    df = pd.DataFrame(rows, columns=columns, dtype="string")
+    numeric_columns = [
+        column
+        for column in columns
+        if column not in STRING_COLUMNS and column not in TIMING_COLUMNS
+    ]
+    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+    df[os.getenv("H_VCPUS")] = df[os.getenv("H_VCPUS")].astype("Int64")
+    trials = (
+        pd.concat(trials, ignore_index=True)
+        if len(trials) > 0
+        else pd.DataFrame(columns=["benchmark", "trial", "value", "row"])
+    )
+    points = (
+        pd.concat(points, ignore_index=True)
+        if len(points) > 0
+        else pd.DataFrame(columns=SWEEP_COLUMNS)
+    )
+    samples = pd.DataFrame(samples, columns=["row"] + SAMPLE_COLUMNS)
+    phases = add_phase_means(samples, pd.DataFrame(phases, columns=PHASE_COLUMNS[:6]))
+    return (
+        df,
+        trials,
+        points[SWEEP_COLUMNS],
+        samples[["row"] + SAMPLE_COLUMNS],
+        phases[PHASE_COLUMNS],
+    )
+
+
+def node_hours(df: pd.DataFrame) -> pd.Series:
+    """
+    The node time of each instance's run, in hours, from its start and end
+    times. Missing or malformed times give NaN.
+    """
+    started, ended = (
+        pd.to_datetime(df[column], format=TIME_FORMAT, errors="coerce")
+        for column in TIMING_COLUMNS
+    )
+    return (ended - started).dt.total_seconds() / 3600
+
+
+def add_prices(df: pd.DataFrame, cache: Optional[PriceCache]) -> pd.DataFrame:
+    """
+    Add the on-demand hourly price column, looking up all the instances
+    in a single batch. Expired cached prices may still be being refreshed
+    when this returns, until the cache is closed.
+    """
+    instances = list(
+        zip(
+            df[os.getenv("H_PROVIDER")],
+            df[os.getenv("H_REGION")],
+            df[os.getenv("H_INSTANCE_TYPE")],
+        )
+    )
+    prices = get_prices(instances, cache=cache)
+    if cache is not None:
+        print(cache.statistics())
+    df[PRICE_COLUMN] = pd.Series(
+        [prices[instance] for instance in instances], index=df.index, dtype="string"
+    )
+    return df
+
+
+def write_outputs(df: pd.DataFrame, csv_file: str):
+    """
+    Write the summary table as CSV, and as Parquet if supported.
+    """
+    print(f"Generating '{os.path.basename(csv_file)}'")
+    df.to_csv(csv_file, index=False)
+    parquet_file = f"{os.path.splitext(csv_file)[0]}.parquet"
+    try:
+        df.to_parquet(parquet_file, index=False)
+        print(f"Generating '{os.path.basename(parquet_file)}'")
+    except ImportError:
+        print("Parquet support not installed: not generating Parquet output")
+
+
+def write_sweeps(points: pd.DataFrame, csv_file: str):
+    """
+    Write the sweep points alongside the summary CSV file, if there are any.
+    """
+    if len(points) == 0:
+        return
+    print(f"Generating '{os.path.basename(sweep_file(csv_file))}'")
+    points.to_csv(sweep_file(csv_file), index=False)
+
+
+def write_activity(samples: pd.DataFrame, phases: pd.DataFrame, csv_file: str):
+    """
+    Write the system samples and phases alongside the summary CSV file, if
+    there are any.
+    """
+    for data, filename in (
+        (samples, samples_file(csv_file)),
+        (phases, phases_file(csv_file)),
+    ):
+        if len(data) > 0:
+            print(f"Generating '{os.path.basename(filename)}'")
+            data.to_csv(filename, index=False, float_format="%.3f")
+
+
+def main():
+    try:
+        root = sys.argv[1]
+        csv_file = sys.argv[2]
+    except IndexError as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    benchmarks = selected_benchmarks()
+    latency_benchmarks = selected_benchmarks(registry=LATENCY_REGISTRY)
+    df, trials, points, samples, phases = load_summaries(
+        root,
+        summary_columns(benchmarks),
+        benchmarks + latency_benchmarks,
+        selected_sweeps(),
+    )
+    print(f"Found {len(df)} instance summaries, with {len(trials)} benchmark trials")
+    skipped = find_skipped(root)
+    if len(skipped) > 0:
+        print(f"{len(skipped)} benchmark Task(s) skipped, with no summary:")
+        for reason in skipped:
+            print(f"  {reason}")
+    hours = node_hours(df)
+    if hours.notna().any():
+        print(
+            f"Total node time: {hours.sum():.2f} node-hours"
+            f" (mean {60 * hours.mean():.1f} minutes per instance)"
+        )
+
+    # The latency metrics are only available from the result records
+    for benchmark in latency_benchmarks:
+        df[benchmark.column_title] = pd.Series(dtype="float64", index=df.index)
+    df = add_trial_statistics(
+        df,
+        trials,
+        [benchmark.column_title for benchmark in benchmarks + latency_benchmarks],
+    )
+    cache = open_cache()
+    try:
+        df = add_prices(df, cache)
+        write_outputs(df, csv_file)
+        write_sweeps(points, csv_file)
+        write_activity(samples, phases, csv_file)
+    finally:
+        if cache is not None:
+            # Expired prices still being refreshed are left for the next run
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
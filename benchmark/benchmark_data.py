@@ -0,0 +1,323 @@
+"""
+Data handling shared by the chart and report generation stages. The summary
+CSV file is loaded once, with explicit column types, and the derived label
+and rank columns are added to the same DataFrame for use by both stages. The
+sweep points, and the system samples and phase timings of each instance, are
+kept in separate files alongside the summary CSV file.
+"""
+
+import re
+from os import getenv, path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmark_registry import (
+    LATENCY_REGISTRY,
+    PRICE_COLUMN,
+    TIMING_COLUMNS,
+    Matrix,
+    Sweep,
+    selected_benchmarks,
+)
+from system_sampler import SAMPLE_COLUMNS
+from trial_statistics import (
+    ci_high_column,
+    ci_low_column,
+    mean_column,
+    stddev_column,
+    trials_column,
+)
+
+# The aggregated 'Instance Type / Region' column used to label the charts
+LABEL_COLUMN = f"{getenv('H_INSTANCE_TYPE')} / {getenv('H_REGION')}"
+
+# The percentile bands reported for each benchmark
+PERCENTILES: List[float] = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+# The columns of the sweeps file: the index of the instance in the summary, the
+# sweep's chart title, and the trial, position and result of each point. The
+# panel and 'y' positions are only used by matrices.
+SWEEP_COLUMNS: List[str] = ["row", "sweep", "trial", "panel", "x", "y", "value"]
+
+# The system sample metrics, e.g., CPU utilisation and frequency
+SAMPLE_METRICS: List[str] = SAMPLE_COLUMNS[1:]
+
+# The columns of the phases file: the index of the instance in the summary,
+# the name, kind, start and end of each phase of its run (in seconds since the
+# start of the run), and the mean of each system sample metric in the phase
+PHASE_COLUMNS: List[str] = [
+    "row",
+    "phase",
+    "kind",
+    "start",
+    "end",
+    "seconds",
+] + SAMPLE_METRICS
+
+# The chart of each instance's system samples, named after the instance
+SYSTEM_CHART_FILE = "system-activity.png"
+
+# The format in which the charts are saved: 'png' (raster) or 'svg' (vector,
+# embedded in the PDF report as paths). Charts are named as PNG files
+# throughout; 'chart_path' gives the file a chart is saved in.
+CHART_FORMAT = getenv("CHART_FORMAT", "png").lower()
+
+
+def chart_path(output_file: str) -> str:
+    """
+    The file in which a chart is saved, in the chart format.
+    """
+    return f"{path.splitext(output_file)[0]}.{CHART_FORMAT}"
+
+
+def rank_column(column_title: str) -> str:
+    """
+    The name of the rank column derived from a benchmark column.
+    """
+    return f"{column_title} Rank"
+
+
+def summary_dtypes(benchmark_headers: List[str]) -> Dict[str, str]:
+    """
+    The column types of the summary CSV file. The latency columns are
+    included, if present.
+    """
+    dtypes = {
+        getenv("H_PROVIDER"): "category",
+        getenv("H_INSTANCE_TYPE"): "category",
+        getenv("H_REGION"): "category",
+        getenv("H_CPU_MODEL"): "string",
+        getenv("H_VCPUS"): "Int32",
+        getenv("H_RAM"): "float32",
+        PRICE_COLUMN: "string",
+    }
+    dtypes.update({column: "string" for column in TIMING_COLUMNS})
+    for column in benchmark_headers + [
+        benchmark.column_title for benchmark in LATENCY_REGISTRY
+    ]:
+        dtypes[column] = "float32"
+        # The trial counts are read as floats, rather than as a nullable
+        # integer type, which would hold each column in a separate block
+        for statistic in (
+            mean_column,
+            stddev_column,
+            ci_low_column,
+            ci_high_column,
+            trials_column,
+        ):
+            dtypes[statistic(column)] = "float32"
+    return dtypes
+
+
+def instance_labels(
+    df: pd.DataFrame, columns: List[str], separator: str = " / "
+) -> pd.Series:
+    """
+    Build a label for each row by joining the values of the given columns.
+    Identical labels are disambiguated by appending a numeral, counting
+    in label-sorted order, e.g.: 'm5.large / eu-west-1 (2)'. The returned
+    Series has the same index as the DataFrame.
+    """
+    labels = df[columns[0]].astype(str)
+    for column in columns[1:]:
+        labels = labels + separator + df[column].astype(str)
+
+    labels = labels.sort_values()
+    numbers = labels.groupby(labels, sort=False).cumcount() + 1
+    labels = labels.where(
+        ~labels.duplicated(keep=False), labels + " (" + numbers.astype(str) + ")"
+    )
+    return labels.reindex(df.index)
+
+
+def add_ranks(df: pd.DataFrame, benchmark_headers: List[str]):
+    """
+    Add a rank column for each benchmark, where rank 1 is the best-performing
+    instance. Instances without a result are not ranked.
+    """
+    for column in benchmark_headers:
+        df[rank_column(column)] = (
+            df[column].rank(method="first", ascending=False).astype("Int32")
+        )
+
+
+def load_summary(
+    csv_file: str, benchmark_headers: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Load the summary CSV file into a DataFrame, and add the label and rank
+    columns. 'benchmark_headers' defaults to the selected benchmarks.
+    """
+    if benchmark_headers is None:
+        benchmark_headers = [
+            benchmark.column_title for benchmark in selected_benchmarks()
+        ]
+
+    # The parser returns each column in a separate block: consolidate them
+    # into one block per type, so that the columns added by this and later
+    # stages don't fragment the DataFrame
+    df = pd.read_csv(
+        csv_file, skipinitialspace=True, dtype=summary_dtypes(benchmark_headers)
+    ).copy()
+    df[LABEL_COLUMN] = instance_labels(
+        df, [getenv("H_INSTANCE_TYPE"), getenv("H_REGION")]
+    )
+    add_ranks(df, [column for column in benchmark_headers if column in df])
+    return df
+
+
+def sweep_file(csv_file: str) -> str:
+    """
+    The pathname of the sweeps file that accompanies a summary CSV file.
+    """
+    return f"{path.splitext(csv_file)[0]}-sweeps.csv"
+
+
+def load_sweeps(csv_file: str) -> pd.DataFrame:
+    """
+    Load the sweep points accompanying the summary CSV file, with the median
+    of the trials at each point. The DataFrame is empty if there are none.
+    """
+    position = ["row", "sweep", "panel", "x", "y"]
+    try:
+        points = pd.read_csv(
+            sweep_file(csv_file),
+            dtype={
+                "row": "int64",
+                "sweep": "string",
+                "panel": "string",
+                "x": "float64",
+                "y": "float64",
+            },
+        )
+    except FileNotFoundError:
+        return pd.DataFrame(columns=position + ["value"])
+    return points.groupby(position, as_index=False, dropna=False)["value"].median()
+
+
+def parallel_efficiency(points: pd.DataFrame) -> pd.Series:
+    """
+    The parallel efficiency at each point of a thread count sweep, as a
+    percentage: the speedup over one thread divided by the number of threads.
+    It's missing for an instance with no single-thread point.
+    """
+    single_thread = (
+        points["value"]
+        .where(points["x"] == 1)
+        .groupby([points["row"], points["sweep"]])
+        .transform("max")
+    )
+    return 100 * points["value"] / (points["x"] * single_thread)
+
+
+def samples_file(csv_file: str) -> str:
+    """
+    The pathname of the system samples file that accompanies a summary CSV
+    file.
+    """
+    return f"{path.splitext(csv_file)[0]}-samples.csv"
+
+
+def phases_file(csv_file: str) -> str:
+    """
+    The pathname of the phases file that accompanies a summary CSV file.
+    """
+    return f"{path.splitext(csv_file)[0]}-phases.csv"
+
+
+def load_samples(csv_file: str) -> pd.DataFrame:
+    """
+    Load the system samples accompanying the summary CSV file, with their
+    times in seconds since the start of their instance's run. The DataFrame is
+    empty if there are none.
+    """
+    try:
+        return pd.read_csv(
+            samples_file(csv_file),
+            dtype={"row": "int64", **{column: "float64" for column in SAMPLE_COLUMNS}},
+        )
+    except FileNotFoundError:
+        return pd.DataFrame(columns=["row"] + SAMPLE_COLUMNS)
+
+
+def load_phases(csv_file: str) -> pd.DataFrame:
+    """
+    Load the phases accompanying the summary CSV file. The DataFrame is empty
+    if there are none.
+    """
+    try:
+        return pd.read_csv(
+            phases_file(csv_file),
+            dtype={"row": "int64", "phase": "string", "kind": "category"},
+        )
+    except FileNotFoundError:
+        return pd.DataFrame(columns=PHASE_COLUMNS)
+
+
+def instance_chart_file(output_file: str, label: str) -> str:
+    """
+    The file name of a chart for an instance, from the chart's file name and
+    the instance's label.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")
+    return f"{path.splitext(output_file)[0]}-{slug}.png"
+
+
+def matrix_chart_file(matrix: Matrix, label: str) -> str:
+    """
+    The file name of a matrix's heatmap for an instance, from its label.
+    """
+    return instance_chart_file(matrix.output_file, label)
+
+
+def system_chart_files(df: pd.DataFrame) -> List[str]:
+    """
+    The file names of the instances' system sample charts.
+    """
+    return [instance_chart_file(SYSTEM_CHART_FILE, label) for label in df[LABEL_COLUMN]]
+
+
+def sweep_chart_files(df: pd.DataFrame, sweeps: List[Sweep]) -> List[str]:
+    """
+    The file names of the sweeps' charts: one per sweep, or one per instance
+    for a matrix.
+    """
+    files = []
+    for sweep in sweeps:
+        if isinstance(sweep, Matrix):
+            files += [matrix_chart_file(sweep, label) for label in df[LABEL_COLUMN]]
+        else:
+            files.append(sweep.output_file)
+    return files
+
+
+def top_and_bottom(
+    df: pd.DataFrame, column_title: str, n: int
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Select the 'n' best and 'n' worst performing rows for a benchmark, in rank
+    order, using its precomputed rank column. The two selections do not
+    overlap if there are fewer than 2n results.
+    """
+    ranks = df[rank_column(column_title)]
+    count = ranks.count()
+    top = df[ranks <= n]
+    bottom = df[ranks > max(n, count - n)]
+    return (
+        top.sort_values(by=rank_column(column_title)),
+        bottom.sort_values(by=rank_column(column_title)),
+    )
+
+
+def percentile_bands(
+    df: pd.DataFrame,
+    benchmark_headers: List[str],
+    percentiles: List[float] = PERCENTILES,
+) -> pd.DataFrame:
+    """
+    Find the benchmark scores at each percentile, with one row per benchmark
+    and one column per percentile.
+    """
+    return df[benchmark_headers].quantile(percentiles).transpose()
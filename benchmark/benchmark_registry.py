@@ -0,0 +1,443 @@
+"""
+The registry of benchmark result columns, shared by the summary, chart and
+report generation stages. Column headings and benchmark selection names are
+taken from the environment set up by 'common.sh'.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    column_title: str
+    chart_title: str
+    y_axis_label: str
+    output_file: str
+    x_axis_label: str = "Instance Types"
+    colour: str = os.getenv("CHART_COLOR", "b")
+    name: Optional[str] = None  # The benchmark selection name
+    record: Optional[str] = None  # The test name in the result records
+    metric: Optional[str] = None  # The metric in the result records
+
+
+@dataclass
+class Sweep:
+    """
+    A result measured at each of a range of values of a parameter, e.g., the
+    latency at each working set size. Each point is a metric in the result
+    records whose name matches 'metric_pattern', with the parameter value as
+    its 'x' group.
+    """
+
+    chart_title: str
+    x_axis_label: str
+    y_axis_label: str
+    output_file: str
+    log_x: bool = False
+    log_y: bool = False
+    name: Optional[str] = None  # The benchmark selection name
+    record: Optional[str] = None  # The test name in the result records
+    metric_pattern: Optional[str] = None  # Matches the metrics of the points
+
+
+@dataclass
+class Matrix(Sweep):
+    """
+    A result measured over a grid of values of two parameters, in one or more
+    panels, e.g., the storage IOPS by block size and thread count for each
+    access pattern. The 'x', 'y' and (optional) 'panel' groups of the metric
+    pattern give the position of each point. A heatmap is charted for each
+    instance, in a file named after 'output_file' and the instance.
+    """
+
+    value_label: str = ""
+    panel_titles: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Scaling(Sweep):
+    """
+    A throughput measured at each of a range of thread counts, from one thread
+    up to one per vCPU, with the thread count as the 'x' group of the metric
+    pattern. It's charted with the parallel efficiency at each thread count.
+    """
+
+
+# The access patterns of the storage matrix, in panel order
+STORAGE_PANEL_TITLES: Dict[str, str] = {
+    f"{mode}-{io}": f"{title} ({io_title})"
+    for io, io_title in (("direct", "O_DIRECT"), ("buffered", "Buffered"))
+    for mode, title in (
+        ("seqrd", "Sequential Read"),
+        ("seqwr", "Sequential Write"),
+        ("rndrd", "Random Read"),
+        ("rndwr", "Random Write"),
+    )
+}
+
+
+# Instance description columns, which precede the benchmark columns in each
+# 'summary.txt' line
+INSTANCE_COLUMNS: List[str] = [
+    os.getenv("H_PROVIDER"),
+    os.getenv("H_INSTANCE_TYPE"),
+    os.getenv("H_REGION"),
+    os.getenv("H_CPU_MODEL"),
+    os.getenv("H_VCPUS"),
+    os.getenv("H_RAM"),
+]
+
+# Timing columns, which follow the benchmark columns
+TIMING_COLUMNS: List[str] = [os.getenv("H_START_TIME"), os.getenv("H_END_TIME")]
+
+# Added by the summary stage
+PRICE_COLUMN: str = os.getenv("H_INSTANCE_PRICE")
+
+# All the included benchmarks, in 'summary.txt' column order
+BENCHMARK_REGISTRY: List[Benchmark] = [
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_SC"),
+        chart_title="sysbench Single-Core Benchmark",
+        y_axis_label="Events per Second",
+        output_file="sysbench-single.png",
+        record="sysbench-singlecore",
+        metric="events_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_MC"),
+        chart_title="sysbench Multicore Benchmark",
+        y_axis_label="Events per Second",
+        output_file="sysbench-multi.png",
+        record="sysbench-multicore",
+        metric="events_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_MEM"),
+        chart_title="sysbench Memory Benchmark",
+        y_axis_label="Operations per Second",
+        output_file="sysbench-memory.png",
+        record="sysbench-memory",
+        metric="operations_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_ST_R"),
+        chart_title="sysbench Storage Read Performance",
+        y_axis_label="Read Ops per Second",
+        output_file="sysbench-storage-reads.png",
+        record="sysbench-storage",
+        metric="reads_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_ST_W"),
+        chart_title="sysbench Storage Write Performance",
+        y_axis_label="Write Ops per Second",
+        output_file="sysbench-storage-writes.png",
+        record="sysbench-storage",
+        metric="writes_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title=os.getenv("H_SYSBENCH_ST_F"),
+        chart_title="sysbench Storage Fsync Performance",
+        y_axis_label="Fsync Ops per Second",
+        output_file="sysbench-storage-fsyncs.png",
+        record="sysbench-storage",
+        metric="fsyncs_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_MYSQL_TPCC"),
+        column_title=os.getenv("H_MYSQL_TPCC"),
+        chart_title="sysbench MySQL TPC-C TPS",
+        y_axis_label="Transactions per Second",
+        output_file="sysbench-mysql-tpcc.png",
+        record="mysql-tpcc",
+        metric="transactions_per_second",
+    ),
+    Benchmark(
+        name=os.getenv("N_COREMARK_STD"),
+        column_title=os.getenv("H_COREMARK_STD_SC"),
+        chart_title="CoreMark Single-Core Benchmark",
+        y_axis_label="Benchmark Score",
+        output_file="coremark-single.png",
+        record="coremark-singlecore",
+        metric="score",
+    ),
+    Benchmark(
+        name=os.getenv("N_COREMARK_STD"),
+        column_title=os.getenv("H_COREMARK_STD_MC"),
+        chart_title="CoreMark Multicore Benchmark",
+        y_axis_label="Benchmark Score",
+        output_file="coremark-multi.png",
+        record="coremark-multicore",
+        metric="score",
+    ),
+    Benchmark(
+        name=os.getenv("N_COREMARK_PRO"),
+        column_title=os.getenv("H_COREMARK_PRO_SC"),
+        chart_title="CoreMark-Pro Single-Core Benchmark",
+        y_axis_label="Benchmark Score",
+        output_file="coremark-pro-single.png",
+        record="coremark-pro",
+        metric="single_core",
+    ),
+    Benchmark(
+        name=os.getenv("N_COREMARK_PRO"),
+        column_title=os.getenv("H_COREMARK_PRO_MC"),
+        chart_title="CoreMark-Pro Multicore Benchmark",
+        y_axis_label="Benchmark Score",
+        output_file="coremark-pro-multi.png",
+        record="coremark-pro",
+        metric="multi_core",
+    ),
+    Benchmark(
+        name=os.getenv("N_LINPACK"),
+        column_title=os.getenv("H_LINPACK_SC"),
+        chart_title="LINPACK Single-Core MFLOPS",
+        y_axis_label="MFLOPS",
+        output_file="linpack-single.png",
+        record="linpack-singlecore",
+        metric="mflops",
+    ),
+    Benchmark(
+        name=os.getenv("N_LINPACK"),
+        column_title=os.getenv("H_LINPACK_MC"),
+        chart_title="LINPACK Multicore MFLOPS",
+        y_axis_label="MFLOPS",
+        output_file="linpack-multi.png",
+        record="linpack-multicore",
+        metric="mflops",
+    ),
+    Benchmark(
+        name=os.getenv("N_NUMPY_LINALG"),
+        column_title=os.getenv("H_NUMPY_LINALG_SC"),
+        chart_title="NumPy Solve Single-Core MFLOPS",
+        y_axis_label="MFLOPS",
+        output_file="numpy-linalg-single.png",
+        record="numpy-linalg-singlecore",
+        metric="mflops",
+    ),
+    Benchmark(
+        name=os.getenv("N_NUMPY_LINALG"),
+        column_title=os.getenv("H_NUMPY_LINALG_MC"),
+        chart_title="NumPy Solve Multicore MFLOPS",
+        y_axis_label="MFLOPS",
+        output_file="numpy-linalg-multi.png",
+        record="numpy-linalg-multicore",
+        metric="mflops",
+    ),
+    Benchmark(
+        name=os.getenv("N_STREAM"),
+        column_title=os.getenv("H_STREAM_COPY"),
+        chart_title="STREAM Copy Bandwidth",
+        y_axis_label="MB per Second",
+        output_file="stream-copy.png",
+        record="stream",
+        metric="copy_mb_s",
+    ),
+    Benchmark(
+        name=os.getenv("N_STREAM"),
+        column_title=os.getenv("H_STREAM_SCALE"),
+        chart_title="STREAM Scale Bandwidth",
+        y_axis_label="MB per Second",
+        output_file="stream-scale.png",
+        record="stream",
+        metric="scale_mb_s",
+    ),
+    Benchmark(
+        name=os.getenv("N_STREAM"),
+        column_title=os.getenv("H_STREAM_ADD"),
+        chart_title="STREAM Add Bandwidth",
+        y_axis_label="MB per Second",
+        output_file="stream-add.png",
+        record="stream",
+        metric="add_mb_s",
+    ),
+    Benchmark(
+        name=os.getenv("N_STREAM"),
+        column_title=os.getenv("H_STREAM_TRIAD"),
+        chart_title="STREAM Triad Bandwidth",
+        y_axis_label="MB per Second",
+        output_file="stream-triad.png",
+        record="stream",
+        metric="triad_mb_s",
+    ),
+]
+
+
+# Latency metrics from the result records, which are not included in the
+# 'summary.txt' lines. Lower values are better.
+LATENCY_REGISTRY: List[Benchmark] = [
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title="sysbench Single-Core P95 Latency (ms)",
+        chart_title="sysbench Single-Core 95th Percentile Latency",
+        y_axis_label="Latency (ms)",
+        output_file="sysbench-single-latency.png",
+        record="sysbench-singlecore",
+        metric="latency_p95_ms",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title="sysbench Multi-Core P95 Latency (ms)",
+        chart_title="sysbench Multicore 95th Percentile Latency",
+        y_axis_label="Latency (ms)",
+        output_file="sysbench-multi-latency.png",
+        record="sysbench-multicore",
+        metric="latency_p95_ms",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title="sysbench Memory P95 Latency (ms)",
+        chart_title="sysbench Memory 95th Percentile Latency",
+        y_axis_label="Latency (ms)",
+        output_file="sysbench-memory-latency.png",
+        record="sysbench-memory",
+        metric="latency_p95_ms",
+    ),
+    Benchmark(
+        name=os.getenv("N_SYSBENCH"),
+        column_title="sysbench Storage P95 Latency (ms)",
+        chart_title="sysbench Storage 95th Percentile Latency",
+        y_axis_label="Latency (ms)",
+        output_file="sysbench-storage-latency.png",
+        record="sysbench-storage",
+        metric="latency_p95_ms",
+    ),
+    Benchmark(
+        name=os.getenv("N_MYSQL_TPCC"),
+        column_title="sysbench MySQL TPC-C P95 Latency (ms)",
+        chart_title="sysbench MySQL TPC-C 95th Percentile Latency",
+        y_axis_label="Latency (ms)",
+        output_file="sysbench-mysql-tpcc-latency.png",
+        record="mysql-tpcc",
+        metric="latency_p95_ms",
+    ),
+    Benchmark(
+        name=os.getenv("N_STREAM"),
+        column_title=os.getenv("H_STREAM_LATENCY"),
+        chart_title="STREAM Pointer-Chase Latency at the Largest Working Set",
+        y_axis_label="Latency (ns)",
+        output_file="stream-latency.png",
+        record="stream",
+        metric="dram_latency_ns",
+    ),
+]
+
+
+# Results measured over a range of parameter values, from the result records,
+# which are charted as a line per instance
+SWEEP_REGISTRY: List[Sweep] = [
+    Scaling(
+        name=os.getenv("N_SYSBENCH"),
+        chart_title="sysbench CPU Scaling by Thread Count",
+        x_axis_label="Threads",
+        y_axis_label="Events per Second",
+        output_file="sysbench-scaling.png",
+        log_x=True,
+        record="sysbench-scaling",
+        metric_pattern=r"events_per_second_(?P<x>\d+)t",
+    ),
+    Scaling(
+        name=os.getenv("N_COREMARK_STD"),
+        chart_title="CoreMark Scaling by Thread Count",
+        x_axis_label="Threads",
+        y_axis_label="CoreMark Score",
+        output_file="coremark-scaling.png",
+        log_x=True,
+        record="coremark-scaling",
+        metric_pattern=r"score_(?P<x>\d+)t",
+    ),
+    Sweep(
+        name=os.getenv("N_STREAM"),
+        chart_title="STREAM Pointer-Chase Latency by Working Set Size",
+        x_axis_label="Working Set Size (KiB)",
+        y_axis_label="Latency (ns)",
+        output_file="stream-latency-size.png",
+        log_x=True,
+        log_y=True,
+        record="stream",
+        metric_pattern=r"latency_ns_(?P<x>\d+)kib",
+    ),
+    Matrix(
+        name=os.getenv("N_SYSBENCH"),
+        chart_title="sysbench Storage IOPS",
+        x_axis_label="Threads",
+        y_axis_label="Block Size (KiB)",
+        value_label="Operations per Second",
+        output_file="sysbench-storage-matrix-iops.png",
+        record="sysbench-storage-matrix",
+        metric_pattern=r"(?P<panel>[a-z]+-[a-z]+)_(?P<y>\d+)kib_(?P<x>\d+)t_iops",
+        panel_titles=STORAGE_PANEL_TITLES,
+    ),
+    Matrix(
+        name=os.getenv("N_SYSBENCH"),
+        chart_title="sysbench Storage Throughput",
+        x_axis_label="Threads",
+        y_axis_label="Block Size (KiB)",
+        value_label="MiB per Second",
+        output_file="sysbench-storage-matrix-throughput.png",
+        record="sysbench-storage-matrix",
+        metric_pattern=r"(?P<panel>[a-z]+-[a-z]+)_(?P<y>\d+)kib_(?P<x>\d+)t_mib_s",
+        panel_titles=STORAGE_PANEL_TITLES,
+    ),
+    Matrix(
+        name=os.getenv("N_SYSBENCH"),
+        chart_title="sysbench Storage 95th Percentile Latency",
+        x_axis_label="Threads",
+        y_axis_label="Block Size (KiB)",
+        value_label="Latency (ms)",
+        output_file="sysbench-storage-matrix-latency.png",
+        record="sysbench-storage-matrix",
+        metric_pattern=r"(?P<panel>[a-z]+-[a-z]+)_(?P<y>\d+)kib_(?P<x>\d+)t_p95_ms",
+        panel_titles=STORAGE_PANEL_TITLES,
+    ),
+]
+
+
+def selected_benchmarks(
+    selection: str = os.getenv("BENCHMARKS", ""),
+    registry: List[Benchmark] = BENCHMARK_REGISTRY,
+) -> List[Benchmark]:
+    """
+    Return the benchmarks in the registry included in the benchmark selection
+    string, in registry order ('summary.txt' column order, for the default
+    registry).
+    """
+    return [
+        benchmark
+        for benchmark in registry
+        if benchmark.name is not None and benchmark.name in selection
+    ]
+
+
+def selected_sweeps(
+    selection: str = os.getenv("BENCHMARKS", ""),
+    registry: List[Sweep] = SWEEP_REGISTRY,
+) -> List[Sweep]:
+    """
+    Return the sweeps in the registry included in the benchmark selection
+    string, in registry order.
+    """
+    return [
+        sweep
+        for sweep in registry
+        if sweep.name is not None and sweep.name in selection
+    ]
+
+
+def summary_columns(benchmarks: List[Benchmark]) -> List[str]:
+    """
+    The columns of a 'summary.txt' line for the given benchmarks.
+    """
+    return (
+        INSTANCE_COLUMNS
+        + [benchmark.column_title for benchmark in benchmarks]
+        + TIMING_COLUMNS
+    )
@@ -18,6 +18,33 @@ VCPUS=$(cat $YDA_CONFIG | grep vcpus | awk '{print $2}')
 INSTANCE_TYPE=$(cat $YDA_CONFIG | grep instanceType | awk '{print $2}' \
                 | sed 's/"//g')
 
+# One Run per Node  ############################################################
+
+# Each node should run the benchmarks once per Work Requirement. A node that
+# finishes its Task before the other nodes are ready may be allocated a second
+# Task, which would leave another instance unbenchmarked. A completed run is
+# recorded by saving its summary line in NODE_RUNS_DIR, under the Work
+# Requirement name and the node's ID. A repeated run is skipped: its Task
+# succeeds without running the benchmarks, so that it doesn't use up the Work
+# Requirement's task retries, and the instance's results are only reported
+# once. The skipped Task leaves a 'skipped.txt' file in place of its summary,
+# which the summary stage reports.
+
+NODE_ID=$(awk '/instanceId/ { gsub(/"/, "", $2); print $2; exit }' $YDA_CONFIG)
+NODE_ID=${NODE_ID:-$(hostname)}
+NODE_RUNS_DIR=${NODE_RUNS_DIR:-$YD_AGENT_HOME/benchmark-runs}
+NODE_RUN_FILE="$NODE_RUNS_DIR/$(basename "$WR_NAME")-$NODE_ID-summary.txt"
+
+if [[ -f "$NODE_RUN_FILE" ]]
+then
+  yd_print "Node $NODE_ID has already run the benchmarks for this Work" \
+           "Requirement: skipping this Task"
+  mkdir -p "$INSTANCE_TYPE"
+  echo "skipped: duplicate node $NODE_ID ($INSTANCE_TYPE) at $START_TIME" > \
+       "$INSTANCE_TYPE/skipped.txt"
+  exit 0
+fi
+
 # Create and switch into a directory named after the instance type. (This is
 # just to signal the instance type.)
 yd_print "Creating directory:" $INSTANCE_TYPE
@@ -54,242 +81,1098 @@ echo -n "$PROVIDER, $INSTANCE_TYPE, $REGION, $CPU_MODEL, $VCPUS, $RAM" > \
 
 # The rest of the columns will be populated by the selected benchmarks
 
-# Run sysbench  ################################################################
+# Benchmark trials  ############################################################
 
-if [[ $BENCHMARKS == *$N_SYSBENCH* ]]
+# Each benchmark is repeated for a number of trials, to measure its
+# run-to-run variance. The trial count defaults to BENCHMARK_TRIALS, and can be
+# set for individual benchmarks.
+
+BENCHMARK_TRIALS=${BENCHMARK_TRIALS:-3}
+TRIALS_SYSBENCH=${TRIALS_SYSBENCH:-$BENCHMARK_TRIALS}
+TRIALS_MYSQL_TPCC=${TRIALS_MYSQL_TPCC:-$BENCHMARK_TRIALS}
+TRIALS_COREMARK_STD=${TRIALS_COREMARK_STD:-$BENCHMARK_TRIALS}
+TRIALS_COREMARK_PRO=${TRIALS_COREMARK_PRO:-$BENCHMARK_TRIALS}
+TRIALS_LINPACK=${TRIALS_LINPACK:-$BENCHMARK_TRIALS}
+TRIALS_NUMPY_LINALG=${TRIALS_NUMPY_LINALG:-$BENCHMARK_TRIALS}
+TRIALS_STREAM=${TRIALS_STREAM:-$BENCHMARK_TRIALS}
+
+# The problem size of LINPACK and the NumPy linear solve, and the LINPACK
+# compiler flags. LINPACK is run single-threaded, and with a thread per vCPU.
+
+LINPACK_N=${LINPACK_N:-4000}
+LINPACK_CFLAGS=${LINPACK_CFLAGS:-"-O3 -fopenmp"}
+
+# Print the total size of the last-level caches in KiB, counting each shared
+# cache once
+last_level_cache_kib () {
+  local DIR
+  for DIR in /sys/devices/system/cpu/cpu[0-9]*/cache/index[0-9]*
+  do
+    if [[ -f $DIR/size ]]
+    then
+      echo "$(cat $DIR/level) $(cat $DIR/shared_cpu_list) $(cat $DIR/size)"
+    fi
+  done | sort -u | \
+    awk '$1 > level { level = $1; total = 0 } $1 == level { total += $3 }
+         END { print total + 0 }'
+}
+
+# The STREAM bandwidth arrays are at least four times the size of the
+# last-level caches (and at least 10 million elements), and the
+# pointer-chasing working sets grow to at least eight times their size (and at
+# least 256 MiB), limited by the instance's RAM. The bandwidth kernels run
+# with a thread per vCPU; the latency is measured with one thread.
+
+LLC_KIB=$(last_level_cache_kib)
+STREAM_ARRAY_SIZE=${STREAM_ARRAY_SIZE:-$(awk -v llc=$LLC_KIB -v ram=${RAM:-0} \
+  'BEGIN { n = llc * 1024 * 4 / 8; if (n < 10000000) n = 10000000
+           cap = ram * 1e9 / 4 / 24; if (cap > 0 && n > cap) n = cap
+           printf "%d\n", n }')}
+STREAM_LATENCY_MAX_KIB=${STREAM_LATENCY_MAX_KIB:-$(awk -v llc=$LLC_KIB \
+  -v ram=${RAM:-0} \
+  'BEGIN { n = llc * 8; if (n < 262144) n = 262144
+           cap = ram * 1e9 / 1024 / 8; if (cap > 0 && n > cap) n = cap
+           printf "%d\n", n }')}
+STREAM_CFLAGS=${STREAM_CFLAGS:-"-O3 -fopenmp"}
+
+# The sysbench storage test files are twice the size of the instance's RAM (at
+# least 1 GiB), so that they don't fit in the page cache, limited to half the
+# free space in STORAGE_DIR. After the random read/write trials, a matrix of
+# access patterns, block sizes (in KiB), thread counts and I/O modes ('direct'
+# for O_DIRECT, bypassing the page cache, or 'buffered') is run on the same
+# files, unless STORAGE_MATRIX=false.
+
+STORAGE_DIR=${STORAGE_DIR:-"$PWD/sysbench"}
+mkdir -p "$STORAGE_DIR"
+STORAGE_FILE_SIZE=${STORAGE_FILE_SIZE:-$(df -Pk "$STORAGE_DIR" | \
+  awk -v ram=${RAM:-0} \
+  'NR == 2 { size = ram * 2; if (size < 1) size = 1
+             free = $4 / 1048576 / 2; if (size > free) size = free
+             printf "%dG\n", size < 1 ? 1 : size }')}
+STORAGE_MATRIX=${STORAGE_MATRIX:-true}
+STORAGE_MODES=${STORAGE_MODES:-"seqrd seqwr rndrd rndwr"}
+STORAGE_BLOCK_SIZES=${STORAGE_BLOCK_SIZES:-"4 64 1024"}
+STORAGE_THREADS=${STORAGE_THREADS:-"1 4 16"}
+STORAGE_IO=${STORAGE_IO:-"direct"}
+STORAGE_MATRIX_TIME=${STORAGE_MATRIX_TIME:-10}
+
+# The CPU benchmarks (sysbench and CoreMark) are also run once at each thread
+# count in SWEEP_THREADS (default: 1, 2, 4, ... and one thread per vCPU), to
+# show how their throughput scales, unless THREAD_SWEEP=false.
+
+THREAD_SWEEP=${THREAD_SWEEP:-true}
+SWEEP_THREADS=${SWEEP_THREADS:-$(awk -v vcpus=$VCPUS \
+  'BEGIN { for (t = 1; t < vcpus; t *= 2) printf "%d ", t; print vcpus }')}
+
+# The output of every trial is parsed into a typed result record, including
+# latency percentiles and build and run details, in the results file. The
+# median of each benchmark's trials is added to the summary line.
+
+RESULTS_FILE="$PWD/results.jsonl"
+RESULT_PARSER="$(find $TASK_DIR -name result_parsers.py)"
+: > $RESULTS_FILE
+
+# Parse a benchmark output file into a result record, and print the values of
+# the named metrics: parse_result <test> <trial> <output file> <metric> ...
+parse_result () {
+  python3 "$RESULT_PARSER" "$RESULTS_FILE" "$@"
+}
+
+# Print the median of the non-empty arguments
+median () {
+  printf '%s\n' "$@" | awk 'NF' | sort -g | \
+    awk '{ v[NR] = $1 }
+         END { if (NR % 2) print v[(NR + 1) / 2]
+               else if (NR > 0) printf "%.4f\n", (v[NR / 2] + v[NR / 2 + 1]) / 2 }'
+}
+
+# Add the median of a benchmark's trial values to its summary column, to be
+# added to the summary line once all benchmarks are complete:
+# summarise_trials <column> <value> [<value> ...]
+summarise_trials () {
+  local COLUMN=$1
+  shift
+  median "$@" > "$STATE_DIR/column-$COLUMN"
+}
+
+# Scheduling  ##################################################################
+
+# Setup phases (package installation, downloads and builds) are started in the
+# background at the beginning of the run, pinned away from the CPU used for
+# the single-core measurements, so that they overlap with those measurements.
+# All setup is complete before any multi-core measurement starts. Set
+# OVERLAP_SETUP=false to run each setup phase to completion before any
+# measurement.
+#
+# If PARALLEL_SINGLE_CORE=true, the single-core benchmarks are also run side
+# by side, each pinned to a separate physical core. This shortens the run on
+# large instances, but the benchmarks share caches and memory bandwidth, so
+# it's disabled by default.
+
+OVERLAP_SETUP=${OVERLAP_SETUP:-true}
+PARALLEL_SINGLE_CORE=${PARALLEL_SINGLE_CORE:-false}
+
+# Scheduling state: setup status files and summary column values
+STATE_DIR=$(mktemp -d)
+
+# The start and end times of each setup and measurement phase
+PHASE_TIMINGS_FILE="$PWD/phase-timings.csv"
+echo "phase,kind,start,end,seconds" > $PHASE_TIMINGS_FILE
+
+# The instance's CPU utilisation (including time stolen by the hypervisor),
+# CPU frequency, memory use and disk throughput are sampled every
+# SAMPLE_INTERVAL seconds (default: 1) throughout the run, unless
+# SAMPLE_SYSTEM=false, so that they can be matched with the phase timings
+SAMPLE_SYSTEM=${SAMPLE_SYSTEM:-true}
+SAMPLE_INTERVAL=${SAMPLE_INTERVAL:-1}
+SYSTEM_SAMPLES_FILE="$PWD/system-samples.csv"
+SAMPLER_PID=""
+if [[ $SAMPLE_SYSTEM == "true" ]]
+then
+  python3 "$(find $TASK_DIR -name system_sampler.py)" $SYSTEM_SAMPLES_FILE \
+          $SAMPLE_INTERVAL &
+  SAMPLER_PID=$!
+fi
+
+# Stop sampling, once the last sample is written. A failure of the sampler
+# doesn't affect the benchmark results.
+stop_sampling () {
+  if [[ -n $SAMPLER_PID ]]
+  then
+    kill $SAMPLER_PID 2> /dev/null || true
+    wait $SAMPLER_PID || yd_print "System sampling failed"
+  fi
+}
+
+# Print the first logical CPU of each physical core
+physical_cores () {
+  cat /sys/devices/system/cpu/cpu[0-9]*/topology/thread_siblings_list | \
+    cut -d, -f1 | cut -d- -f1 | sort -nu
+}
+
+# Print the logical CPUs that aren't on the given physical cores, as a CPU list
+# for 'taskset': cpus_excluding <core> [<core> ...]
+cpus_excluding () {
+  local FILE CPU CORE
+  for FILE in /sys/devices/system/cpu/cpu[0-9]*/topology/thread_siblings_list
+  do
+    CPU=${FILE#/sys/devices/system/cpu/cpu}
+    CORE=$(cut -d, -f1 $FILE | cut -d- -f1)
+    if [[ " $* " != *" $CORE "* ]]
+    then
+      echo ${CPU%%/*}
+    fi
+  done | sort -n | paste -sd,
+}
+
+# Run a command, pinned to a CPU list if one is given:
+# pinned <cpu list> <command> ...
+pinned () {
+  local CPUS=$1
+  shift
+  if [[ -n $CPUS ]]
+  then
+    taskset -c "$CPUS" "$@"
+  else
+    "$@"
+  fi
+}
+
+# Run a phase of the benchmark run, recording its timing:
+# timed_phase <phase> <kind> <command> ...
+timed_phase () {
+  local PHASE=$1 KIND=$2 START END SECONDS_TAKEN
+  shift 2
+  START=$(date +%s.%N)
+  "$@"
+  END=$(date +%s.%N)
+  SECONDS_TAKEN=$(echo "$END - $START" | bc -l)
+  printf "%s,%s,%s,%s,%.3f\n" $PHASE $KIND $START $END $SECONDS_TAKEN \
+         >> $PHASE_TIMINGS_FILE
+}
+
+# Start a setup phase, in the background if setup overlaps the measurements:
+# start_setup <name> <command> ...
+SETUP_NAMES=()
+declare -A SETUP_PIDS=()
+start_setup () {
+  local NAME=$1
+  shift
+  SETUP_NAMES+=("$NAME")
+  if [[ $OVERLAP_SETUP == "true" ]]
+  then
+    (
+      set +e
+      ( set -e; timed_phase "$NAME" setup "$@" )
+      echo $? > "$STATE_DIR/setup-$NAME.tmp"
+      mv "$STATE_DIR/setup-$NAME.tmp" "$STATE_DIR/setup-$NAME"
+    ) &
+    SETUP_PIDS[$NAME]=$!
+  else
+    set +e
+    ( set -e; timed_phase "$NAME" setup "$@" )
+    echo $? > "$STATE_DIR/setup-$NAME"
+    set -e
+  fi
+}
+
+# Wait for a setup phase to complete, and abort if it failed, or if its
+# background process ended without recording a status (e.g., it was killed):
+# wait_for_setup <name>
+wait_for_setup () {
+  local NAME=$1
+  until [[ -f "$STATE_DIR/setup-$NAME" ]]
+  do
+    if ! kill -0 "${SETUP_PIDS[$NAME]:-}" 2> /dev/null
+    then
+      # The status may have been recorded just before the process ended
+      if [[ -f "$STATE_DIR/setup-$NAME" ]]
+      then
+        break
+      fi
+      yd_print "Setup of $NAME ended without completing. Aborting"
+      exit 1
+    fi
+    sleep 1
+  done
+  if [[ $(cat "$STATE_DIR/setup-$NAME") != "0" ]]
+  then
+    yd_print "Setup of $NAME failed. Aborting"
+    exit 1
+  fi
+}
+
+# Wait for all setup phases to complete
+wait_for_all_setup () {
+  local NAME
+  for NAME in "${SETUP_NAMES[@]}"
+  do
+    wait_for_setup "$NAME"
+  done
+  # Reap the finished background setup phases, so that the exit trap doesn't
+  # try to kill them
+  local PID
+  for PID in "${SETUP_PIDS[@]}"
+  do
+    wait $PID || true
+  done
+  SETUP_PIDS=()
+}
+
+# Choose the CPUs for the single-core measurements, one physical core for each
+# single-core benchmark if they run side by side, and for setup, on the
+# remaining cores
+CORES=($(physical_cores))
+if [[ $PARALLEL_SINGLE_CORE == "true" && ${#CORES[@]} -lt 5 ]]
+then
+  yd_print "Not running single-core benchmarks side by side" \
+           "(requires >= 5 physical cores)"
+  PARALLEL_SINGLE_CORE=false
+fi
+if [[ $PARALLEL_SINGLE_CORE == "true" ]]
+then
+  SINGLE_CORE_CPUS=("${CORES[@]:0:4}")
+else
+  SINGLE_CORE_CPUS=("${CORES[0]}")
+fi
+SETUP_CPUS=$(cpus_excluding "${SINGLE_CORE_CPUS[@]}")
+if [[ -z $SETUP_CPUS ]]
+then
+  OVERLAP_SETUP=false
+fi
+if [[ $OVERLAP_SETUP != "true" ]]
 then
-  # Single core
+  # Setup doesn't compete with the measurements, so it isn't pinned, and
+  # neither is a single-core benchmark that runs alone
+  SETUP_CPUS=""
+  if [[ $PARALLEL_SINGLE_CORE != "true" ]]
+  then
+    SINGLE_CORE_CPUS=("")
+  fi
+fi
+yd_print "Overlap setup = $OVERLAP_SETUP," \
+         "parallel single-core = $PARALLEL_SINGLE_CORE"
+
+BENCHMARK_DIR="$PWD"
+
+# Build cache  #################################################################
+
+# The benchmark sources and builds are cached as archives, keyed by benchmark
+# source revision and, for builds, compiler version and CPU architecture.
+# Archives are found in the BUILD_CACHE_DIR directory, if set, and in any
+# 'build-cache' directory under the Task directory (where archives in the
+# Object Store are downloaded as optional Task inputs). The NumPy wheels are
+# cached in the same way, keyed by NumPy version, Python version and CPU
+# architecture, and installed offline into a new venv. Sources are only
+# downloaded and built on a cache miss, and the new archive is then saved in
+# the Task's 'build-cache' directory (uploaded as a Task output) and in
+# BUILD_CACHE_DIR. If a source revision can't be resolved, e.g. without
+# network access, the most recent matching archive is used.
+#
+# The revisions of the benchmark sources can be set using COREMARK_REF,
+# COREMARK_PRO_REF and SYSBENCH_TPCC_REF (default: HEAD), and the NumPy
+# version using NUMPY_VERSION. Set BUILD_ONLY=true to populate the cache
+# without running the benchmarks.
+
+BUILD_CACHE_DIR=${BUILD_CACHE_DIR:-}
+BUILD_CACHE_OUTPUT="$TASK_DIR/build-cache"
+BUILD_ONLY=${BUILD_ONLY:-false}
+
+COREMARK_URL="https://github.com/eembc/coremark.git"
+COREMARK_PRO_URL="https://github.com/eembc/coremark-pro.git"
+SYSBENCH_TPCC_URL="https://github.com/Percona-Lab/sysbench-tpcc"
+COREMARK_REF=${COREMARK_REF:-HEAD}
+COREMARK_PRO_REF=${COREMARK_PRO_REF:-HEAD}
+SYSBENCH_TPCC_REF=${SYSBENCH_TPCC_REF:-HEAD}
+NUMPY_VERSION=${NUMPY_VERSION:-1.26.4}
+
+# Matches any abbreviated source revision in a key
+ANY_REVISION="$(printf "[0-9a-f]%.0s" {1..12})"
+
+# The suffix of the keys of builds, identifying the compiler and architecture
+BUILD_KEY_SUFFIX="gcc$(gcc -dumpfullversion)-$(uname -m)"
+
+# Print the abbreviated commit of a ref in a git repository, or nothing if it
+# can't be resolved: source_revision <url> <ref>
+source_revision () {
+  if [[ $2 =~ ^[0-9a-f]{40}$ ]]
+  then
+    echo ${2:0:12}
+  else
+    timeout 30 git ls-remote "$1" "$2" 2> /dev/null | head -1 | cut -c1-12 \
+      || true
+  fi
+}
+
+# Clone a git repository at a ref: clone_source <url> <ref> <directory>
+clone_source () {
+  git clone "$1" "$3" &> /dev/null
+  if [[ $2 != "HEAD" ]]
+  then
+    git -C "$3" checkout "$2" &> /dev/null
+  fi
+}
+
+# Print the most recent cached archive matching a key, which may include
+# wildcards, or nothing if there is none: find_cached_build <key>
+find_cached_build () {
+  {
+    if [[ -n $BUILD_CACHE_DIR && -d $BUILD_CACHE_DIR ]]
+    then
+      find "$BUILD_CACHE_DIR" -maxdepth 1 -name "$1.tar.gz" -printf "%T@ %p\n"
+    fi
+    find "$TASK_DIR" -path "*build-cache/$1.tar.gz" -printf "%T@ %p\n"
+  } | sort -nr | head -1 | cut -d" " -f2-
+}
+
+# Extract a cached archive into a directory, returning non-zero on a cache
+# miss: fetch_build <key> <directory>
+fetch_build () {
+  local ARCHIVE
+  ARCHIVE=$(find_cached_build "$1")
+  if [[ -z $ARCHIVE ]]
+  then
+    yd_print "No cached build for '$1'"
+    return 1
+  fi
+  yd_print "Using cached build '$(basename "$ARCHIVE" .tar.gz)'"
+  mkdir -p "$2"
+  tar -xzf "$ARCHIVE" -C "$2"
+}
+
+# Save an entry in a directory as a cached archive:
+# store_build <key> <directory> <entry>
+store_build () {
+  mkdir -p "$BUILD_CACHE_OUTPUT"
+  tar -czf "$BUILD_CACHE_OUTPUT/$1.tar.gz.tmp" --exclude=.git -C "$2" "$3"
+  mv "$BUILD_CACHE_OUTPUT/$1.tar.gz.tmp" "$BUILD_CACHE_OUTPUT/$1.tar.gz"
+  yd_print "Saved build '$1'"
+  if [[ -n $BUILD_CACHE_DIR ]]
+  then
+    if mkdir -p "$BUILD_CACHE_DIR" && \
+       cp "$BUILD_CACHE_OUTPUT/$1.tar.gz" "$BUILD_CACHE_DIR/$1.tar.gz.tmp" && \
+       mv "$BUILD_CACHE_DIR/$1.tar.gz.tmp" "$BUILD_CACHE_DIR/$1.tar.gz"
+    then
+      :
+    else
+      yd_print "Unable to save build '$1' in '$BUILD_CACHE_DIR'"
+    fi
+  fi
+}
+
+# Setup phases  ################################################################
+
+setup_mysql_tpcc () (
+  if [[ $BUILD_ONLY != "true" ]]
+  then
+    yd_print "Installing package 'mysql-server'"
+    pinned "$SETUP_CPUS" sudo apt-get install -y mysql-server &> /dev/null
+  fi
+  mkdir -p "$BENCHMARK_DIR/sysbench"
+  cd "$BENCHMARK_DIR/sysbench" || exit
+  REVISION=$(source_revision $SYSBENCH_TPCC_URL $SYSBENCH_TPCC_REF)
+  if ! fetch_build "sysbench-tpcc-${REVISION:-$ANY_REVISION}" .
+  then
+    yd_print "Downloading the Percona TPC-C sysbench scripts from GitHub"
+    clone_source $SYSBENCH_TPCC_URL $SYSBENCH_TPCC_REF sysbench-tpcc
+    REVISION=$(git -C sysbench-tpcc rev-parse --short=12 HEAD)
+    store_build "sysbench-tpcc-$REVISION" . sysbench-tpcc
+  fi
+)
+
+# CoreMark is compiled for each run, with the thread count, so only its
+# source is cached
+setup_coremark () (
+  cd "$BENCHMARK_DIR" || exit
+  REVISION=$(source_revision $COREMARK_URL $COREMARK_REF)
+  if ! fetch_build "coremark-${REVISION:-$ANY_REVISION}" .
+  then
+    yd_print "Downloading CoreMark from GitHub"
+    clone_source $COREMARK_URL $COREMARK_REF coremark
+    REVISION=$(git -C coremark rev-parse --short=12 HEAD)
+    store_build "coremark-$REVISION" . coremark
+  fi
+)
+
+setup_coremark_pro () (
+  cd "$BENCHMARK_DIR" || exit
+  REVISION=$(source_revision $COREMARK_PRO_URL $COREMARK_PRO_REF)
+  if ! fetch_build "coremark-pro-${REVISION:-$ANY_REVISION}-$BUILD_KEY_SUFFIX" .
+  then
+    yd_print "Downloading CoreMark Pro from GitHub"
+    clone_source $COREMARK_PRO_URL $COREMARK_PRO_REF coremark-pro
+    REVISION=$(git -C coremark-pro rev-parse --short=12 HEAD)
+    cd coremark-pro || exit
+    yd_print "Building CoreMark Pro"
+    pinned "$SETUP_CPUS" make build &> build_output.txt
+    cd ..
+    store_build "coremark-pro-$REVISION-$BUILD_KEY_SUFFIX" . coremark-pro
+  fi
+)
+
+# The LINPACK revision covers its source and compiler flags, and also the CPU
+# model if the flags target the build CPU ('-march=native')
+setup_linpack () (
+  mkdir -p "$BENCHMARK_DIR/linpack"
+  cd "$BENCHMARK_DIR/linpack" || exit
+  LINPACK_SOURCE="$(find $TASK_DIR -name linpack_bench.c)"
+  REVISION=$({ cat "$LINPACK_SOURCE"; echo "$LINPACK_CFLAGS"; \
+               if [[ $LINPACK_CFLAGS == *native* ]]; then echo "$CPU_MODEL"; fi; \
+             } | sha256sum | cut -c1-12)
+  if ! fetch_build "linpack-$REVISION-$BUILD_KEY_SUFFIX" .
+  then
+    yd_print "Compiling LINPACK"
+    pinned "$SETUP_CPUS" gcc $LINPACK_CFLAGS "$LINPACK_SOURCE" -o linpack -lm
+    store_build "linpack-$REVISION-$BUILD_KEY_SUFFIX" . linpack
+  fi
+)
+
+setup_stream () (
+  mkdir -p "$BENCHMARK_DIR/stream"
+  cd "$BENCHMARK_DIR/stream" || exit
+  STREAM_SOURCE="$(find $TASK_DIR -name stream_bench.c)"
+  REVISION=$({ cat "$STREAM_SOURCE"; echo "$STREAM_CFLAGS"; \
+               if [[ $STREAM_CFLAGS == *native* ]]; then echo "$CPU_MODEL"; fi; \
+             } | sha256sum | cut -c1-12)
+  if ! fetch_build "stream-$REVISION-$BUILD_KEY_SUFFIX" .
+  then
+    yd_print "Compiling STREAM"
+    pinned "$SETUP_CPUS" gcc $STREAM_CFLAGS "$STREAM_SOURCE" -o stream -lm
+    store_build "stream-$REVISION-$BUILD_KEY_SUFFIX" . stream
+  fi
+)
+
+setup_numpy_linalg () (
+  mkdir -p "$BENCHMARK_DIR/numpy-linalg"
+  cd "$BENCHMARK_DIR/numpy-linalg" || exit
+  python3 -m venv py
+  KEY="numpy-$NUMPY_VERSION-$(py/bin/python -c \
+      "import sys; print(sys.implementation.cache_tag)")-$(uname -m)"
+  if ! fetch_build "$KEY" .
+  then
+    yd_print "Downloading NumPy"
+    pinned "$SETUP_CPUS" py/bin/pip wheel -q -w numpy-wheels \
+        numpy==$NUMPY_VERSION
+    store_build "$KEY" . numpy-wheels
+  fi
+  yd_print "Installing NumPy"
+  pinned "$SETUP_CPUS" py/bin/pip install -q --no-index \
+      --find-links numpy-wheels numpy==$NUMPY_VERSION
+)
+
+# Measurement phases  ##########################################################
+
+# Each measurement runs in a subshell, from the benchmark directory. The
+# single-core measurements take the CPU list to pin to as their argument.
+
+run_sysbench_singlecore () (
+  cd "$BENCHMARK_DIR" || exit
   SYSBENCH_CMD="sysbench cpu --cpu-max-prime=100000 run"
-  yd_print "Running sysbench single core"
   mkdir -p sysbench
   cd sysbench || exit
-  OUTPUT="sysbench-singlecore_out.txt"
-  echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
-  echo >> $OUTPUT
-  echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
-  echo >> $OUTPUT
-  $SYSBENCH_CMD >> $OUTPUT
-  SYSBENCH_SINGLE=$(cat $OUTPUT | \
-      grep "events per second" | awk '{print $4}')
-  echo -n ", $SYSBENCH_SINGLE" >> $CSV_SUMMARY_FILE
-  cd ..
-
-  # Multicore
+  SYSBENCH_SINGLE=()
+  for TRIAL in $(seq $TRIALS_SYSBENCH)
+  do
+    yd_print "Running sysbench single core (trial $TRIAL of $TRIALS_SYSBENCH)"
+    OUTPUT="sysbench-singlecore-trial${TRIAL}_out.txt"
+    echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
+    echo >> $OUTPUT
+    echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
+    echo >> $OUTPUT
+    pinned "$1" $SYSBENCH_CMD >> $OUTPUT
+    VALUE=$(parse_result sysbench-singlecore $TRIAL $OUTPUT events_per_second)
+    SYSBENCH_SINGLE+=("$VALUE")
+  done
+  summarise_trials sysbench-singlecore "${SYSBENCH_SINGLE[@]}"
+)
+
+run_sysbench_multicore () (
+  cd "$BENCHMARK_DIR" || exit
   SYSBENCH_CMD="sysbench --threads=$VCPUS cpu --cpu-max-prime=100000 run"
-  yd_print "Running sysbench multicore with" $VCPUS "threads"
   mkdir -p sysbench
   cd sysbench || exit
-  OUTPUT="sysbench-multicore_out.txt"
-  echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
-  echo "VCPUs =" $VCPUS >> $OUTPUT
-  echo >> $OUTPUT
-  echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
-  echo >> $OUTPUT
-  $SYSBENCH_CMD >> $OUTPUT
-  SYSBENCH_MULTI=$(cat $OUTPUT | \
-      grep "events per second" | awk '{print $4}')
-  echo -n ", $SYSBENCH_MULTI" >> $CSV_SUMMARY_FILE
-  cd ..
-
-  # Memory
+  SYSBENCH_MULTI=()
+  for TRIAL in $(seq $TRIALS_SYSBENCH)
+  do
+    yd_print "Running sysbench multicore with" $VCPUS "threads" \
+             "(trial $TRIAL of $TRIALS_SYSBENCH)"
+    OUTPUT="sysbench-multicore-trial${TRIAL}_out.txt"
+    echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
+    echo "VCPUs =" $VCPUS >> $OUTPUT
+    echo >> $OUTPUT
+    echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
+    echo >> $OUTPUT
+    $SYSBENCH_CMD >> $OUTPUT
+    VALUE=$(parse_result sysbench-multicore $TRIAL $OUTPUT events_per_second)
+    SYSBENCH_MULTI+=("$VALUE")
+  done
+  summarise_trials sysbench-multicore "${SYSBENCH_MULTI[@]}"
+)
+
+# Run sysbench CPU at each thread count in the sweep, recording the sweep as a
+# single trial
+run_sysbench_scaling () (
+  cd "$BENCHMARK_DIR/sysbench" || exit
+  OUTPUT="sysbench-scaling_out.txt"
+  echo "Instance Type = $INSTANCE_TYPE" > $OUTPUT
+  echo "VCPUs = $VCPUS" >> $OUTPUT
+  for THREADS in $SWEEP_THREADS
+  do
+    yd_print "Running sysbench scaling with $THREADS threads"
+    echo >> $OUTPUT
+    echo "Threads = $THREADS" >> $OUTPUT
+    sysbench --threads=$THREADS cpu --cpu-max-prime=100000 run >> $OUTPUT
+  done
+  parse_result sysbench-scaling 1 $OUTPUT > /dev/null
+)
+
+run_sysbench_memory () (
+  cd "$BENCHMARK_DIR" || exit
   SYSBENCH_CMD="sysbench --memory-block-size=1M --memory-total-size=10G \
   --threads=$VCPUS memory run"
-  yd_print "Running sysbench memory test"
   mkdir -p sysbench
   cd sysbench || exit
-  OUTPUT="sysbench-memory_out.txt"
-  echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
-  echo "VCPUs =" $VCPUS >> $OUTPUT
-  echo >> $OUTPUT
-  echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
-  echo >> $OUTPUT
-  $SYSBENCH_CMD >> $OUTPUT
-  SYSBENCH_MEMORY=$(cat $OUTPUT | \
-    grep "Total operations" | awk '{print $4}' | tr -d "(")
-  echo -n ", $SYSBENCH_MEMORY" >> $CSV_SUMMARY_FILE
-  cd ..
-
-  # Storage
+  SYSBENCH_MEMORY=()
+  for TRIAL in $(seq $TRIALS_SYSBENCH)
+  do
+    yd_print "Running sysbench memory test (trial $TRIAL of $TRIALS_SYSBENCH)"
+    OUTPUT="sysbench-memory-trial${TRIAL}_out.txt"
+    echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
+    echo "VCPUs =" $VCPUS >> $OUTPUT
+    echo >> $OUTPUT
+    echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
+    echo >> $OUTPUT
+    $SYSBENCH_CMD >> $OUTPUT
+    VALUE=$(parse_result sysbench-memory $TRIAL $OUTPUT operations_per_second)
+    SYSBENCH_MEMORY+=("$VALUE")
+  done
+  summarise_trials sysbench-memory "${SYSBENCH_MEMORY[@]}"
+)
+
+# Run the storage matrix on the prepared test files, recording it as a single
+# trial: each access pattern, block size, thread count and I/O mode in turn
+run_sysbench_storage_matrix () {
+  local OUTPUT="sysbench-storage-matrix_out.txt" MODE BLOCK_KIB THREADS IO FLAGS
+  yd_print "Running sysbench storage matrix: modes ($STORAGE_MODES)," \
+           "block sizes ($STORAGE_BLOCK_SIZES KiB), threads" \
+           "($STORAGE_THREADS), I/O ($STORAGE_IO), $STORAGE_MATRIX_TIME" \
+           "seconds each"
+  echo "Instance Type = $INSTANCE_TYPE" > $OUTPUT
+  echo "File size = $STORAGE_FILE_SIZE" >> $OUTPUT
+  echo "Run time = $STORAGE_MATRIX_TIME" >> $OUTPUT
+  for IO in $STORAGE_IO
+  do
+    FLAGS=""
+    if [[ $IO == "direct" ]]
+    then
+      FLAGS="--file-extra-flags=direct"
+    fi
+    for MODE in $STORAGE_MODES
+    do
+      for BLOCK_KIB in $STORAGE_BLOCK_SIZES
+      do
+        for THREADS in $STORAGE_THREADS
+        do
+          echo >> $OUTPUT
+          echo "Configuration: mode=$MODE block_kib=$BLOCK_KIB" \
+               "threads=$THREADS io=$IO" >> $OUTPUT
+          sysbench --file-total-size=$STORAGE_FILE_SIZE --file-test-mode=$MODE \
+              --file-block-size=$((BLOCK_KIB * 1024)) --threads=$THREADS \
+              --time=$STORAGE_MATRIX_TIME --max-requests=0 $FLAGS fileio run \
+              >> $OUTPUT 2>&1 || yd_print "sysbench fileio failed: $MODE," \
+                                          "$BLOCK_KIB KiB, $THREADS threads, $IO"
+        done
+      done
+    done
+  done
+  parse_result sysbench-storage-matrix 1 $OUTPUT > /dev/null
+}
+
+run_sysbench_storage () (
+  mkdir -p "$STORAGE_DIR"
+  cd "$STORAGE_DIR" || exit
   # 60 second test run
-  SYSBENCH_CMD="sysbench --file-total-size=1G --file-test-mode=rndrw --time=60 \
-  --threads=$VCPUS --max-requests=0 fileio run"
-  yd_print "Running sysbench storage test"
-  mkdir -p sysbench
-  cd sysbench || exit
+  SYSBENCH_CMD="sysbench --file-total-size=$STORAGE_FILE_SIZE \
+  --file-test-mode=rndrw --time=60 --threads=$VCPUS --max-requests=0 fileio run"
   # Create test files
-  sysbench --file-total-size=1G fileio prepare > /dev/null
-  OUTPUT="sysbench-storage_out.txt"
-  echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
-  echo "VCPUs =" $VCPUS >> $OUTPUT
-  echo >> $OUTPUT
-  echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
-  echo >> $OUTPUT
-  # Run the benchmark
-  $SYSBENCH_CMD >> $OUTPUT
+  yd_print "Creating $STORAGE_FILE_SIZE of test files in '$STORAGE_DIR'"
+  sysbench --file-total-size=$STORAGE_FILE_SIZE fileio prepare > /dev/null
+  SYSBENCH_STORAGE_READS_SEC=()
+  SYSBENCH_STORAGE_WRITES_SEC=()
+  SYSBENCH_STORAGE_FSYNCS_SEC=()
+  for TRIAL in $(seq $TRIALS_SYSBENCH)
+  do
+    yd_print "Running sysbench storage test (trial $TRIAL of $TRIALS_SYSBENCH)"
+    OUTPUT="sysbench-storage-trial${TRIAL}_out.txt"
+    echo "Instance Type =" $INSTANCE_TYPE > $OUTPUT
+    echo "VCPUs =" $VCPUS >> $OUTPUT
+    echo >> $OUTPUT
+    echo "sysbench Command:" $SYSBENCH_CMD >> $OUTPUT
+    echo >> $OUTPUT
+    # Run the benchmark
+    $SYSBENCH_CMD >> $OUTPUT
+    mapfile -t VALUES < <(parse_result sysbench-storage $TRIAL $OUTPUT \
+        reads_per_second writes_per_second fsyncs_per_second)
+    SYSBENCH_STORAGE_READS_SEC+=("${VALUES[0]:-}")
+    SYSBENCH_STORAGE_WRITES_SEC+=("${VALUES[1]:-}")
+    SYSBENCH_STORAGE_FSYNCS_SEC+=("${VALUES[2]:-}")
+  done
+  if [[ $STORAGE_MATRIX == "true" ]]
+  then
+    run_sysbench_storage_matrix
+  fi
   # Cleanup test files
-  sysbench --file-total-size=1G fileio cleanup > /dev/null
-  SYSBENCH_STORAGE_READS_SEC=$(cat $OUTPUT | \
-      grep "reads/s" | awk '{print $2}')
-  SYSBENCH_STORAGE_WRITES_SEC=$(cat $OUTPUT | \
-      grep "writes/s" | awk '{print $2}')
-  SYSBENCH_STORAGE_FSYNCS_SEC=$(cat $OUTPUT | \
-      grep "fsyncs/s" | awk '{print $2}')
-  echo -n ", $SYSBENCH_STORAGE_READS_SEC, $SYSBENCH_STORAGE_WRITES_SEC,\
-  $SYSBENCH_STORAGE_FSYNCS_SEC" >> $CSV_SUMMARY_FILE
-  cd ..
-  echo
-fi
+  sysbench --file-total-size=$STORAGE_FILE_SIZE fileio cleanup > /dev/null
+  if [[ $STORAGE_DIR != "$BENCHMARK_DIR/sysbench" ]]
+  then
+    mv *_out.txt "$BENCHMARK_DIR/sysbench/"
+  fi
+  summarise_trials sysbench-storage-reads "${SYSBENCH_STORAGE_READS_SEC[@]}"
+  summarise_trials sysbench-storage-writes "${SYSBENCH_STORAGE_WRITES_SEC[@]}"
+  summarise_trials sysbench-storage-fsyncs "${SYSBENCH_STORAGE_FSYNCS_SEC[@]}"
+)
+
+run_mysql_tpcc () (
+  cd "$BENCHMARK_DIR/sysbench/sysbench-tpcc" || exit
+  yd_print "Running sysbench MySQL TPC-C"
+  yd_print "Creating the database"
+  DB_NAME=sysbench
+  DB_USER=root
+  sudo mysql -u $DB_USER -e "CREATE DATABASE $DB_NAME"
+  # Benchmark scaling parameters
+  DB_TABLES=1
+  DB_SCALE=1
+  DB_SETUP_TIME=30
+  DB_RUN_TIME=30
+  DB_THREADS=16
+  yd_print "Using: tables=$DB_TABLES, scale=$DB_SCALE, threads=$DB_THREADS"
+  # Setup the state
+  yd_print "Setting up data"
+  DB_SOCKET=$(sudo mysqladmin -u root variables | \
+              grep " socket " | awk '{print $4}')
+  sudo ./tpcc.lua --mysql-socket=$DB_SOCKET --mysql-user=$DB_USER \
+        --mysql-db=$DB_NAME --time=$DB_SETUP_TIME --threads=$DB_THREADS \
+        --report-interval=1 \
+        --tables=$DB_TABLES --scale=$DB_SCALE --db-driver=mysql prepare \
+        > /dev/null
+  SYSBENCH_MYSQL_TPCC_TPS=()
+  for TRIAL in $(seq $TRIALS_MYSQL_TPCC)
+  do
+    yd_print "Running the benchmark (trial $TRIAL of $TRIALS_MYSQL_TPCC)"
+    OUTPUT="sysbench-mysql-tpcc-trial${TRIAL}_out.txt"
+    sudo ./tpcc.lua --mysql-socket=$DB_SOCKET --mysql-user=$DB_USER \
+          --mysql-db=$DB_NAME --time=$DB_RUN_TIME --threads=$DB_THREADS \
+          --report-interval=1 \
+          --tables=$DB_TABLES --scale=$DB_SCALE --db-driver=mysql run \
+          > $OUTPUT
+    VALUE=$(parse_result mysql-tpcc $TRIAL $OUTPUT transactions_per_second)
+    yd_print "Transactions per Second = $VALUE"
+    SYSBENCH_MYSQL_TPCC_TPS+=("$VALUE")
+  done
+  yd_print "Deleting database contents"
+  sudo mysql -u $DB_USER -e "DROP DATABASE IF EXISTS $DB_NAME"
+  summarise_trials mysql-tpcc "${SYSBENCH_MYSQL_TPCC_TPS[@]}"
+)
+
+# Each run of 'make' performs two timed runs of CoreMark, the performance run
+# ('run1.log') and the validation run ('run2.log'), and both are recorded as
+# trials
+
+run_coremark_singlecore () (
+  cd "$BENCHMARK_DIR/coremark" || exit
+  COREMARK_SINGLE=()
+  for TRIAL in $(seq $TRIALS_COREMARK_STD)
+  do
+    yd_print "Running CoreMark single threaded" \
+             "(trial $TRIAL of $TRIALS_COREMARK_STD)"
+    pinned "$1" make &>> build_output.txt
+    for RUN in 1 2
+    do
+      OUTPUT="singlecore-trial${TRIAL}-run${RUN}_out.txt"
+      sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run$RUN.log
+      mv run$RUN.log $OUTPUT
+      VALUE=$(parse_result coremark-singlecore $TRIAL $OUTPUT score)
+      COREMARK_SINGLE+=("$VALUE")
+    done
+  done
+  summarise_trials coremark-singlecore "${COREMARK_SINGLE[@]}"
+)
+
+run_coremark_multicore () (
+  cd "$BENCHMARK_DIR/coremark" || exit
+  make clean > /dev/null
+  COREMARK_MULTI=()
+  for TRIAL in $(seq $TRIALS_COREMARK_STD)
+  do
+    yd_print "Running CoreMark with" $VCPUS "threads" \
+             "(trial $TRIAL of $TRIALS_COREMARK_STD)"
+    make XCFLAGS="-DMULTITHREAD=$VCPUS -DUSE_PTHREAD -pthread" \
+         &>> build_output.txt
+    for RUN in 1 2
+    do
+      OUTPUT="multicore-trial${TRIAL}-run${RUN}_out.txt"
+      sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run$RUN.log
+      mv run$RUN.log $OUTPUT
+      VALUE=$(parse_result coremark-multicore $TRIAL $OUTPUT score)
+      COREMARK_MULTI+=("$VALUE")
+    done
+  done
+  summarise_trials coremark-multicore "${COREMARK_MULTI[@]}"
+)
+
+# Build and run CoreMark at each thread count in the sweep, recording the
+# performance runs as a single trial
+run_coremark_scaling () (
+  cd "$BENCHMARK_DIR/coremark" || exit
+  OUTPUT="scaling_out.txt"
+  echo "Instance Type = $INSTANCE_TYPE" > $OUTPUT
+  echo "VCPUs = $VCPUS" >> $OUTPUT
+  for THREADS in $SWEEP_THREADS
+  do
+    yd_print "Running CoreMark scaling with $THREADS threads"
+    make clean > /dev/null
+    make XCFLAGS="-DMULTITHREAD=$THREADS -DUSE_PTHREAD -pthread" \
+         &>> build_output.txt
+    echo >> $OUTPUT
+    echo "Threads = $THREADS" >> $OUTPUT
+    cat run1.log >> $OUTPUT
+  done
+  parse_result coremark-scaling 1 $OUTPUT > /dev/null
+)
+
+run_coremark_pro () (
+  cd "$BENCHMARK_DIR/coremark-pro" || exit
+  COREMARK_PRO_SINGLE=()
+  COREMARK_PRO_MULTI=()
+  for TRIAL in $(seq $TRIALS_COREMARK_PRO)
+  do
+    yd_print "Running CoreMark Pro (trial $TRIAL of $TRIALS_COREMARK_PRO)"
+    make TARGET=linux64 XCMD='-c4' certify-all &> benchmark_output.txt
+    OUTPUT="coremark-pro-trial${TRIAL}_out.txt"
+    awk '/WORKLOAD/,/CoreMark-PRO/' benchmark_output.txt > $OUTPUT
+    sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
+    mapfile -t VALUES < <(parse_result coremark-pro $TRIAL $OUTPUT \
+        single_core multi_core)
+    COREMARK_PRO_SINGLE+=("${VALUES[0]:-}")
+    COREMARK_PRO_MULTI+=("${VALUES[1]:-}")
+  done
+  summarise_trials coremark-pro-singlecore "${COREMARK_PRO_SINGLE[@]}"
+  summarise_trials coremark-pro-multicore "${COREMARK_PRO_MULTI[@]}"
+)
 
-# Run MySQL TPC-C (Sysbench)  ##################################################
+# Run LINPACK with a number of threads: run_linpack <test> <threads> <cpu list>
+run_linpack () (
+  cd "$BENCHMARK_DIR/linpack" || exit
+  LINPACK_MFLOPS=()
+  for TRIAL in $(seq $TRIALS_LINPACK)
+  do
+    yd_print "Running LINPACK with N = $LINPACK_N and $2 thread(s)" \
+             "(trial $TRIAL of $TRIALS_LINPACK)"
+    OUTPUT="$1-trial${TRIAL}_out.txt"
+    OMP_NUM_THREADS=$2 pinned "$3" ./linpack $LINPACK_N > $OUTPUT
+    sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
+    VALUE=$(parse_result $1 $TRIAL $OUTPUT mflops)
+    LINPACK_MFLOPS+=("$VALUE")
+  done
+  summarise_trials $1 "${LINPACK_MFLOPS[@]}"
+)
 
+run_linpack_singlecore () {
+  run_linpack linpack-singlecore 1 "$1"
+}
+
+run_linpack_multicore () {
+  run_linpack linpack-multicore $VCPUS ""
+}
+
+# Run the NumPy linear solve with a number of BLAS threads:
+# run_numpy_linalg <test> <threads> <cpu list>
+run_numpy_linalg () (
+  cd "$BENCHMARK_DIR/numpy-linalg" || exit
+  NUMPY_LINALG_MFLOPS=()
+  for TRIAL in $(seq $TRIALS_NUMPY_LINALG)
+  do
+    yd_print "Running NumPy linear solve with N = $LINPACK_N and $2" \
+             "thread(s) (trial $TRIAL of $TRIALS_NUMPY_LINALG)"
+    OUTPUT="$1-trial${TRIAL}_out.txt"
+    OMP_NUM_THREADS=$2 OPENBLAS_NUM_THREADS=$2 MKL_NUM_THREADS=$2 \
+        pinned "$3" py/bin/python "$(find $TASK_DIR -name numpy_linalg.py)" \
+        $LINPACK_N > $OUTPUT
+    sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
+    VALUE=$(parse_result $1 $TRIAL $OUTPUT mflops)
+    NUMPY_LINALG_MFLOPS+=("$VALUE")
+  done
+  summarise_trials $1 "${NUMPY_LINALG_MFLOPS[@]}"
+)
+
+run_numpy_linalg_singlecore () {
+  run_numpy_linalg numpy-linalg-singlecore 1 "$1"
+}
+
+run_numpy_linalg_multicore () {
+  run_numpy_linalg numpy-linalg-multicore $VCPUS ""
+}
+
+run_stream () (
+  cd "$BENCHMARK_DIR/stream" || exit
+  STREAM_COPY=()
+  STREAM_SCALE=()
+  STREAM_ADD=()
+  STREAM_TRIAD=()
+  for TRIAL in $(seq $TRIALS_STREAM)
+  do
+    yd_print "Running STREAM with $STREAM_ARRAY_SIZE elements and $VCPUS" \
+             "threads, and latency up to $STREAM_LATENCY_MAX_KIB KiB" \
+             "(trial $TRIAL of $TRIALS_STREAM)"
+    OUTPUT="stream-trial${TRIAL}_out.txt"
+    OMP_NUM_THREADS=$VCPUS OMP_PROC_BIND=spread \
+        ./stream $STREAM_ARRAY_SIZE $STREAM_LATENCY_MAX_KIB > $OUTPUT
+    sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
+    mapfile -t VALUES < <(parse_result stream $TRIAL $OUTPUT \
+        copy_mb_s scale_mb_s add_mb_s triad_mb_s)
+    STREAM_COPY+=("${VALUES[0]:-}")
+    STREAM_SCALE+=("${VALUES[1]:-}")
+    STREAM_ADD+=("${VALUES[2]:-}")
+    STREAM_TRIAD+=("${VALUES[3]:-}")
+  done
+  summarise_trials stream-copy "${STREAM_COPY[@]}"
+  summarise_trials stream-scale "${STREAM_SCALE[@]}"
+  summarise_trials stream-add "${STREAM_ADD[@]}"
+  summarise_trials stream-triad "${STREAM_TRIAD[@]}"
+)
+
+# Run a single-core benchmark once its setup is complete:
+# run_singlecore <name> <setup name or ''> <cpu list> <function>
+run_singlecore () {
+  local NAME=$1 SETUP=$2 CPUS=$3 FUNCTION=$4
+  if [[ -n $SETUP ]]
+  then
+    wait_for_setup "$SETUP"
+  fi
+  timed_phase "$NAME" measure $FUNCTION "$CPUS"
+}
+
+# Schedule the selected benchmarks  ############################################
+
+# The summary columns, in summary line order
+SUMMARY_COLUMNS=()
+
+if [[ $BENCHMARKS == *$N_SYSBENCH* ]]
+then
+  SUMMARY_COLUMNS+=(sysbench-singlecore sysbench-multicore sysbench-memory \
+                    sysbench-storage-reads sysbench-storage-writes \
+                    sysbench-storage-fsyncs)
+fi
 if [[ $BENCHMARKS == *$N_MYSQL_TPCC* ]]
 then
+  SUMMARY_COLUMNS+=(mysql-tpcc)
   # MySQL TPC-C : Requires >= 2GB RAM
   if (( $(echo "$RAM >= 2.0" | bc -l) ))
   then
-    yd_print "Running sysbench MySQL TPC-C"
-    yd_print "Installing package 'mysql-server'"
-    sudo apt-get install -y mysql-server &> /dev/null
-    mkdir -p sysbench
-    cd sysbench || exit
-    OUTPUT="sysbench-mysql-tpcc_out.txt"
-    yd_print "Downloading the Percona TPC-C sysbench scripts from GitHub"
-    git clone https://github.com/Percona-Lab/sysbench-tpcc &> /dev/null
-    cd sysbench-tpcc || exit
-    yd_print "Creating the database"
-    DB_NAME=sysbench
-    DB_USER=root
-    sudo mysql -u $DB_USER -e "CREATE DATABASE $DB_NAME"
-    # Benchmark scaling parameters
-    DB_TABLES=1
-    DB_SCALE=1
-    DB_SETUP_TIME=30
-    DB_RUN_TIME=30
-    DB_THREADS=16
-    yd_print "Using: tables=$DB_TABLES, scale=$DB_SCALE, threads=$DB_THREADS"
-    # Setup the state
-    yd_print "Setting up data"
-    DB_SOCKET=$(sudo mysqladmin -u root variables | \
-                grep " socket " | awk '{print $4}')
-    sudo ./tpcc.lua --mysql-socket=$DB_SOCKET --mysql-user=$DB_USER \
-          --mysql-db=$DB_NAME --time=$DB_SETUP_TIME --threads=$DB_THREADS \
-          --report-interval=1 \
-          --tables=$DB_TABLES --scale=$DB_SCALE --db-driver=mysql prepare \
-          > /dev/null
-    yd_print "Running the benchmark"
-    sudo ./tpcc.lua --mysql-socket=$DB_SOCKET --mysql-user=$DB_USER \
-          --mysql-db=$DB_NAME --time=$DB_RUN_TIME --threads=$DB_THREADS \
-          --report-interval=1 \
-          --tables=$DB_TABLES --scale=$DB_SCALE --db-driver=mysql run \
-          > $OUTPUT
-    yd_print "Deleting database contents"
-    sudo mysql -u $DB_USER -e "DROP DATABASE IF EXISTS $DB_NAME"
-    SYSBENCH_MYSQL_TPCC_TPS=$(cat $OUTPUT | \
-        grep "transactions:" | awk '{print $3}' | sed -e 's/(//')
-    cd ../..
+    start_setup mysql-tpcc setup_mysql_tpcc
   else
     yd_print "Not running MySQL TPC-C (requires >= 2.0GB of RAM)"
-    SYSBENCH_MYSQL_TPCC_TPS="0"
+    summarise_trials mysql-tpcc "0"
   fi
-  yd_print "Transactions per Second = $SYSBENCH_MYSQL_TPCC_TPS"
-  echo -n ", $SYSBENCH_MYSQL_TPCC_TPS" >> $CSV_SUMMARY_FILE
-  echo
+fi
+if [[ $BENCHMARKS == *$N_COREMARK_STD* ]]
+then
+  SUMMARY_COLUMNS+=(coremark-singlecore coremark-multicore)
+  start_setup coremark setup_coremark
+fi
+if [[ $BENCHMARKS == *$N_COREMARK_PRO* ]]
+then
+  SUMMARY_COLUMNS+=(coremark-pro-singlecore coremark-pro-multicore)
+  start_setup coremark-pro setup_coremark_pro
+fi
+if [[ $BENCHMARKS == *$N_LINPACK* ]]
+then
+  SUMMARY_COLUMNS+=(linpack-singlecore linpack-multicore)
+  start_setup linpack setup_linpack
+fi
+if [[ $BENCHMARKS == *$N_NUMPY_LINALG* ]]
+then
+  SUMMARY_COLUMNS+=(numpy-linalg-singlecore numpy-linalg-multicore)
+  start_setup numpy-linalg setup_numpy_linalg
+fi
+if [[ $BENCHMARKS == *$N_STREAM* ]]
+then
+  SUMMARY_COLUMNS+=(stream-copy stream-scale stream-add stream-triad)
+  start_setup stream setup_stream
+fi
+echo
+
+# When only populating the build cache, no benchmarks are run, and there are
+# no results
+if [[ $BUILD_ONLY == "true" ]]
+then
+  wait_for_all_setup
+  stop_sampling
+  rm -f $CSV_SUMMARY_FILE $RESULTS_FILE $SYSTEM_SAMPLES_FILE
+  yd_print "Build cache populated"
+  exit 0
 fi
 
-# Run CoreMark  ################################################################
+# The single-core measurements, overlapping any setup still in progress
+SINGLE_CORE_PIDS=()
+SINGLE_CORE_INDEX=0
+for BENCHMARK in sysbench-singlecore coremark-singlecore linpack-singlecore \
+                 numpy-linalg-singlecore
+do
+  case $BENCHMARK in
+    sysbench-singlecore)
+      SELECTED=$N_SYSBENCH; SETUP=""; FUNCTION=run_sysbench_singlecore ;;
+    coremark-singlecore)
+      SELECTED=$N_COREMARK_STD; SETUP=coremark
+      FUNCTION=run_coremark_singlecore ;;
+    linpack-singlecore)
+      SELECTED=$N_LINPACK; SETUP=linpack; FUNCTION=run_linpack_singlecore ;;
+    numpy-linalg-singlecore)
+      SELECTED=$N_NUMPY_LINALG; SETUP=numpy-linalg
+      FUNCTION=run_numpy_linalg_singlecore ;;
+  esac
+  if [[ $BENCHMARKS != *$SELECTED* ]]
+  then
+    continue
+  fi
+  if [[ $PARALLEL_SINGLE_CORE == "true" ]]
+  then
+    run_singlecore $BENCHMARK "$SETUP" \
+        "${SINGLE_CORE_CPUS[$SINGLE_CORE_INDEX]}" $FUNCTION &
+    SINGLE_CORE_PIDS+=($!)
+    SINGLE_CORE_INDEX=$((SINGLE_CORE_INDEX + 1))
+  else
+    run_singlecore $BENCHMARK "$SETUP" "${SINGLE_CORE_CPUS[0]}" $FUNCTION
+  fi
+done
+for PID in "${SINGLE_CORE_PIDS[@]}"
+do
+  wait $PID
+done
+echo
 
+# The multi-core measurements, once all setup is complete
+wait_for_all_setup
+if [[ $BENCHMARKS == *$N_SYSBENCH* ]]
+then
+  timed_phase sysbench-multicore measure run_sysbench_multicore
+  if [[ $THREAD_SWEEP == "true" ]]
+  then
+    timed_phase sysbench-scaling measure run_sysbench_scaling
+  fi
+  timed_phase sysbench-memory measure run_sysbench_memory
+  timed_phase sysbench-storage measure run_sysbench_storage
+  echo
+fi
+if [[ $BENCHMARKS == *$N_MYSQL_TPCC* ]] && (( $(echo "$RAM >= 2.0" | bc -l) ))
+then
+  timed_phase mysql-tpcc measure run_mysql_tpcc
+  echo
+fi
 if [[ $BENCHMARKS == *$N_COREMARK_STD* ]]
 then
-  yd_print "Downloading CoreMark from GitHub"
-  git clone https://github.com/eembc/coremark.git &> /dev/null
-
-  # Single core
-  cd coremark || exit
-  yd_print "Running CoreMark single threaded"
-  make &> build_output.txt
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run1.log
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run2.log
-  mv run1.log singlecore-run1_out.txt
-  mv run2.log singlecore-run2_out.txt
-  COREMARK_SINGLE=$(cat ./singlecore-run1_out.txt | \
-    grep "CoreMark 1.0" | awk '{print $4}')
-  echo -n ", $COREMARK_SINGLE" >> $CSV_SUMMARY_FILE
-  cd ..
-
-  # Multicore
-  cd coremark || exit
-  make clean > /dev/null
-  yd_print "Running CoreMark with" $VCPUS "threads"
-  make XCFLAGS="-DMULTITHREAD=$VCPUS -DUSE_PTHREAD -pthread" &>> build_output.txt
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run1.log
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" run2.log
-  mv run1.log multicore-run1_out.txt
-  mv run2.log multicore-run2_out.txt
-  COREMARK_MULTI=$(cat ./multicore-run1_out.txt | \
-      grep "CoreMark 1.0" | awk '{print $4}')
-  echo -n ", $COREMARK_MULTI" >> $CSV_SUMMARY_FILE
-  cd ..
+  timed_phase coremark-multicore measure run_coremark_multicore
+  if [[ $THREAD_SWEEP == "true" ]]
+  then
+    timed_phase coremark-scaling measure run_coremark_scaling
+  fi
   echo
 fi
-
-# Run CoreMark Pro  ############################################################
-
 if [[ $BENCHMARKS == *$N_COREMARK_PRO* ]]
 then
-  yd_print "Downloading CoreMark Pro from GitHub"
-  git clone https://github.com/eembc/coremark-pro.git &> /dev/null
-  cd coremark-pro || exit
-  yd_print "Building CoreMark Pro"
-  make build &> build_output.txt
-  yd_print "Running CoreMark Pro"
-  make TARGET=linux64 XCMD='-c4' certify-all &> benchmark_output.txt
-  OUTPUT="coremark-pro_out.txt"
-  awk '/WORKLOAD/,/CoreMark-PRO/' benchmark_output.txt > $OUTPUT
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
-  COREMARK_PRO=$(cat $OUTPUT | grep CoreMark-PRO | \
-    awk '{print $3 ", " $2}')
-  echo -n ", $COREMARK_PRO" >> $CSV_SUMMARY_FILE
-  cd ..
+  timed_phase coremark-pro measure run_coremark_pro
   echo
 fi
-
-# Run LINPACK  #################################################################
-
 if [[ $BENCHMARKS == *$N_LINPACK* ]]
 then
-  LINPACK_DIR="linpack"
-  mkdir -p $LINPACK_DIR
-  cd $LINPACK_DIR || exit
-  yd_print "Compiling LINPACK"
-  gcc "$(find $TASK_DIR -name linpack_bench.c)" -o linpack
-  yd_print "Running LINPACK"
-  OUTPUT="linpack_out.txt"
-  ./linpack > $OUTPUT
-  sed  -i "1i Instance Type = $INSTANCE_TYPE\n" $OUTPUT
-  LINPACK_MFLOPS=$(cat $OUTPUT | sed '/^$/d' | \
-    awk '/Factor/{ f = 1; next } /LINPACK_BENCH/{ f = 0 } f' | awk '{print $4}')
-  echo -n ", $LINPACK_MFLOPS" >> $CSV_SUMMARY_FILE
-  cd ..
+  timed_phase linpack-multicore measure run_linpack_multicore
   echo
 fi
+if [[ $BENCHMARKS == *$N_NUMPY_LINALG* ]]
+then
+  timed_phase numpy-linalg-multicore measure run_numpy_linalg_multicore
+  echo
+fi
+if [[ $BENCHMARKS == *$N_STREAM* ]]
+then
+  timed_phase stream measure run_stream
+  echo
+fi
+
+stop_sampling
 
 # Finalise CSV summary line ####################################################
 
+for COLUMN in "${SUMMARY_COLUMNS[@]}"
+do
+  echo -n ", $(cat "$STATE_DIR/column-$COLUMN" 2> /dev/null)" \
+       >> $CSV_SUMMARY_FILE
+done
 END_TIME=$(date -u "+%Y-%m-%d_%H%M%S_UTC")
 echo ", $START_TIME, $END_TIME" >> $CSV_SUMMARY_FILE
+rm -rf "$STATE_DIR"
 
-# Ensure a Minimum Duration  ###################################################
+# Report Phase Timings  ########################################################
 
-# This mitigates multiple benchmarks being sent to the same node because other
-# nodes are not yet ready.
+# Compare the wall-clock time of the run with the total time of its phases,
+# which is what running every phase in sequence would take
 
-MINIMUM_DURATION=90
-REMAINING_DURATION=$((MINIMUM_DURATION-SECONDS))
-if [[ $REMAINING_DURATION -gt 0 ]]
-then
-  yd_print "Sleeping for $REMAINING_DURATION seconds before finishing"
-  sleep $REMAINING_DURATION
-fi
+yd_print "Phase timings (seconds):"
+awk -F, 'NR > 1 { printf "  %-24s %-8s %8.1f\n", $1, $2, $5; total += $5 }
+         END { printf "  %-33s %8.1f\n", "Total", total }' $PHASE_TIMINGS_FILE
+yd_print "Wall-clock time = $SECONDS seconds"
+echo
+
+# Record the Run on this Node  #################################################
+
+# Node time is measured per run, from the 'Started At' and 'Ended At' columns,
+# rather than padded out to a minimum duration
+
+mkdir -p "$NODE_RUNS_DIR"
+cp $CSV_SUMMARY_FILE "$NODE_RUN_FILE"
+yd_print "Node time = $(awk -v s=$SECONDS 'BEGIN { printf "%.3f", s / 3600 }')" \
+         "node-hours"
+echo
 
 ################################################################################
 
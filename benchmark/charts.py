@@ -2,169 +2,818 @@
 
 """
 Generate visuals from the CSV benchmark data. Expects the CSV file as the
-first argument.
+first argument. If instance prices are available, price-performance charts
+are also generated. Where benchmarks were repeated over several trials, the
+bar charts show the confidence interval of each score as an error bar.
+Latency charts are generated for the latency metrics in the result records,
+line charts for the sweeps in the result records (e.g., latency by working
+set size, or throughput and parallel efficiency by thread count) and a
+heatmap per instance for the matrices (e.g., storage IOPS by block size and
+thread count), if the sweeps file accompanying the CSV file is present. If
+the system samples file is present, a chart of each instance's CPU
+utilisation and frequency, memory use and disk throughput over its run is
+generated, showing the benchmark phases.
+
+Charts are rendered in parallel by a pool of worker processes, using the
+non-interactive 'Agg' backend. The number of workers can be set using the
+CHART_WORKERS environment variable; set it to 1 to render the charts in
+this process, one after another.
+
+A manifest of the hashes of each chart's input data and styling is kept in
+the output directory, and charts whose inputs are unchanged are not
+re-rendered. Use the '--force' option to re-render all charts.
+
+Charts are saved as PNG images by default. Set the CHART_FORMAT environment
+variable to 'svg' to save them as SVG vector images instead, which the PDF
+report embeds as vector paths, without rasterising them.
+
+matplotlib is only imported when a chart is rendered. Use the
+'--profile-imports' option to record the time taken by each import (see
+'import_profile.py').
 """
 
+import io
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+from benchmark_data import (
+    CHART_FORMAT,
+    LABEL_COLUMN,
+    SAMPLE_METRICS,
+    SYSTEM_CHART_FILE,
+    chart_path,
+    instance_chart_file,
+    load_phases,
+    load_samples,
+    load_summary,
+    load_sweeps,
+    matrix_chart_file,
+    parallel_efficiency,
+)
+from benchmark_registry import (
+    LATENCY_REGISTRY,
+    Benchmark,
+    Matrix,
+    Scaling,
+    Sweep,
+    selected_benchmarks,
+    selected_sweeps,
+)
+from import_profile import PROFILE_IMPORTS_OPTION, profile_imports
+from price_performance import (
+    PRICE_VALUE_COLUMN,
+    add_price_performance,
+    has_prices,
+    pareto_chart_file,
+    pareto_column,
+    per_price_benchmark,
+)
+from render_cache import RenderManifest, content_hash
+from results_store import INSTANCE_KEY, ResultsStore, history_chart_file, open_store
+from trial_statistics import ci_high_column, ci_low_column, has_intervals
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(os.cpu_count() or 1)))
+
+# The maximum number of instance types shown in each results over time chart
+HISTORY_CHART_SERIES = int(os.getenv("HISTORY_CHART_SERIES", "8"))
+
+# The maximum number of instances shown in each sweep chart
+SWEEP_CHART_SERIES = int(os.getenv("SWEEP_CHART_SERIES", "8"))
+
+
+def pyplot():
+    """
+    Import pyplot, with the non-interactive 'Agg' backend, on first use. Only
+    the chart rendering functions use matplotlib, so preparing the chart jobs,
+    or rendering none because all the charts are unchanged, doesn't pay for
+    importing it.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def encode_figure(figure) -> bytes:
+    """
+    Encode a figure in the chart format. As an SVG image, the figure is kept
+    as vector paths. As a PNG image, it's encoded as RGB: matplotlib saves
+    RGBA PNGs, but the charts are opaque, and the PDF report can embed RGB
+    PNGs without decoding them.
+    """
+    buffer = io.BytesIO()
+    if CHART_FORMAT == "svg":
+        figure.savefig(buffer, format="svg")
+        return buffer.getvalue()
+
+    from PIL import Image
+
+    figure.canvas.draw()
+    image = Image.frombuffer(
+        "RGBA",
+        figure.canvas.get_width_height(),
+        figure.canvas.buffer_rgba(),
+        "raw",
+        "RGBA",
+        0,
+        1,
+    )
+    image.convert("RGB").save(buffer, format="PNG", dpi=(figure.dpi, figure.dpi))
+    return buffer.getvalue()
+
 
 @dataclass
-class Benchmark:
-    column_title: str
-    chart_title: str
-    y_axis_label: str
+class ChartJob:
+    """
+    A chart to render: the rendering function and its arguments. The function
+    returns the encoded chart, which is saved in the output file.
+    """
+
     output_file: str
-    x_axis_label: str = "Instance Types"
-    colour: str = os.getenv("CHART_COLOR", "b")
-
-
-# Set up all the included benchmarks. If the column header has been defined
-# in the environment of the calling script, the benchmark is assumed to be
-# present.
-benchmarks = []
-BENCHMARKS = os.getenv("BENCHMARKS", "")
-if os.getenv("N_SYSBENCH") in BENCHMARKS:
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_SC"),
-            chart_title="sysbench Single-Core Benchmark",
-            y_axis_label="Events per Second",
-            output_file="sysbench-single.png",
-        )
-    )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_MC"),
-            chart_title="sysbench Multicore Benchmark",
-            y_axis_label="Events per Second",
-            output_file="sysbench-multi.png",
-        )
-    )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_MEM"),
-            chart_title="sysbench Memory Benchmark",
-            y_axis_label="Operations per Second",
-            output_file="sysbench-memory.png",
+    function: Callable[..., bytes]
+    args: tuple
+
+    @property
+    def digest(self) -> str:
+        return content_hash(self.function.__name__, self.args)
+
+
+def render_chart(
+    benchmark: Benchmark,
+    x: List[str],
+    y: List[float],
+    yerr: Optional[List[List[float]]] = None,
+) -> bytes:
+    """
+    Render a single bar chart, closing the figure afterwards. 'yerr'
+    optionally holds the distances from each bar down to its lower and up to
+    its upper error bar. Return the encoded chart.
+    """
+    plt = pyplot()
+    figure = plt.figure(figsize=(10, 6))
+    try:
+        plt.bar(x, y, yerr=yerr, capsize=3 if yerr else 0, color=benchmark.colour)
+        plt.title(benchmark.column_title)
+        plt.xlabel(benchmark.x_axis_label)
+        plt.ylabel(benchmark.y_axis_label)
+        plt.xticks(rotation="vertical")
+        plt.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def render_pareto_chart(
+    benchmark: Benchmark,
+    output_file: str,
+    price: List[float],
+    score: List[float],
+    frontier_price: List[float],
+    frontier_score: List[float],
+) -> bytes:
+    """
+    Render a scatter chart of benchmark score against hourly price, with
+    the Pareto frontier marked, closing the figure afterwards. Return the
+    encoded chart.
+    """
+    plt = pyplot()
+    figure = plt.figure(figsize=(10, 6))
+    try:
+        plt.scatter(price, score, color=benchmark.colour, alpha=0.5, label="Instances")
+        plt.step(
+            frontier_price,
+            frontier_score,
+            where="post",
+            color="r",
+            marker="o",
+            label="Pareto Frontier",
         )
-    )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_ST_R"),
-            chart_title="sysbench Storage Read Performance",
-            y_axis_label="Read Ops per Second",
-            output_file="sysbench-storage-reads.png",
+        plt.title(f"{benchmark.column_title}: Price against Performance")
+        plt.xlabel("Price/Hr")
+        plt.ylabel(benchmark.y_axis_label)
+        plt.legend(loc="lower right")
+        plt.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def bar_chart_jobs(
+    df: pd.DataFrame,
+    label_column: str,
+    benchmarks: List[Benchmark],
+    ascending: bool = False,
+) -> List[ChartJob]:
+    """
+    Prepare a bar chart for each benchmark. Each chart receives only its label
+    and benchmark columns, sorted in descending order of benchmark score (or
+    ascending order, if 'ascending' is set, for lower-is-better metrics). Where
+    the benchmark has confidence intervals from repeated trials, they are
+    drawn as error bars.
+    """
+    jobs = []
+    for benchmark in benchmarks:
+        column = benchmark.column_title
+        interval_columns = (
+            [ci_low_column(column), ci_high_column(column)]
+            if has_intervals(df, column)
+            else []
         )
-    )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_ST_W"),
-            chart_title="sysbench Storage Write Performance",
-            y_axis_label="Write Ops per Second",
-            output_file="sysbench-storage-writes.png",
+        try:
+            sorted_df = df[[label_column, column] + interval_columns].sort_values(
+                by=[column], ascending=ascending
+            )
+        except Exception as e:
+            print(f"Error: {e}")
+            continue
+        x = sorted_df[label_column].tolist()
+        y = sorted_df[column].tolist()
+        yerr = None
+        if len(interval_columns) > 0:
+            lower = (sorted_df[column] - sorted_df[ci_low_column(column)]).clip(lower=0)
+            upper = (sorted_df[ci_high_column(column)] - sorted_df[column]).clip(
+                lower=0
+            )
+            yerr = [
+                lower.fillna(0).astype(float).tolist(),
+                upper.fillna(0).astype(float).tolist(),
+            ]
+        jobs.append(
+            ChartJob(benchmark.output_file, render_chart, (benchmark, x, y, yerr))
         )
+    return jobs
+
+
+def price_performance_chart_jobs(
+    df: pd.DataFrame, label_column: str, benchmarks: List[Benchmark]
+) -> List[ChartJob]:
+    """
+    Prepare a score per hourly price bar chart, and a price against
+    performance chart, for each benchmark. Instances without a price are
+    omitted.
+    """
+    jobs = bar_chart_jobs(
+        df[df[PRICE_VALUE_COLUMN].notna()],
+        label_column,
+        [per_price_benchmark(benchmark) for benchmark in benchmarks],
     )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_SYSBENCH_ST_F"),
-            chart_title="sysbench Storage Fsync Performance",
-            y_axis_label="Fsync Ops per Second",
-            output_file="sysbench-storage-fsyncs.png",
+    for benchmark in benchmarks:
+        try:
+            chart_df = df[
+                [PRICE_VALUE_COLUMN, benchmark.column_title]
+                + [pareto_column(benchmark.column_title)]
+            ].dropna()
+        except Exception as e:
+            print(f"Error: {e}")
+            continue
+        frontier = chart_df[chart_df[pareto_column(benchmark.column_title)]]
+        frontier = frontier.sort_values(by=[PRICE_VALUE_COLUMN])
+        jobs.append(
+            ChartJob(
+                pareto_chart_file(benchmark),
+                render_pareto_chart,
+                (
+                    benchmark,
+                    pareto_chart_file(benchmark),
+                    chart_df[PRICE_VALUE_COLUMN].tolist(),
+                    chart_df[benchmark.column_title].tolist(),
+                    frontier[PRICE_VALUE_COLUMN].tolist(),
+                    frontier[benchmark.column_title].tolist(),
+                ),
+            )
         )
-    )
-if os.getenv("N_MYSQL_TPCC") in BENCHMARKS:
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_MYSQL_TPCC"),
-            chart_title="sysbench MySQL TPC-C TPS",
-            y_axis_label="Transactions per Second",
-            output_file="sysbench-mysql-tpcc.png",
+    return jobs
+
+
+def latency_chart_jobs(
+    df: pd.DataFrame, label_column: str, benchmarks: List[Benchmark]
+) -> List[ChartJob]:
+    """
+    Prepare a bar chart for each latency metric that has results, sorted in
+    ascending order of latency. Instances without a result are omitted.
+    """
+    return [
+        job
+        for benchmark in benchmarks
+        if benchmark.column_title in df and df[benchmark.column_title].count() > 0
+        for job in bar_chart_jobs(
+            df[df[benchmark.column_title].notna()],
+            label_column,
+            [benchmark],
+            ascending=True,
         )
+    ]
+
+
+def render_history_chart(
+    benchmark: Benchmark,
+    output_file: str,
+    series: List[Tuple[str, List[datetime], List[float]]],
+) -> bytes:
+    """
+    Render a line chart of benchmark results over successive runs, with one
+    line per instance type, closing the figure afterwards. Return the encoded
+    chart.
+    """
+    plt = pyplot()
+    figure = plt.figure(figsize=(10, 6))
+    try:
+        for label, started_at, scores in series:
+            plt.plot(started_at, scores, marker="o", label=label)
+        plt.title(f"{benchmark.column_title}: Results over Time")
+        plt.xlabel("Benchmark Run")
+        plt.ylabel(benchmark.y_axis_label)
+        plt.xticks(rotation="vertical")
+        plt.legend(fontsize="small")
+        plt.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def history_chart_jobs(
+    df: pd.DataFrame,
+    store: ResultsStore,
+    benchmarks: List[Benchmark],
+    max_series: int = HISTORY_CHART_SERIES,
+) -> List[ChartJob]:
+    """
+    Prepare a results over time chart for each benchmark, from the results
+    store. Each chart shows up to 'max_series' of the instance types in the
+    current results that have been benchmarked in more than one run, choosing
+    those with the most negative trend (the largest regressions).
+    """
+    instances = (
+        df[
+            [
+                os.getenv("H_PROVIDER"),
+                os.getenv("H_REGION"),
+                os.getenv("H_INSTANCE_TYPE"),
+            ]
+        ]
+        .astype(str)
+        .drop_duplicates()
     )
-if os.getenv("N_COREMARK_STD") in BENCHMARKS:
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_COREMARK_STD_SC"),
-            chart_title="CoreMark Single-Core Benchmark",
-            y_axis_label="Benchmark Score",
-            output_file="coremark-single.png",
+    instances.columns = INSTANCE_KEY
+
+    jobs = []
+    for benchmark in benchmarks:
+        statistics = store.statistics(benchmark.column_title).merge(instances)
+        regressions = statistics[statistics["runs"] > 1].nsmallest(max_series, "trend")
+        if len(regressions) == 0:
+            continue
+        history = store.history(benchmark.column_title).merge(regressions[INSTANCE_KEY])
+        series = [
+            (
+                " / ".join(key),
+                list(group["started_at"].dt.to_pydatetime()),
+                group["score"].tolist(),
+            )
+            for key, group in history.groupby(INSTANCE_KEY, sort=False)
+        ]
+        output_file = history_chart_file(benchmark)
+        jobs.append(
+            ChartJob(
+                output_file, render_history_chart, (benchmark, output_file, series)
+            )
         )
+    return jobs
+
+
+def render_sweep_chart(
+    sweep: Sweep, series: List[Tuple[str, List[float], List[float]]]
+) -> bytes:
+    """
+    Render a line chart of a sweep, with one line per instance, closing the
+    figure afterwards. Return the encoded chart.
+    """
+    plt = pyplot()
+    figure = plt.figure(figsize=(10, 6))
+    try:
+        for label, x, y in series:
+            plt.plot(x, y, marker="o", markersize=3, label=label)
+        if sweep.log_x:
+            plt.xscale("log", base=2)
+        if sweep.log_y:
+            plt.yscale("log")
+        plt.title(sweep.chart_title)
+        plt.xlabel(sweep.x_axis_label)
+        plt.ylabel(sweep.y_axis_label)
+        plt.grid(True, which="major", alpha=0.3)
+        plt.legend(fontsize="small")
+        plt.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def render_scaling_chart(
+    sweep: Scaling, series: List[Tuple[str, List[float], List[float], List[float]]]
+) -> bytes:
+    """
+    Render line charts of a thread count sweep's throughput and parallel
+    efficiency side by side, with one line per instance, closing the figure
+    afterwards. Return the encoded chart.
+    """
+    plt = pyplot()
+    figure, (throughput, efficiency) = plt.subplots(1, 2, figsize=(14, 6))
+    thread_counts = sorted({threads for _, x, _, _ in series for threads in x})
+    try:
+        for label, x, y, efficiencies in series:
+            throughput.plot(x, y, marker="o", markersize=3, label=label)
+            efficiency.plot(x, efficiencies, marker="o", markersize=3, label=label)
+        efficiency.axhline(100, color="grey", linestyle="--", linewidth=1)
+        efficiency.set_ylim(bottom=0)
+        for ax, y_axis_label in (
+            (throughput, sweep.y_axis_label),
+            (efficiency, "Parallel Efficiency (%)"),
+        ):
+            if sweep.log_x:
+                ax.set_xscale("log", base=2)
+            ax.set_xticks(thread_counts)
+            ax.set_xticklabels([f"{threads:g}" for threads in thread_counts])
+            ax.set_xlabel(sweep.x_axis_label)
+            ax.set_ylabel(y_axis_label)
+            ax.grid(True, which="major", alpha=0.3)
+        if sweep.log_y:
+            throughput.set_yscale("log")
+        efficiency.legend(fontsize="small")
+        figure.suptitle(sweep.chart_title)
+        figure.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def render_matrix_chart(
+    matrix: Matrix,
+    label: str,
+    panels: List[Tuple[str, List[float], List[float], List[List[float]]]],
+) -> bytes:
+    """
+    Render a matrix's heatmaps for an instance, one per panel, with each cell
+    annotated with its value, closing the figure afterwards. Each panel is its
+    title, 'x' values, 'y' values and a row of values per 'y' value. Return
+    the encoded chart.
+    """
+    output_file = matrix_chart_file(matrix, label)
+    columns = min(len(panels), 2)
+    rows = -(-len(panels) // columns)
+    plt = pyplot()
+    figure, axes = plt.subplots(
+        rows, columns, figsize=(6 * columns, 4.5 * rows), squeeze=False
     )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_COREMARK_STD_MC"),
-            chart_title="CoreMark Multicore Benchmark",
-            y_axis_label="Benchmark Score",
-            output_file="coremark-multi.png",
+    try:
+        for ax in axes.flat[len(panels) :]:
+            ax.set_visible(False)
+        for ax, (title, x, y, values) in zip(axes.flat, panels):
+            values = np.array(values, dtype=float)
+            # A mesh of cells, rather than an image, so that the heatmap stays
+            # vector paths when saved as SVG
+            mesh = ax.pcolormesh(
+                np.arange(len(x) + 1) - 0.5,
+                np.arange(len(y) + 1) - 0.5,
+                np.ma.masked_invalid(values),
+                cmap="viridis",
+            )
+            ax.set_xticks(range(len(x)))
+            ax.set_xticklabels([f"{value:g}" for value in x])
+            ax.set_yticks(range(len(y)))
+            ax.set_yticklabels([f"{value:g}" for value in y])
+            ax.set_xlabel(matrix.x_axis_label)
+            ax.set_ylabel(matrix.y_axis_label)
+            ax.set_title(title, fontsize="medium")
+            threshold = mesh.norm.vmin + 0.5 * (mesh.norm.vmax - mesh.norm.vmin)
+            for (i, j), value in np.ndenumerate(values):
+                if not np.isnan(value):
+                    ax.text(
+                        j,
+                        i,
+                        f"{value:,.0f}" if abs(value) >= 100 else f"{value:.3g}",
+                        ha="center",
+                        va="center",
+                        fontsize="small",
+                        color="black" if value > threshold else "white",
+                    )
+            colorbar = figure.colorbar(mesh, ax=ax, label=matrix.value_label)
+            # matplotlib rasterises colour bars of many colours, which would be
+            # embedded in an SVG chart as an image
+            colorbar.solids.set_rasterized(False)
+        figure.suptitle(f"{matrix.chart_title}: {label}")
+        figure.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def matrix_chart_jobs(
+    df: pd.DataFrame, points: pd.DataFrame, label_column: str, matrix: Matrix
+) -> List[ChartJob]:
+    """
+    Prepare a heatmap chart of a matrix for each instance that has points,
+    with its panels in the order of the matrix's panel titles.
+    """
+    jobs = []
+    for row, row_points in points.groupby("row"):
+        label = str(df.loc[row, label_column])
+        panels = []
+        by_panel = dict(tuple(row_points.groupby("panel", dropna=False)))
+        order = [panel for panel in matrix.panel_titles if panel in by_panel]
+        order += sorted(panel for panel in by_panel if panel not in order)
+        for panel in order:
+            table = by_panel[panel].pivot(index="y", columns="x", values="value")
+            panels.append(
+                (
+                    matrix.panel_titles.get(panel, matrix.chart_title),
+                    table.columns.tolist(),
+                    table.index.tolist(),
+                    table.to_numpy().tolist(),
+                )
+            )
+        jobs.append(
+            ChartJob(
+                matrix_chart_file(matrix, label),
+                render_matrix_chart,
+                (matrix, label, panels),
+            )
         )
-    )
-if os.getenv("N_COREMARK_PRO") in BENCHMARKS:
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_COREMARK_PRO_SC"),
-            chart_title="CoreMark-Pro Single-Core Benchmark",
-            y_axis_label="Benchmark Score",
-            output_file="coremark-pro-single.png",
+    return jobs
+
+
+def sweep_chart_jobs(
+    df: pd.DataFrame,
+    points: pd.DataFrame,
+    label_column: str,
+    sweeps: List[Sweep],
+    max_series: int = SWEEP_CHART_SERIES,
+) -> List[ChartJob]:
+    """
+    Prepare a line chart for each sweep that has points. Each chart shows up
+    to 'max_series' instances, spread evenly across the range of their
+    results at the largest parameter value, including the highest and lowest.
+    Thread count sweeps are charted with their parallel efficiency, and
+    instances are chosen by their efficiency with the most threads. Matrices
+    are charted as heatmaps, one chart per instance.
+    """
+    jobs = []
+    for sweep in sweeps:
+        sweep_points = points[points["sweep"] == sweep.chart_title]
+        if len(sweep_points) == 0:
+            continue
+        if isinstance(sweep, Matrix):
+            jobs += matrix_chart_jobs(df, sweep_points, label_column, sweep)
+            continue
+        scaling = isinstance(sweep, Scaling)
+        if scaling:
+            sweep_points = sweep_points.assign(
+                efficiency=parallel_efficiency(sweep_points)
+            )
+        last_points = sweep_points.sort_values(by="x").groupby("row").last()
+        ranked = last_points.sort_values(
+            by="efficiency" if scaling else "value"
+        ).index.tolist()
+        if len(ranked) > max_series > 1:
+            step = (len(ranked) - 1) / (max_series - 1)
+            ranked = [ranked[round(i * step)] for i in range(max_series)]
+        series = []
+        for row in ranked:
+            row_points = sweep_points[sweep_points["row"] == row].sort_values(by="x")
+            series.append(
+                (
+                    str(df.loc[row, label_column]),
+                    row_points["x"].tolist(),
+                    row_points["value"].tolist(),
+                )
+                + ((row_points["efficiency"].tolist(),) if scaling else ())
+            )
+        render = render_scaling_chart if scaling else render_sweep_chart
+        jobs.append(ChartJob(sweep.output_file, render, (sweep, series)))
+    return jobs
+
+
+def render_system_chart(
+    label: str,
+    output_file: str,
+    minutes: List[float],
+    metrics: Dict[str, List[float]],
+    phases: List[Tuple[str, float, float]],
+) -> bytes:
+    """
+    Render an instance's system samples against the time since the start of
+    its run, in minutes, with its measurement phases shaded and named,
+    closing the figure afterwards. Return the encoded chart.
+    """
+    panels = [
+        (
+            "CPU (%)",
+            [
+                ("cpu_percent", "Busy"),
+                ("iowait_percent", "I/O wait"),
+                ("steal_percent", "Steal"),
+            ],
+        ),
+        ("CPU Frequency (MHz)", [("frequency_mhz", "Mean frequency")]),
+        ("Memory Used (MiB)", [("memory_used_mib", "Used")]),
+        (
+            "Disk (MiB/s)",
+            [("disk_read_mib_s", "Read"), ("disk_write_mib_s", "Write")],
+        ),
+    ]
+    plt = pyplot()
+    figure, axes = plt.subplots(len(panels), 1, figsize=(10, 11), sharex=True)
+    try:
+        for ax, (y_axis_label, lines) in zip(axes, panels):
+            for index, (_, start, end) in enumerate(phases):
+                ax.axvspan(start, end, color="grey", alpha=0.1 + 0.1 * (index % 2))
+            for metric, line_label in lines:
+                ax.plot(minutes, metrics[metric], linewidth=1, label=line_label)
+            ax.set_ylabel(y_axis_label)
+            ax.set_ylim(bottom=0)
+            ax.grid(True, which="major", alpha=0.3)
+            if len(lines) > 1:
+                ax.legend(fontsize="small", loc="upper right")
+        axes[0].set_ylim(top=100)
+        for name, start, end in phases:
+            axes[0].text(
+                (start + end) / 2,
+                1.02,
+                name,
+                transform=axes[0].get_xaxis_transform(),
+                rotation=90,
+                ha="center",
+                va="bottom",
+                fontsize="x-small",
+            )
+        axes[-1].set_xlabel("Time (minutes)")
+        figure.suptitle(f"System Activity: {label}")
+        figure.tight_layout()
+        chart = encode_figure(figure)
+    finally:
+        plt.close(figure)
+    return chart
+
+
+def system_chart_jobs(
+    df: pd.DataFrame,
+    samples: pd.DataFrame,
+    phases: pd.DataFrame,
+    label_column: str,
+) -> List[ChartJob]:
+    """
+    Prepare a chart of the system samples for each instance that has them,
+    showing its measurement phases.
+    """
+    jobs = []
+    for row, row_samples in samples.groupby("row"):
+        label = str(df.loc[row, label_column])
+        output_file = instance_chart_file(SYSTEM_CHART_FILE, label)
+        row_samples = row_samples.sort_values(by="time")
+        measurements = phases[(phases["row"] == row) & (phases["kind"] == "measure")]
+        jobs.append(
+            ChartJob(
+                output_file,
+                render_system_chart,
+                (
+                    label,
+                    output_file,
+                    (row_samples["time"] / 60).tolist(),
+                    {metric: row_samples[metric].tolist() for metric in SAMPLE_METRICS},
+                    [
+                        (str(phase.phase), phase.start / 60, phase.end / 60)
+                        for phase in measurements.sort_values(by="start").itertuples()
+                    ],
+                ),
+            )
         )
+    return jobs
+
+
+def render_job(job: ChartJob, save: bool = True) -> bytes:
+    """
+    Render a chart, saving it in its output file if 'save' is set. Return the
+    encoded chart.
+    """
+    chart = job.function(*job.args)
+    if save:
+        with open(chart_path(job.output_file), "wb") as f:
+            f.write(chart)
+    return chart
+
+
+def render_jobs(
+    jobs: List[ChartJob],
+    workers: int = CHART_WORKERS,
+    force: bool = False,
+    save: bool = True,
+) -> Dict[str, bytes]:
+    """
+    Render the prepared charts, using up to 'workers' processes, saving them
+    in their output files if 'save' is set. Charts whose inputs are unchanged
+    since they were last saved are skipped, unless 'force' is set. Return the
+    rendered charts, keyed by output file. A chart that fails to render is
+    reported and left out, and any earlier version of its file is removed,
+    whether or not 'save' is set, so that the report doesn't use it in place
+    of the current chart.
+    """
+    manifest = RenderManifest()
+    pending = []
+    for job in jobs:
+        digest = job.digest
+        if not force and manifest.is_current(chart_path(job.output_file), digest):
+            print(f"Unchanged '{chart_path(job.output_file)}'")
+        else:
+            pending.append((job, digest))
+
+    charts: Dict[str, bytes] = {}
+
+    def collect(job: ChartJob, digest: str, result: Callable[[], bytes]):
+        try:
+            charts[job.output_file] = result()
+        except Exception as e:
+            print(f"Error: unable to generate '{chart_path(job.output_file)}': {e}")
+            if os.path.exists(chart_path(job.output_file)):
+                os.remove(chart_path(job.output_file))
+            return
+        print(f"Generating '{chart_path(job.output_file)}'")
+        if save:
+            manifest.update(chart_path(job.output_file), digest)
+
+    if workers <= 1 or len(pending) <= 1:
+        for job, digest in pending:
+            collect(job, digest, partial(render_job, job, save))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = [executor.submit(render_job, job, save) for job, _ in pending]
+            for (job, digest), future in zip(pending, futures):
+                collect(job, digest, future.result)
+    manifest.save()
+    return charts
+
+
+def render_charts(
+    df: pd.DataFrame,
+    label_column: str,
+    benchmarks: List[Benchmark],
+    workers: int = CHART_WORKERS,
+    force: bool = False,
+):
+    """
+    Render a bar chart for each benchmark, using up to 'workers' processes.
+    """
+    render_jobs(bar_chart_jobs(df, label_column, benchmarks), workers, force)
+
+
+def main():
+    if PROFILE_IMPORTS_OPTION in sys.argv[1:]:
+        exit(profile_imports(sys.argv))
+
+    # Regenerate all charts, even if their inputs are unchanged
+    force = "--force" in sys.argv[1:]
+    arguments = [argument for argument in sys.argv[1:] if argument != "--force"]
+
+    # The benchmarks included in the run, from the 'BENCHMARKS' environment
+    # variable
+    benchmarks = selected_benchmarks()
+
+    benchmark_headers = [benchmark.column_title for benchmark in benchmarks]
+    df = load_summary(arguments[0], benchmark_headers)
+    add_price_performance(df, benchmark_headers)
+
+    jobs = bar_chart_jobs(df, LABEL_COLUMN, benchmarks)
+    jobs += latency_chart_jobs(
+        df, LABEL_COLUMN, selected_benchmarks(registry=LATENCY_REGISTRY)
     )
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_COREMARK_PRO_MC"),
-            chart_title="CoreMark-Pro Multicore Benchmark",
-            y_axis_label="Benchmark Score",
-            output_file="coremark-pro-multi.png",
-        )
+    jobs += sweep_chart_jobs(
+        df, load_sweeps(arguments[0]), LABEL_COLUMN, selected_sweeps()
     )
-if os.getenv("N_LINPACK") in BENCHMARKS:
-    benchmarks.append(
-        Benchmark(
-            column_title=os.getenv("H_LINPACK"),
-            chart_title="LINPACK MFLOPS",
-            y_axis_label="MFLOPS",
-            output_file="linpack.png",
-        )
+    jobs += system_chart_jobs(
+        df, load_samples(arguments[0]), load_phases(arguments[0]), LABEL_COLUMN
     )
+    if has_prices(df):
+        jobs += price_performance_chart_jobs(df, LABEL_COLUMN, benchmarks)
+    store = open_store()
+    if store is not None:
+        with store:
+            jobs += history_chart_jobs(df, store, benchmarks)
+    render_jobs(jobs, force=force)
 
-data = pd.read_csv(sys.argv[1], skipinitialspace=True)
-df = pd.DataFrame(data)
-
-# Create aggregated 'Instance Type / Region' column
-instance_type = os.getenv("H_INSTANCE_TYPE")
-region = os.getenv("H_REGION")
-inst_type_region = f"{instance_type} / {region}"
-df[inst_type_region] = df.apply(lambda x: f"{x[instance_type]} / {x[region]}", axis=1)
-
-# Disambiguate identical 'Instance Type / Region' rows using an appended numeral
-df.sort_values(by=[inst_type_region], inplace=True, ignore_index=True)
-current_duplicate = ""
-duplicate_counter = 1
-for index, row in enumerate(df.duplicated(keep=False, subset=[inst_type_region])):
-    if row is True:
-        if df.iloc[index][inst_type_region] != current_duplicate:
-            current_duplicate = df.iloc[index][inst_type_region]
-            duplicate_counter = 1
-        df.at[index, inst_type_region] = f"{current_duplicate} ({duplicate_counter})"
-        duplicate_counter += 1
-
-for benchmark in benchmarks:
-    try:
-        df.sort_values(by=[benchmark.column_title], ascending=False, inplace=True)
-    except Exception as e:
-        print(f"Error: {e}")
-        continue
-    x = list(df[inst_type_region])
-    y = list(df[benchmark.column_title])
-    plt.figure(figsize=(10, 6))
-    plt.bar(x, y, color=benchmark.colour)
-    plt.title(benchmark.column_title)
-    plt.xlabel(benchmark.x_axis_label)
-    plt.ylabel(benchmark.y_axis_label)
-    plt.xticks(rotation="vertical")
-    plt.tight_layout()
-    print(f"Generating '{benchmark.output_file}'")
-    plt.savefig(benchmark.output_file)
+
+if __name__ == "__main__":
+    main()
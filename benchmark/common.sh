@@ -38,6 +38,8 @@ export N_MYSQL_TPCC="mysql-tpcc"
 export N_COREMARK_STD="coremark-standard"
 export N_COREMARK_PRO="coremark-pro"
 export N_LINPACK="linpack"
+export N_NUMPY_LINALG="numpy-linalg"
+export N_STREAM="stream"
 
 # Benchmark CSV column headings  ###############################################
 
@@ -66,6 +68,16 @@ export H_COREMARK_STD_MC="CoreMark Multi-Core"
 export H_COREMARK_PRO_SC="CoreMark-Pro Single-Core"
 export H_COREMARK_PRO_MC="CoreMark-Pro Multi-Core"
 
-export H_LINPACK="LINPACK MFLOPS"
+export H_LINPACK_SC="LINPACK Single-Core MFLOPS"
+export H_LINPACK_MC="LINPACK Multi-Core MFLOPS"
+
+export H_NUMPY_LINALG_SC="NumPy Solve Single-Core MFLOPS"
+export H_NUMPY_LINALG_MC="NumPy Solve Multi-Core MFLOPS"
+
+export H_STREAM_COPY="STREAM Copy MB/s"
+export H_STREAM_SCALE="STREAM Scale MB/s"
+export H_STREAM_ADD="STREAM Add MB/s"
+export H_STREAM_TRIAD="STREAM Triad MB/s"
+export H_STREAM_LATENCY="STREAM DRAM Latency (ns)"
 
 ################################################################################
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Generate the benchmark, latency, sweep, system activity, price-performance
+and results over time charts and the PDF report in a single process, sharing
+one copy of the benchmark data. The rendered charts are passed to the report
+in memory, and are also written to the current directory.
+- First command line parameter is the pathname of the summary CSV file.
+- Second command line parameter is the pathname of the PDF report to generate.
+- The '--force' option regenerates all charts and the report, even if their
+  inputs are unchanged.
+- The '--no-chart-files' option renders the charts for the report only,
+  without writing them to files. Charts whose files are current are still
+  read from their files.
+- The '--profile-imports' option records the time taken by each import (see
+  'import_profile.py').
+"""
+
+import os
+import sys
+
+from benchmark_data import (
+    LABEL_COLUMN,
+    load_phases,
+    load_samples,
+    load_summary,
+    load_sweeps,
+)
+from benchmark_registry import LATENCY_REGISTRY, selected_benchmarks, selected_sweeps
+from charts import (
+    bar_chart_jobs,
+    history_chart_jobs,
+    latency_chart_jobs,
+    price_performance_chart_jobs,
+    render_jobs,
+    sweep_chart_jobs,
+    system_chart_jobs,
+)
+from import_profile import PROFILE_IMPORTS_OPTION, profile_imports
+from pdf_report import generate_report
+from price_performance import add_price_performance, has_prices
+from results_store import open_store
+
+
+def main():
+    if PROFILE_IMPORTS_OPTION in sys.argv[1:]:
+        exit(profile_imports(sys.argv))
+
+    # Regenerate all charts and the report, even if their inputs are unchanged
+    force = "--force" in sys.argv[1:]
+    # Keep the rendered charts in memory only
+    save = "--no-chart-files" not in sys.argv[1:]
+    arguments = [
+        argument
+        for argument in sys.argv[1:]
+        if argument not in ("--force", "--no-chart-files")
+    ]
+    try:
+        csv_summary_file = arguments[0]
+        pdf_report = arguments[1]
+    except IndexError as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    benchmarks = selected_benchmarks()
+    benchmark_headers = [benchmark.column_title for benchmark in benchmarks]
+    df = load_summary(csv_summary_file, benchmark_headers)
+    add_price_performance(df, benchmark_headers)
+
+    jobs = bar_chart_jobs(df, LABEL_COLUMN, benchmarks)
+    latency_jobs = latency_chart_jobs(
+        df, LABEL_COLUMN, selected_benchmarks(registry=LATENCY_REGISTRY)
+    )
+    sweep_jobs = sweep_chart_jobs(
+        df, load_sweeps(csv_summary_file), LABEL_COLUMN, selected_sweeps()
+    )
+    system_jobs = system_chart_jobs(
+        df,
+        load_samples(csv_summary_file),
+        load_phases(csv_summary_file),
+        LABEL_COLUMN,
+    )
+    if has_prices(df):
+        jobs += price_performance_chart_jobs(df, LABEL_COLUMN, benchmarks)
+    else:
+        print("No instance prices found: not generating price-performance charts")
+    history_jobs = []
+    store = open_store()
+    if store is not None:
+        with store:
+            history_jobs = history_chart_jobs(df, store, benchmarks)
+    charts = render_jobs(
+        jobs + latency_jobs + sweep_jobs + system_jobs + history_jobs,
+        force=force,
+        save=save,
+    )
+
+    generate_report(
+        df,
+        os.getcwd(),
+        pdf_report,
+        force,
+        [job.output_file for job in history_jobs],
+        [job.output_file for job in latency_jobs],
+        [job.output_file for job in sweep_jobs],
+        [job.output_file for job in system_jobs],
+        charts,
+    )
+
+
+if __name__ == "__main__":
+    main()
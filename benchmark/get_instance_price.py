@@ -3,30 +3,246 @@ Find the on-demand price per hour for an instance, using the supplied command
 line arguments:
  - provider, region, instance type
 Using the KEY and SECRET environment variables to access the platform.
+
+Batch mode ('--batch') prices many instances in a single process. It reads
+'summary.txt' lines (provider, instance type, region, ...) from the files named
+on the command line, or from stdin if no files are given. Instances are
+deduplicated, grouped by provider/region, and looked up concurrently over a
+single pooled HTTP session. One tab-separated line is printed per instance:
+ - provider, instance type, region, price
+The API base URL can be overridden using the YD_API_URL environment variable,
+and the number of concurrent lookups using PRICE_LOOKUP_WORKERS.
+
+Prices are cached on disk between runs (see 'price_cache.py'), including the
+instances for which the API has no price, for PRICE_CACHE_NEGATIVE_TTL seconds.
+In stale-while-revalidate mode, expired prices are used immediately and
+refreshed in the background for the next run; closing the cache waits for the
+refresh to finish. Cache hit and miss counts are printed to stderr.
 """
 
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from os import getenv
-from sys import argv
-
-import requests
-
-try:
-    result = requests.get(
-        url="https://portal.yellowdog.co/api/cloudInfo/instanceTypePrices",
-        headers={"Authorization": f"yd-key {getenv('KEY')}:{getenv('SECRET')}"},
-        params={
-            "providers": [argv[1]],
-            "region": argv[2],
-            "instanceType": argv[3],
-            "usageTypes": ["ON_DEMAND"],
-            "operatingSystemLicences": ["NONE"],
-        },
-        timeout=20.0,
-    )
-    data = json.loads(result.text)
-    currency = data["items"][0]["price"]["currency"]
-    price = str(data["items"][0]["price"]["value"])
-    print(f"{currency} {price}")
-except:
-    print("No price found")
+from sys import argv, stderr, stdin
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from price_cache import CACHE_FILE, NO_PRICE, PriceCache
+
+# 'requests' is only imported when prices are looked up, so that the summary
+# stage doesn't pay for it when every price is cached
+if TYPE_CHECKING:
+    import requests
+
+API_URL = getenv("YD_API_URL", "https://portal.yellowdog.co/api").rstrip("/")
+PRICES_URL = f"{API_URL}/cloudInfo/instanceTypePrices"
+TIMEOUT = 20.0
+# The lookups that refresh expired prices in the background give up sooner
+REVALIDATE_TIMEOUT = float(getenv("PRICE_CACHE_REVALIDATE_TIMEOUT", "2.0"))
+MAX_WORKERS = int(getenv("PRICE_LOOKUP_WORKERS", "8"))
+USAGE_TYPE = "ON_DEMAND"
+
+# (provider, region, instance type)
+InstanceKey = Tuple[str, str, str]
+
+
+def new_session(max_workers: int = MAX_WORKERS) -> "requests.Session":
+    """
+    Create an authenticated session whose connection pool is large enough
+    to be shared by all the lookup threads.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Authorization"] = f"yd-key {getenv('KEY')}:{getenv('SECRET')}"
+    return session
+
+
+def get_price(
+    session: "requests.Session",
+    provider: str,
+    region: str,
+    instance_type: str,
+    timeout: float = TIMEOUT,
+) -> Optional[str]:
+    """
+    Look up the on-demand hourly price of a single instance type.
+    Return the price as 'CURRENCY VALUE', NO_PRICE if the API has no price
+    for it, or None if the lookup failed.
+    """
+    try:
+        result = session.get(
+            url=PRICES_URL,
+            params={
+                "providers": [provider],
+                "region": region,
+                "instanceType": instance_type,
+                "usageTypes": [USAGE_TYPE],
+                "operatingSystemLicences": ["NONE"],
+            },
+            timeout=timeout,
+        )
+        result.raise_for_status()
+        data = json.loads(result.text)
+        if len(data["items"]) == 0:
+            return NO_PRICE
+        currency = data["items"][0]["price"]["currency"]
+        price = str(data["items"][0]["price"]["value"])
+        return f"{currency} {price}"
+    except Exception:
+        return None
+
+
+def read_instances(lines: Iterable[str]) -> List[InstanceKey]:
+    """
+    Extract the deduplicated (provider, region, instance type) tuples from
+    'summary.txt' lines, preserving first-seen order.
+    """
+    instances: Dict[InstanceKey, None] = {}
+    for line in lines:
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) < 3 or "" in fields[:3]:
+            continue
+        provider, instance_type, region = fields[:3]
+        instances[(provider, region, instance_type)] = None
+    return list(instances)
+
+
+def group_instances(instances: Iterable[InstanceKey]) -> List[InstanceKey]:
+    """
+    Order instances so that queries for the same provider/region are issued
+    together.
+    """
+    groups: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    for provider, region, instance_type in instances:
+        groups[(provider, region)].append(instance_type)
+    return [
+        (provider, region, instance_type)
+        for (provider, region), instance_types in sorted(groups.items())
+        for instance_type in instance_types
+    ]
+
+
+def get_prices(
+    instances: Iterable[InstanceKey],
+    max_workers: int = MAX_WORKERS,
+    cache: Optional[PriceCache] = None,
+) -> Dict[InstanceKey, str]:
+    """
+    Look up the prices of a set of instances concurrently, using at most
+    'max_workers' simultaneous requests over one pooled session. Prices are
+    read from and written to the cache, if supplied.
+    """
+    instances = list(dict.fromkeys(instances))
+    prices: Dict[InstanceKey, str] = {}
+    stale_prices: Dict[InstanceKey, str] = {}
+    to_fetch: List[InstanceKey] = []
+    to_revalidate: List[InstanceKey] = []
+    for key in instances:
+        entry = cache.get((*key, USAGE_TYPE)) if cache is not None else None
+        if entry is None:
+            to_fetch.append(key)
+        elif entry.fresh:
+            prices[key] = entry.price
+        elif cache.stale_while_revalidate:
+            prices[key] = entry.price
+            to_revalidate.append(key)
+        else:
+            stale_prices[key] = entry.price
+            to_fetch.append(key)
+
+    # Each background thread refreshes an interleaved share of the prices
+    to_revalidate = group_instances(to_revalidate)
+    for worker in range(min(max_workers, len(to_revalidate))):
+        cache.run_in_background(
+            revalidate_prices, to_revalidate[worker::max_workers], cache
+        )
+
+    if len(to_fetch) > 0:
+        with new_session(max_workers) as session, ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            fetches = {
+                key: executor.submit(get_price, session, *key)
+                for key in group_instances(to_fetch)
+            }
+            for key, future in fetches.items():
+                price = future.result()
+                if price in (None, NO_PRICE) and key in stale_prices:
+                    # Fall back to an expired price rather than no price at all
+                    price = stale_prices[key]
+                elif price is not None and cache is not None:
+                    # NO_PRICE is cached too, but expires sooner
+                    cache.put((*key, USAGE_TYPE), price)
+                prices[key] = price or NO_PRICE
+
+    return {key: prices[key] for key in instances}
+
+
+def revalidate_prices(instances: List[InstanceKey], cache: PriceCache):
+    """
+    Refresh the expired prices of a set of instances in the cache, one at a
+    time, for the next run. The expired prices are kept if the lookups fail,
+    or if the cache is closed first.
+    """
+    with new_session(1) as session:
+        for key in instances:
+            if cache.closed:
+                return
+            price = get_price(session, *key, timeout=REVALIDATE_TIMEOUT)
+            if price not in (None, NO_PRICE):
+                cache.put((*key, USAGE_TYPE), price)
+
+
+def open_cache() -> Optional[PriceCache]:
+    """
+    Open the price cache, unless it has been disabled.
+    """
+    if CACHE_FILE == "":
+        return None
+    try:
+        return PriceCache()
+    except Exception as e:
+        print(f"Price cache unavailable: {e}", file=stderr)
+        return None
+
+
+def main():
+    if len(argv) > 1 and argv[1] == "--batch":
+        if len(argv) > 2:
+            lines = []
+            for summary_file in argv[2:]:
+                with open(summary_file) as f:
+                    lines += f.readlines()
+        else:
+            lines = stdin.readlines()
+        instances = read_instances(lines)
+    else:
+        try:
+            provider, region, instance_type = argv[1:4]
+        except ValueError:
+            print(NO_PRICE)
+            return
+        instances = [(provider, region, instance_type)]
+
+    cache = open_cache()
+    prices = get_prices(instances, cache=cache)
+
+    if len(argv) > 1 and argv[1] == "--batch":
+        for (provider, region, instance_type), price in prices.items():
+            print(f"{provider}\t{instance_type}\t{region}\t{price}")
+    else:
+        print(prices[instances[0]])
+
+    if cache is not None:
+        print(cache.statistics(), file=stderr)
+        # Give any expired prices a brief chance to be refreshed
+        cache.close(wait=REVALIDATE_TIMEOUT)
+
+
+if __name__ == "__main__":
+    main()
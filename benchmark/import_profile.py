@@ -0,0 +1,63 @@
+"""
+Profile the imports of an entry point script, using Python's '-X importtime'
+option. The script is re-run in a new interpreter with the option set; its
+import timings are written to a file named after the script, e.g.,
+'charts-imports.txt', and the slowest top-level imports are printed. The
+timings cover all the script's processes, including any chart rendering
+workers.
+"""
+
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from os import path
+from typing import Dict, List
+
+PROFILE_IMPORTS_OPTION = "--profile-imports"
+
+# The number of slowest top-level imports printed
+SLOWEST_IMPORTS = 10
+
+# An '-X importtime' line: self and cumulative times in microseconds, then the
+# module, indented by its depth in the import tree
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_times_file(script: str) -> str:
+    """
+    The name of the file of import timings for a script.
+    """
+    return f"{path.splitext(path.basename(script))[0]}-imports.txt"
+
+
+def profile_imports(argv: List[str]) -> int:
+    """
+    Re-run the script in 'argv' (without the profiling option) with
+    '-X importtime', passing its output through apart from the import
+    timings, which are written to the import timings file. Return the exit
+    status of the script.
+    """
+    output_file = import_times_file(argv[0])
+    command = [sys.executable, "-X", "importtime", argv[0]] + [
+        argument for argument in argv[1:] if argument != PROFILE_IMPORTS_OPTION
+    ]
+    top_level: Dict[str, int] = defaultdict(int)
+    with open(output_file, "w") as f:
+        process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+        for line in process.stderr:
+            if not line.startswith("import time:"):
+                sys.stderr.write(line)
+                continue
+            f.write(line)
+            match = IMPORT_TIME.match(line.rstrip("\n"))
+            if match is not None and match.group(3) == "":
+                top_level[match.group(4)] += int(match.group(2))
+        status = process.wait()
+
+    print(f"Import timings written to '{output_file}'. Slowest top-level imports:")
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    for module, microseconds in slowest[:SLOWEST_IMPORTS]:
+        print(f"  {module:<32} {microseconds / 1000:8.1f} ms")
+    print(f"  {'Total':<32} {sum(top_level.values()) / 1000:8.1f} ms")
+    return status
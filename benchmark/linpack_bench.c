@@ -2,14 +2,34 @@
 # include <stdio.h>
 # include <math.h>
 # include <time.h>
+# ifdef _OPENMP
+# include <omp.h>
+# endif
 
 /* Obtained from https://people.math.sc.edu/Burkardt/c_src/linpack_bench/linpack_bench.c */
 
-int main ( );
-double cpu_time ( );
+/*
+  Modified to take the problem size as an argument, to time the factorization
+  and solve by wall-clock time, and to factor the matrix in panels of NB
+  columns, with the update of the columns after each panel shared between
+  OpenMP threads. Compile with '-fopenmp' for the multithreaded version; the
+  number of threads is set by OMP_NUM_THREADS.
+*/
+
+# ifndef NB
+# define NB 32
+# endif
+
+int main ( int argc, char *argv[] );
+double wall_time ( );
 void daxpy ( int n, double da, double dx[], int incx, double dy[], int incy );
+void daxpy4 ( int n, const double t[4], const double * restrict dx,
+  double * restrict dy0, double * restrict dy1, double * restrict dy2,
+  double * restrict dy3 );
 double ddot ( int n, double dx[], int incx, double dy[], int incy );
 int dgefa ( double a[], int lda, int n, int ipvt[] );
+void dgefa_update ( double a[], int lda, int n, int ipvt[], int kb, int ke,
+  int j0, int j1 );
 void dgesl ( double a[], int lda, int n, int ipvt[], double b[], int job );
 void dscal ( int n, double sa, double x[], int incx );
 int idamax ( int n, double dx[], int incx );
@@ -21,7 +41,7 @@ void timestamp ( );
 
 /******************************************************************************/
 
-int main ( )
+int main ( int argc, char *argv[] )
 
 /******************************************************************************/
 /*
@@ -39,12 +59,12 @@ int main ( )
 
   Parameters:
 
-    N is the problem size.
+    Optional first command line argument N is the problem size
+    (default 1000).
 */
 {
-# define N 1000
-# define LDA ( N + 1 )
-
+  int N = 1000;
+  int LDA;
   double *a;
   double a_max;
   double *b;
@@ -67,6 +87,18 @@ int main ( )
   double total;
   double *x;
 
+  if ( 1 < argc )
+  {
+    N = atoi ( argv[1] );
+    if ( N < 2 )
+    {
+      printf ( "LINPACK_BENCH - Fatal error!\n" );
+      printf ( "  The problem size N must be at least 2.\n" );
+      return 1;
+    }
+  }
+  LDA = N + 1;
+
   timestamp ( );
   printf ( "\n" );
   printf ( "LINPACK_BENCH\n" );
@@ -77,8 +109,15 @@ int main ( )
   printf ( "  Datatype: Double precision real\n" );
   printf ( "  Matrix order N               = %d\n", N );
   printf ( "  Leading matrix dimension LDA = %d\n", LDA );
-
-  ops = ( double ) ( 2 * N * N * N ) / 3.0 + 2.0 * ( double ) ( N * N );
+  printf ( "  Panel width NB               = %d\n", NB );
+# ifdef _OPENMP
+  printf ( "  Threads                      = %d\n", omp_get_max_threads ( ) );
+# else
+  printf ( "  Threads                      = %d\n", 1 );
+# endif
+
+  ops = 2.0 * ( double ) N * ( double ) N * ( double ) N / 3.0
+    + 2.0 * ( double ) N * ( double ) N;
 /*
   Allocate space for arrays.
 */
@@ -106,12 +145,15 @@ int main ( )
   for ( i = 0; i < N; i++ )
   {
     b[i] = 0.0;
-    for ( j = 0; j < N; j++ )
+  }
+  for ( j = 0; j < N; j++ )
+  {
+    for ( i = 0; i < N; i++ )
     {
       b[i] = b[i] + a[i+j*LDA] * x[j];
     }
   }
-  t1 = cpu_time ( );
+  t1 = wall_time ( );
 
   info = dgefa ( a, LDA, N, ipvt );
 
@@ -124,15 +166,15 @@ int main ( )
     return 1;
   }
 
-  t2 = cpu_time ( );
+  t2 = wall_time ( );
   time[0] = t2 - t1;
 
-  t1 = cpu_time ( );
+  t1 = wall_time ( );
 
   job = 0;
   dgesl ( a, LDA, N, ipvt, b, job );
 
-  t2 = cpu_time ( );
+  t2 = wall_time ( );
   time[1] = t2 - t1;
 
   total = time[0] + time[1];
@@ -151,7 +193,10 @@ int main ( )
   for ( i = 0; i < N; i++ )
   {
     rhs[i] = 0.0;
-    for ( j = 0; j < N; j++ )
+  }
+  for ( j = 0; j < N; j++ )
+  {
+    for ( i = 0; i < N; i++ )
     {
       rhs[i] = rhs[i] + a[i+j*LDA] * x[j];
     }
@@ -160,7 +205,10 @@ int main ( )
   for ( i = 0; i < N; i++ )
   {
     resid[i] = -rhs[i];
-    for ( j = 0; j < N; j++ )
+  }
+  for ( j = 0; j < N; j++ )
+  {
+    for ( i = 0; i < N; i++ )
     {
       resid[i] = resid[i] + a[i+j*LDA] * b[j];
     }
@@ -221,48 +269,32 @@ int main ( )
   timestamp ( );
 
   return 0;
-# undef LDA
-# undef N
 }
 /******************************************************************************/
 
-double cpu_time ( void )
+double wall_time ( void )
 
 /******************************************************************************/
 /*
   Purpose:
 
-    CPU_TIME returns the current reading on the CPU clock.
+    WALL_TIME returns the current reading on a monotonic wall clock.
 
   Discussion:
 
-    The CPU time measurements available through this routine are often
-    not very accurate.  In some cases, the accuracy is no better than
-    a hundredth of a second.  
-
-  Licensing:
-
-    This code is distributed under the GNU LGPL license. 
-
-  Modified:
-
-    06 June 2005
-
-  Author:
-
-    John Burkardt
+    The CPU time of the process is the sum over all of its threads, so
+    the wall-clock time is used to time the multithreaded factorization.
 
   Parameters:
 
-    Output, double CPU_TIME, the current reading of the CPU clock, in seconds.
+    Output, double WALL_TIME, the current reading of the clock, in seconds.
 */
 {
-  double value;
+  struct timespec now;
 
-  value = ( double ) clock ( ) 
-        / ( double ) CLOCKS_PER_SEC;
+  clock_gettime ( CLOCK_MONOTONIC, &now );
 
-  return value;
+  return ( double ) now.tv_sec + 1.0E-09 * ( double ) now.tv_nsec;
 }
 /******************************************************************************/
 
@@ -384,6 +416,46 @@ void daxpy ( int n, double da, double dx[], int incx, double dy[], int incy )
 }
 /******************************************************************************/
 
+void daxpy4 ( int n, const double t[4], const double * restrict dx,
+  double * restrict dy0, double * restrict dy1, double * restrict dy2,
+  double * restrict dy3 )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    DAXPY4 computes four constants times a vector plus four vectors.
+
+  Discussion:
+
+    Each entry of DX is loaded once for all four vectors, which are
+    updated in the same order as by four calls to DAXPY.
+
+  Parameters:
+
+    Input, int N, the number of elements in DX and each DY.
+
+    Input, double T[4], the multipliers of DX.
+
+    Input, double DX[N], the vector.
+
+    Input/output, double DY0[N], DY1[N], DY2[N], DY3[N], the vectors.
+    On output, each DYk[*] has been replaced by DYk[*] + T[k] * DX[*].
+*/
+{
+  int i;
+
+  for ( i = 0; i < n; i++ )
+  {
+    dy0[i] = dy0[i] + t[0] * dx[i];
+    dy1[i] = dy1[i] + t[1] * dx[i];
+    dy2[i] = dy2[i] + t[2] * dx[i];
+    dy3[i] = dy3[i] + t[3] * dx[i];
+  }
+  return;
+}
+/******************************************************************************/
+
 double ddot ( int n, double dx[], int incx, double dy[], int incy )
 
 /******************************************************************************/
@@ -547,60 +619,82 @@ int dgefa ( double a[], int lda, int n, int ipvt[] )
     Use RCOND in DGECO for a reliable indication of singularity.
 */
 {
+  int g;
   int info;
   int j;
   int k;
+  int kb;
+  int ke;
   int l;
   double t;
 /*
-  Gaussian elimination with partial pivoting.
+  Gaussian elimination with partial pivoting, in panels of NB columns.
 */
   info = 0;
 
-  for ( k = 1; k <= n-1; k++ )
+  for ( kb = 1; kb <= n-1; kb = kb + NB )
   {
+    ke = kb + NB - 1;
+    if ( n-1 < ke )
+    {
+      ke = n-1;
+    }
+/*
+  Factor the panel of columns KB to KE.
+*/
+    for ( k = kb; k <= ke; k++ )
+    {
 /*
   Find L = pivot index.
 */
-    l = idamax ( n-k+1, a+(k-1)+(k-1)*lda, 1 ) + k - 1;
-    ipvt[k-1] = l;
+      l = idamax ( n-k+1, a+(k-1)+(k-1)*lda, 1 ) + k - 1;
+      ipvt[k-1] = l;
 /*
   Zero pivot implies this column already triangularized.
 */
-    if ( a[l-1+(k-1)*lda] == 0.0 )
-    {
-      info = k;
-      continue;
-    }
+      if ( a[l-1+(k-1)*lda] == 0.0 )
+      {
+        info = k;
+        continue;
+      }
 /*
   Interchange if necessary.
 */
-    if ( l != k )
-    {
-      t = a[l-1+(k-1)*lda];
-      a[l-1+(k-1)*lda] = a[k-1+(k-1)*lda];
-      a[k-1+(k-1)*lda] = t;
-    }
+      if ( l != k )
+      {
+        t = a[l-1+(k-1)*lda];
+        a[l-1+(k-1)*lda] = a[k-1+(k-1)*lda];
+        a[k-1+(k-1)*lda] = t;
+      }
 /*
   Compute multipliers.
 */
-    t = -1.0 / a[k-1+(k-1)*lda];
+      t = -1.0 / a[k-1+(k-1)*lda];
 
-    dscal ( n-k, t, a+k+(k-1)*lda, 1 );
+      dscal ( n-k, t, a+k+(k-1)*lda, 1 );
 /*
-  Row elimination with column indexing.
+  Row elimination with column indexing, within the panel.
 */
-    for ( j = k+1; j <= n; j++ )
-    {
-      t = a[l-1+(j-1)*lda];
-      if ( l != k )
+      for ( j = k+1; j <= ke; j++ )
       {
-        a[l-1+(j-1)*lda] = a[k-1+(j-1)*lda];
-        a[k-1+(j-1)*lda] = t;
+        t = a[l-1+(j-1)*lda];
+        if ( l != k )
+        {
+          a[l-1+(j-1)*lda] = a[k-1+(j-1)*lda];
+          a[k-1+(j-1)*lda] = t;
+        }
+        daxpy ( n-k, t, a+k+(k-1)*lda, 1, a+k+(j-1)*lda, 1 );
       }
-      daxpy ( n-k, t, a+k+(k-1)*lda, 1, a+k+(j-1)*lda, 1 );
     }
-
+/*
+  Apply the panel's interchanges and eliminations to the columns after it,
+  four columns at a time, sharing the columns between threads.
+*/
+# pragma omp parallel for schedule ( static )
+    for ( g = ke+1; g <= n; g = g + 4 )
+    {
+      dgefa_update ( a, lda, n, ipvt, kb, ke, g, ( g+3 < n ) ? g+3 : n );
+    }
   }
 
   ipvt[n-1] = n;
@@ -614,6 +708,75 @@ int dgefa ( double a[], int lda, int n, int ipvt[] )
 }
 /******************************************************************************/
 
+void dgefa_update ( double a[], int lda, int n, int ipvt[], int kb, int ke,
+  int j0, int j1 )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    DGEFA_UPDATE applies the eliminations of a panel to up to four columns.
+
+  Discussion:
+
+    Each column is updated in the same order as by the unblocked
+    factorization, so the result is identical.  The multipliers of the
+    panel are reused from cache for each group of columns.
+
+  Parameters:
+
+    Input/output, double A[LDA*N], the matrix being factored.
+
+    Input, int LDA, the leading dimension of A.
+
+    Input, int N, the order of the matrix A.
+
+    Input, int IPVT[N], the pivot indices of the panel.
+
+    Input, int KB, KE, the first and last columns of the panel.
+
+    Input, int J0, J1, the first and last columns to update, with
+    J1 - J0 < 4.
+*/
+{
+  int j;
+  int k;
+  int l;
+  double t[4];
+
+  for ( k = kb; k <= ke; k++ )
+  {
+/*
+  A zero pivot leaves zero multipliers, with no interchange, so the
+  update leaves the columns unchanged, as if the step were skipped.
+*/
+    l = ipvt[k-1];
+    for ( j = j0; j <= j1; j++ )
+    {
+      t[j-j0] = a[l-1+(j-1)*lda];
+      if ( l != k )
+      {
+        a[l-1+(j-1)*lda] = a[k-1+(j-1)*lda];
+        a[k-1+(j-1)*lda] = t[j-j0];
+      }
+    }
+    if ( j1 - j0 == 3 )
+    {
+      daxpy4 ( n-k, t, a+k+(k-1)*lda, a+k+(j0-1)*lda, a+k+j0*lda,
+        a+k+(j0+1)*lda, a+k+(j0+2)*lda );
+    }
+    else
+    {
+      for ( j = j0; j <= j1; j++ )
+      {
+        daxpy ( n-k, t[j-j0], a+k+(k-1)*lda, 1, a+k+(j-1)*lda, 1 );
+      }
+    }
+  }
+  return;
+}
+/******************************************************************************/
+
 void dgesl ( double a[], int lda, int n, int ipvt[], double b[], int job )
 
 /******************************************************************************/
@@ -1090,7 +1253,7 @@ double *r8mat_gen ( int lda, int n )
   int init[4] = { 1, 2, 3, 1325 };
   int j;
 
-  a = ( double * ) malloc ( lda * n * sizeof ( double ) );
+  a = ( double * ) malloc ( ( size_t ) lda * n * sizeof ( double ) );
 
   for ( j = 1; j <= n; j++ )
   {
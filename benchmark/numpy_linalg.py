@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+A companion to the LINPACK benchmark that measures the throughput of the
+BLAS/LAPACK library used by NumPy, by solving a random dense linear system
+with 'numpy.linalg.solve'. The operation count and the normalised residual
+are calculated as for 'linpack_bench.c', so the MFLOPS are comparable.
+
+The number of BLAS threads is set by the library's usual environment
+variables, e.g., OMP_NUM_THREADS or OPENBLAS_NUM_THREADS, which must be set
+before this script is run.
+- Optional first command line parameter is the problem size N (default 1000).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def blas_library() -> str:
+    """
+    The name and version of the BLAS library used by NumPy, if known.
+    """
+    config = getattr(np.__config__, "CONFIG", {})
+    blas = config.get("Build Dependencies", {}).get("blas", {})
+    return f"{blas.get('name', 'unknown')} {blas.get('version', '')}".strip()
+
+
+def blas_threads() -> int:
+    """
+    The number of threads requested for the BLAS library, defaulting to the
+    number of CPUs.
+    """
+    for variable in ["OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "OMP_NUM_THREADS"]:
+        if os.getenv(variable, "").isdigit():
+            return int(os.environ[variable])
+    return os.cpu_count() or 1
+
+
+def main():
+    try:
+        n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    except ValueError as e:
+        print(f"Exception: {e}. Invalid problem size. Aborting")
+        exit(1)
+
+    rng = np.random.default_rng(1325)
+    a = rng.random((n, n)) - 0.5
+    x = np.ones(n)
+    b = a @ x
+    ops = 2.0 * n**3 / 3.0 + 2.0 * n**2
+
+    start = time.perf_counter()
+    solution = np.linalg.solve(a, b)
+    total = time.perf_counter() - start
+
+    residual = np.abs(a @ solution - b).max()
+    residual_norm = (
+        residual
+        / n
+        / np.abs(a).max()
+        / np.abs(solution).max()
+        / np.finfo(np.float64).eps
+    )
+
+    print("NUMPY_LINALG")
+    print(f"  NumPy version                = {np.__version__}")
+    print(f"  BLAS library                 = {blas_library()}")
+    print(f"  Threads                      = {blas_threads()}")
+    print(f"  Matrix order N               = {n}")
+    print()
+    print(f"  Norm. Resid                  = {residual_norm:f}")
+    print(f"  Total                        = {total:f}")
+    print(f"  MFLOPS                       = {ops / (1.0e6 * total):f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,107 @@
 """
 Generate a PDF report from benchmark data.
-- First command line parameter is the directory containing the chart images.
+- First command line parameter is the directory containing the chart images,
+  in the format set by the CHART_FORMAT environment variable (see
+  'charts.py').
 - Second command line parameter is the pathname of the summary CSV file.
 - Third command line parameter is the pathname of the PDF report to generate.
+- The '--force' option regenerates the report even if its content is
+  unchanged.
+- The '--profile-imports' option records the time taken by each import (see
+  'import_profile.py'). fpdf and tabulate are only imported when they are
+  used.
 """
 
 from dataclasses import dataclass
 from datetime import datetime
+from hashlib import sha256
 from os import getenv, path
 from sys import argv
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
-from tabulate import tabulate
 
-from yellowdog_pdf import YellowPDF
-
-# Input Data setup  ############################################################
-
-# Command line inputs
-try:
-    chart_directory = argv[1]
-    csv_summary_file = argv[2]
-    pdf_report = argv[3]
-except IndexError as e:
-    print(f"Exception: {e}. Missing command line argument. Aborting")
-    exit(1)
+from benchmark_data import (
+    PERCENTILES,
+    chart_path,
+    instance_labels,
+    load_summary,
+    percentile_bands,
+    rank_column,
+    sweep_chart_files,
+    system_chart_files,
+    top_and_bottom,
+)
+from benchmark_registry import (
+    LATENCY_REGISTRY,
+    Matrix,
+    Scaling,
+    selected_benchmarks,
+    selected_sweeps,
+)
+from import_profile import PROFILE_IMPORTS_OPTION, profile_imports
+from price_performance import (
+    CURRENCY_COLUMN,
+    add_price_performance,
+    has_prices,
+    pareto_chart_file,
+    per_price_benchmark,
+    per_price_column,
+    per_vcpu_column,
+)
+from render_cache import RenderManifest, content_hash, data_hash, file_hash
+from results_store import history_chart_file
+from trial_statistics import CONFIDENCE_LEVEL, significant_lead
 
 # Benchmark selection string
 env_benchmarks = getenv("BENCHMARKS", "")
 
-now = datetime.utcnow()
+# The directory containing this script and the report's header and footer images
+SCRIPT_DIRECTORY = path.dirname(path.abspath(__file__))
+
+# The number of best and worst performing instances to list for each benchmark
+REPORT_TOP_N = int(getenv("REPORT_TOP_N", "3"))
+
+NO_RESULTS = "No results"
+
+# Marks a best-performing instance whose lead is not statistically significant
+NOT_SIGNIFICANT = " *"
+
+SCALING_TEXT = (
+    "The benchmark is also run with 1, 2, 4, ... threads, up to one per vCPU."
+    " The scaling chart shows the result at each thread count, and the parallel"
+    " efficiency: the speedup over one thread divided by the number of threads."
+    " Efficiency that falls away once the threads outnumber the physical cores"
+    " points to simultaneous multithreading (SMT), and a gradual decline to"
+    " shared resources such as memory bandwidth, or lower turbo frequencies"
+    " with more cores active."
+)
 
 
 # Utility functions and classes  ###############################################
 
 
-def performance_table(df: pd.DataFrame, benchmark_headers: List[str]) -> Optional[str]:
+def scaling_charts(name: Optional[str], sweep_charts: Optional[List[str]]) -> List[str]:
     """
-    Find the best and worst performing instances for each benchmark.
-    Return the tabulated results.
+    The thread count scaling charts generated for a benchmark.
+    """
+    return [
+        sweep.output_file
+        for sweep in selected_sweeps(name or "")
+        if isinstance(sweep, Scaling) and sweep.output_file in (sweep_charts or [])
+    ]
+
+
+def performance_table(
+    df: pd.DataFrame, labels: pd.Series, benchmark_headers: List[str]
+) -> Optional[str]:
     """
+    Find the best and worst performing instances for each benchmark. Best
+    performers whose lead over the runner-up is not statistically significant
+    are marked. Return the tabulated results.
+    """
+    from tabulate import tabulate
+
     if len(benchmark_headers) == 0:
         return None
 
@@ -48,15 +109,13 @@ def performance_table(df: pd.DataFrame, benchmark_headers: List[str]) -> Optiona
 
     results = []
     for benchmark_header in benchmark_headers:
-        df.sort_values(by=benchmark_header, ascending=True, inplace=True)
-        worst = (
-            f"{df[getenv('H_PROVIDER')].iloc[0]} / {df[getenv('H_REGION')].iloc[0]} /"
-            f" {df[getenv('H_INSTANCE_TYPE')].iloc[0]}"
-        )
-        best = (
-            f"{df[getenv('H_PROVIDER')].iloc[-1]} / {df[getenv('H_REGION')].iloc[-1]} /"
-            f" {df[getenv('H_INSTANCE_TYPE')].iloc[-1]}"
-        )
+        if df[benchmark_header].count() == 0:
+            results.append([benchmark_header, NO_RESULTS, NO_RESULTS])
+            continue
+        best = labels[df[benchmark_header].idxmax()]
+        if not significant_lead(df, benchmark_header):
+            best += NOT_SIGNIFICANT
+        worst = labels[df[benchmark_header].idxmin()]
         results.append([benchmark_header, best, worst])
 
     return tabulate(
@@ -64,6 +123,102 @@ def performance_table(df: pd.DataFrame, benchmark_headers: List[str]) -> Optiona
     )
 
 
+def ranking_table(
+    df: pd.DataFrame, labels: pd.Series, benchmark_headers: List[str], n: int
+) -> Optional[str]:
+    """
+    List the top 'n' and bottom 'n' instances for each benchmark, with their
+    ranks and scores. Return the tabulated results.
+    """
+    from tabulate import tabulate
+
+    if len(benchmark_headers) == 0 or n <= 0:
+        return None
+
+    headings = ["Benchmark", "Rank", "Instance", "Score"]
+
+    results = []
+    for benchmark_header in benchmark_headers:
+        rank = rank_column(benchmark_header)
+        top, bottom = top_and_bottom(df, benchmark_header, n)
+        rows = [
+            [row[rank], labels[index], f"{row[benchmark_header]:,.2f}"]
+            for index, row in top.iterrows()
+        ]
+        if len(bottom) > 0 and bottom[rank].min() > n + 1:
+            rows.append(["...", "", ""])
+        rows += [
+            [row[rank], labels[index], f"{row[benchmark_header]:,.2f}"]
+            for index, row in bottom.iterrows()
+        ]
+        if len(rows) == 0:
+            rows.append(["", NO_RESULTS, ""])
+        for row_number, row in enumerate(rows):
+            results.append([benchmark_header if row_number == 0 else ""] + row)
+
+    return tabulate(
+        results, headers=headings, showindex="never", tablefmt="pretty", numalign="left"
+    )
+
+
+def price_performance_table(
+    df: pd.DataFrame, labels: pd.Series, benchmark_headers: List[str]
+) -> Optional[str]:
+    """
+    Find the instances with the best score per unit of hourly price, and the
+    best score per vCPU, for each benchmark. Return the tabulated results.
+    """
+    from tabulate import tabulate
+
+    if len(benchmark_headers) == 0:
+        return None
+
+    headings = ["Benchmark", "Best Score per Price/Hr", "Best Score per vCPU"]
+
+    results = []
+    for benchmark_header in benchmark_headers:
+        row = [benchmark_header]
+        for column in (
+            per_price_column(benchmark_header),
+            per_vcpu_column(benchmark_header),
+        ):
+            row.append(
+                labels[df[column].idxmax()] if df[column].count() > 0 else NO_RESULTS
+            )
+        results.append(row)
+
+    return tabulate(
+        results, headers=headings, showindex="never", tablefmt="pretty", numalign="left"
+    )
+
+
+def percentile_table(df: pd.DataFrame, benchmark_headers: List[str]) -> Optional[str]:
+    """
+    Find the benchmark scores at each percentile band for each benchmark.
+    Return the tabulated results.
+    """
+    from tabulate import tabulate
+
+    if len(benchmark_headers) == 0:
+        return None
+
+    headings = ["Benchmark"] + [
+        "Median" if percentile == 0.5 else f"P{percentile * 100:.0f}"
+        for percentile in PERCENTILES
+    ]
+
+    results = [
+        [benchmark_header] + [f"{score:,.2f}" for score in scores]
+        for benchmark_header, scores in percentile_bands(
+            df, benchmark_headers
+        ).iterrows()
+    ]
+
+    return tabulate(
+        results, headers=headings, showindex="never", tablefmt="pretty", numalign="left"
+    )
+
+
 class DocNumbers:
     """
     Keep track of section & reference numbers.
@@ -84,9 +239,6 @@ class DocNumbers:
         return str(self.reference_number)
 
 
-doc_numbers = DocNumbers()
-
-
 @dataclass
 class Reference:
     """
@@ -116,452 +268,820 @@ class Section:
     reference: Optional[Reference] = None
 
 
-# Define main document sections  ###############################################
+# Report generation  ###########################################################
 
 
-sections = [
-    Section(
-        page_break_before=False,
-        heading="Methodology",
-        paragraphs_1=[
-            "The benchmarks illustrated in this report were generated "
-            "using the YellowDog Platform. YellowDog offers its customers this "
-            "complimentary benchmarking tool to aid in the selection of "
-            "optimal compute while demonstrating the power of the YellowDog "
-            "Platform. Customers are free to enhance, optimise and customise "
-            "the benchmarks for their own application workloads and compute "
-            "choices."
-        ],
-        page_break_after=False,
-    ),
-    Section(
-        page_break_before=False,
-        heading="Compute Selection",
-        paragraphs_1=[
-            "Compute instance types to benchmark are selected via a YellowDog Dynamic"
-            " Compute Template. This approach enables compute selection based on a"
-            " range of dynamic constraints and preferences such as 'instances must"
-            " have 8 VCPUs', or 'instances must be in Europe, with a preference for"
-            " the most RAM'. For more information on customising Dynamic Compute"
-            " Templates please see the YellowDog Documentation"
-            f" [{doc_numbers.next_reference}]."
-        ],
-        page_break_after=False,
-        reference=Reference(
-            ref_number=str(doc_numbers.reference_number),
-            ref_text="YellowDog Dynamic Compute Requirement Templates:",
-            ref_link="https://docs.yellowdog.co/#/the-platform/dynamic-templates",
-        ),
-    ),
-    Section(
-        page_break_before=False,
-        heading="Benchmark Selection",
-        paragraphs_1=[
-            (
-                "Specific benchmarks can be selected from the full set of "
-                "benchmarks available using the configuration file for the "
-                "benchmark Work Requirement, or by using environment or command "
-                "line variables. Please see the the benchmark documentation for "
-                "more details."
-            ),
-            "The available benchmark names that can be selected are:",
-        ],
-        bulleted_list_1=[
-            "sysbench",
-            "mysql-tpcc",
-            "coremark-standard",
-            "coremark-pro",
-            "linpack",
-        ],
-        page_break_after=False,
-    ),
-    Section(
-        page_break_before=False,
-        heading="Benchmark Optimisation",
-        paragraphs_1=[
-            "No attempts have been made to optimise compute instances or their "
-            "software stacks for the purposes of running the benchmarks. "
-            "Requirements vary significantly between users, workloads, and "
-            "environments, and tuning is often required to achieve the best "
-            "benchmark results. Instances are tested as per the default "
-            "configuration applied by the given cloud provider and with "
-            "'vanilla' software installations. If you have specific "
-            "configurations or optimisations that you wish to apply to "
-            "instances prior to benchmarking, this can be achieved by applying "
-            "cloud configuration via YellowDog user data when "
-            f"provisioning [{doc_numbers.next_reference}]."
-        ],
-        page_break_after=False,
-        reference=Reference(
-            ref_number=str(doc_numbers.reference_number),
-            ref_text="YellowDog User Data Support:",
-            ref_link="https://docs.yellowdog.co/#/the-platform/user-data",
-        ),
-    ),
-]
+def generate_report(
+    df: pd.DataFrame,
+    chart_directory: str,
+    pdf_report: str,
+    force: bool = False,
+    history_charts: Optional[List[str]] = None,
+    latency_charts: Optional[List[str]] = None,
+    sweep_charts: Optional[List[str]] = None,
+    system_charts: Optional[List[str]] = None,
+    charts: Optional[Dict[str, bytes]] = None,
+):
+    """
+    Generate the PDF report from the benchmark data, using the chart images in
+    'chart_directory', or those in 'charts', keyed by output file, which are
+    used as they are, without being read from files. Any results over time
+    charts generated from the results store, latency and sweep charts
+    generated from the result records, and system activity charts generated
+    from the system samples, are included. Charts that are in neither place,
+    e.g., because they failed to render, are omitted. The report is not
+    regenerated if its data and charts are unchanged since it was last
+    generated, unless 'force' is set.
+    """
+    charts = charts or {}
 
-# Load benchmark data into a DataFrame
-data = pd.read_csv(csv_summary_file, skipinitialspace=True)
-df = pd.DataFrame(data)
+    now = datetime.utcnow()
+    doc_numbers = DocNumbers()
 
-# Accumulate the selected benchmark sections
-benchmark_list: List[str] = []
-benchmark_headers: List[str] = []
+    # Define main document sections  ###########################################
 
-if getenv("N_SYSBENCH") in env_benchmarks:
-    sections.append(
-        Section(
-            heading="Sysbench CPU Benchmark",
-            paragraphs_1=[
-                (
-                    f"Sysbench [{doc_numbers.next_reference}] is a scriptable,"
-                    " multi-threaded benchmark tool based on LuaJIT. It is most"
-                    " frequently used for database benchmarks, but can also be used to"
-                    " create arbitrarily complex workloads that do not involve a"
-                    " database server, as well as general tests on memory and storage"
-                    " performance."
-                ),
-                (
-                    "When benchmarking the CPU performance of your selected "
-                    "instance types we run sysbench in two modes, measuring "
-                    "single-core and multi-core (one thread per vCPU) performance."
-                ),
-            ],
-            charts=["sysbench-single.png", "sysbench-multi.png"],
-            reference=Reference(
-                ref_number=str(doc_numbers.reference_number),
-                ref_text="Sysbench Wikipedia:",
-                ref_link="https://en.wikipedia.org/wiki/Sysbench",
-            ),
-        )
-    )
-    sections.append(
+    sections = [
         Section(
-            heading="Sysbench Memory Benchmark",
+            page_break_before=False,
+            heading="Methodology",
             paragraphs_1=[
-                "The Sysbench memory benchmark is run with a 1MB memory block size and"
-                " a total memory throughput of 10GB, using one thread per vCPU."
+                "The benchmarks illustrated in this report were generated "
+                "using the YellowDog Platform. YellowDog offers its customers this "
+                "complimentary benchmarking tool to aid in the selection of "
+                "optimal compute while demonstrating the power of the YellowDog "
+                "Platform. Customers are free to enhance, optimise and customise "
+                "the benchmarks for their own application workloads and compute "
+                "choices.",
+                "Each benchmark is repeated for several trials on each instance, and"
+                " the median result is reported. Where there are repeated trials, the"
+                " charts show the confidence interval of each result as an error bar.",
             ],
-            charts=["sysbench-memory.png"],
-        )
-    )
-    sections.append(
+            page_break_after=False,
+        ),
         Section(
-            heading="Sysbench Storage Benchmark",
+            page_break_before=False,
+            heading="Compute Selection",
             paragraphs_1=[
-                "The Sysbench storage ('fileio') benchmark is run with a total file"
-                " size of 1GB, a duration of 60s, and one thread per vCPU."
-            ],
-            charts=[
-                "sysbench-storage-reads.png",
-                "sysbench-storage-writes.png",
-                "sysbench-storage-fsyncs.png",
+                "Compute instance types to benchmark are selected via a YellowDog Dynamic"
+                " Compute Template. This approach enables compute selection based on a"
+                " range of dynamic constraints and preferences such as 'instances must"
+                " have 8 VCPUs', or 'instances must be in Europe, with a preference for"
+                " the most RAM'. For more information on customising Dynamic Compute"
+                " Templates please see the YellowDog Documentation"
+                f" [{doc_numbers.next_reference}]."
             ],
-        )
-    )
-    benchmark_list += ["Sysbench CPU", "Sysbench Memory", "Sysbench Storage"]
-    benchmark_headers += [
-        getenv("H_SYSBENCH_SC"),
-        getenv("H_SYSBENCH_MC"),
-        getenv("H_SYSBENCH_MEM"),
-        getenv("H_SYSBENCH_ST_R"),
-        getenv("H_SYSBENCH_ST_W"),
-        getenv("H_SYSBENCH_ST_F"),
-    ]
-
-if getenv("N_MYSQL_TPCC") in env_benchmarks:
-    sections.append(
+            page_break_after=False,
+            reference=Reference(
+                ref_number=str(doc_numbers.reference_number),
+                ref_text="YellowDog Dynamic Compute Requirement Templates:",
+                ref_link="https://docs.yellowdog.co/#/the-platform/dynamic-templates",
+            ),
+        ),
         Section(
-            heading="MySQL TPC-C (Sysbench) Benchmark",
+            page_break_before=False,
+            heading="Benchmark Selection",
             paragraphs_1=[
                 (
-                    "The MySQL TPC-C benchmark uses Sysbench and the Percona TPC-C"
-                    f" benchmark scripts [{doc_numbers.next_reference}]. MySQL and the"
-                    " benchmark itself run on the same instance. The benchmark is"
-                    " reduced in scale to allow it run on instances with"
-                    " standard-sized root volumes, and to conclude in a reasonable"
-                    " duration."
+                    "Specific benchmarks can be selected from the full set of "
+                    "benchmarks available using the configuration file for the "
+                    "benchmark Work Requirement, or by using environment or command "
+                    "line variables. Please see the the benchmark documentation for "
+                    "more details."
                 ),
-                "The following values are used:",
+                "The available benchmark names that can be selected are:",
             ],
             bulleted_list_1=[
-                "tables = 1",
-                "time = 30 (setup), 60 (benchmark run)",
-                "scale = 1",
-                "threads = 16",
+                "sysbench",
+                "mysql-tpcc",
+                "coremark-standard",
+                "coremark-pro",
+                "linpack",
+                "numpy-linalg",
+                "stream",
             ],
-            charts=["sysbench-mysql-tpcc.png"],
-            paragraphs_2=[
-                "Note: If TPS is zero then the instance doesn't have "
-                "enough memory (2GB) to run MySQL, and the benchmark "
-                "was omitted."
+            page_break_after=False,
+        ),
+        Section(
+            page_break_before=False,
+            heading="Benchmark Optimisation",
+            paragraphs_1=[
+                "No attempts have been made to optimise compute instances or their "
+                "software stacks for the purposes of running the benchmarks. "
+                "Requirements vary significantly between users, workloads, and "
+                "environments, and tuning is often required to achieve the best "
+                "benchmark results. Instances are tested as per the default "
+                "configuration applied by the given cloud provider and with "
+                "'vanilla' software installations. If you have specific "
+                "configurations or optimisations that you wish to apply to "
+                "instances prior to benchmarking, this can be achieved by applying "
+                "cloud configuration via YellowDog user data when "
+                f"provisioning [{doc_numbers.next_reference}]."
             ],
+            page_break_after=False,
             reference=Reference(
                 ref_number=str(doc_numbers.reference_number),
-                ref_text="Sysbench MySQL TPC-C:",
-                ref_link="https://github.com/Percona-Lab/sysbench-tpcc",
+                ref_text="YellowDog User Data Support:",
+                ref_link="https://docs.yellowdog.co/#/the-platform/user-data",
             ),
+        ),
+    ]
+
+    # Accumulate the selected benchmark sections
+    benchmark_list: List[str] = []
+    benchmark_headers: List[str] = [
+        benchmark.column_title for benchmark in selected_benchmarks(env_benchmarks)
+    ]
+
+    if getenv("N_SYSBENCH") in env_benchmarks:
+        sysbench_scaling = scaling_charts(getenv("N_SYSBENCH"), sweep_charts)
+        sections.append(
+            Section(
+                heading="Sysbench CPU Benchmark",
+                paragraphs_1=[
+                    (
+                        f"Sysbench [{doc_numbers.next_reference}] is a scriptable,"
+                        " multi-threaded benchmark tool based on LuaJIT. It is most"
+                        " frequently used for database benchmarks, but can also be used to"
+                        " create arbitrarily complex workloads that do not involve a"
+                        " database server, as well as general tests on memory and storage"
+                        " performance."
+                    ),
+                    (
+                        "When benchmarking the CPU performance of your selected "
+                        "instance types we run sysbench in two modes, measuring "
+                        "single-core and multi-core (one thread per vCPU) performance."
+                    ),
+                ]
+                + ([SCALING_TEXT] if len(sysbench_scaling) > 0 else []),
+                charts=["sysbench-single.png", "sysbench-multi.png"] + sysbench_scaling,
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="Sysbench Wikipedia:",
+                    ref_link="https://en.wikipedia.org/wiki/Sysbench",
+                ),
+            )
+        )
+        sections.append(
+            Section(
+                heading="Sysbench Memory Benchmark",
+                paragraphs_1=[
+                    "The Sysbench memory benchmark is run with a 1MB memory block size and"
+                    " a total memory throughput of 10GB, using one thread per vCPU."
+                ],
+                charts=["sysbench-memory.png"],
+            )
+        )
+        sections.append(
+            Section(
+                heading="Sysbench Storage Benchmark",
+                paragraphs_1=[
+                    "The Sysbench storage ('fileio') benchmark is run with random reads"
+                    " and writes, a total file size of twice the instance's RAM (at"
+                    " least 1GB, so that the files don't fit in the page cache), a"
+                    " duration of 60s, and one thread per vCPU."
+                ],
+                charts=[
+                    "sysbench-storage-reads.png",
+                    "sysbench-storage-writes.png",
+                    "sysbench-storage-fsyncs.png",
+                ],
+            )
+        )
+        storage_matrix_charts = [
+            sweep_chart
+            for sweep_chart in sweep_chart_files(
+                df,
+                [
+                    sweep
+                    for sweep in selected_sweeps(getenv("N_SYSBENCH"))
+                    if isinstance(sweep, Matrix)
+                ],
+            )
+            if sweep_chart in (sweep_charts or [])
+        ]
+        if len(storage_matrix_charts) > 0:
+            sections.append(
+                Section(
+                    heading="Sysbench Storage Matrix",
+                    paragraphs_1=[
+                        (
+                            "The storage matrix runs the Sysbench storage benchmark on"
+                            " the same test files for sequential and random reads and"
+                            " writes, over a range of block sizes and thread counts,"
+                            " for a few seconds at each point. By default, the files"
+                            " are opened with O_DIRECT, so that the page cache is"
+                            " bypassed and the device itself is measured."
+                        ),
+                        (
+                            "For each instance, heatmaps show the operations per"
+                            " second, the throughput and the 95th percentile latency"
+                            " of each access pattern, by block size and thread count."
+                            " Small random operations are typically limited by IOPS,"
+                            " and large sequential ones by throughput."
+                        ),
+                    ],
+                    charts=storage_matrix_charts,
+                )
+            )
+        benchmark_list += ["Sysbench CPU", "Sysbench Memory", "Sysbench Storage"]
+
+    if getenv("N_MYSQL_TPCC") in env_benchmarks:
+        sections.append(
+            Section(
+                heading="MySQL TPC-C (Sysbench) Benchmark",
+                paragraphs_1=[
+                    (
+                        "The MySQL TPC-C benchmark uses Sysbench and the Percona TPC-C"
+                        f" benchmark scripts [{doc_numbers.next_reference}]. MySQL and the"
+                        " benchmark itself run on the same instance. The benchmark is"
+                        " reduced in scale to allow it run on instances with"
+                        " standard-sized root volumes, and to conclude in a reasonable"
+                        " duration."
+                    ),
+                    "The following values are used:",
+                ],
+                bulleted_list_1=[
+                    "tables = 1",
+                    "time = 30 (setup), 60 (benchmark run)",
+                    "scale = 1",
+                    "threads = 16",
+                ],
+                charts=["sysbench-mysql-tpcc.png"],
+                paragraphs_2=[
+                    "Note: If TPS is zero then the instance doesn't have "
+                    "enough memory (2GB) to run MySQL, and the benchmark "
+                    "was omitted."
+                ],
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="Sysbench MySQL TPC-C:",
+                    ref_link="https://github.com/Percona-Lab/sysbench-tpcc",
+                ),
+            )
+        )
+        benchmark_list.append("MySQL TPC-C (Sysbench)")
+
+    if getenv("N_COREMARK_STD") in env_benchmarks:
+        coremark_scaling = scaling_charts(getenv("N_COREMARK_STD"), sweep_charts)
+        sections.append(
+            Section(
+                heading="CoreMark Benchmark",
+                paragraphs_1=[
+                    f"The CoreMark benchmark [{doc_numbers.next_reference}] stresses the"
+                    " CPU pipeline. The benchmark is compiled and run twice, once in"
+                    " single-threaded form, and once in a form compiled to run with"
+                    " multiple threads, one per vCPU."
+                ]
+                + ([SCALING_TEXT] if len(coremark_scaling) > 0 else []),
+                charts=["coremark-single.png", "coremark-multi.png"] + coremark_scaling,
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="CoreMark:",
+                    ref_link="https://github.com/eembc/coremark.git",
+                ),
+            ),
+        )
+        benchmark_list.append("CoreMark")
+
+    if getenv("N_COREMARK_PRO") in env_benchmarks:
+        sections.append(
+            Section(
+                heading="CoreMark Pro Benchmark",
+                paragraphs_1=[
+                    (
+                        f"The CoreMark Pro benchmark [{doc_numbers.next_reference}] tests"
+                        " the entire processor, adding comprehensive support for"
+                        " multi-core technology, a combination of integer and"
+                        " floating-point workloads, and data sets for utilising larger"
+                        " memory subsystems."
+                    ),
+                    "The benchmark is compiled on the target instance before it's run.",
+                ],
+                charts=["coremark-pro-single.png", "coremark-pro-multi.png"],
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="CoreMark Pro:",
+                    ref_link="https://github.com/eembc/coremark-pro.git",
+                ),
+            )
+        )
+        benchmark_list.append("CoreMark Pro")
+
+    if getenv("N_LINPACK") in env_benchmarks:
+        sections.append(
+            Section(
+                heading="LINPACK Benchmark",
+                paragraphs_1=[
+                    (
+                        f"The LINPACK benchmark [{doc_numbers.next_reference}] is a test"
+                        " problem used to rate the performance of a computer on a simple"
+                        " linear algebra problem. The benchmark reports the number of"
+                        " millions of floating point operations per second (MFLOPS)."
+                    ),
+                    (
+                        "The benchmark is compiled on the target instance with"
+                        " optimisation and OpenMP enabled before being run. The matrix"
+                        " is factored in panels of columns, with the update of the"
+                        " remaining columns shared between threads. It is run"
+                        " single-threaded on one core, and with one thread per vCPU."
+                    ),
+                ],
+                charts=["linpack-single.png", "linpack-multi.png"],
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="LINPACK:",
+                    ref_link="https://people.sc.fsu.edu/~jburkardt/c_src/linpack_bench/linpack_bench.html",
+                ),
+            )
+        )
+        benchmark_list.append("LINPACK")
+
+    if getenv("N_NUMPY_LINALG") in env_benchmarks:
+        sections.append(
+            Section(
+                heading="NumPy Linear Solve Benchmark",
+                paragraphs_1=[
+                    (
+                        "A companion to the LINPACK benchmark, which solves a random"
+                        " dense linear system of the same size using NumPy's"
+                        f" 'linalg.solve' function [{doc_numbers.next_reference}], to"
+                        " measure the throughput of the optimised BLAS and LAPACK"
+                        " libraries supplied with NumPy. The operation count is the"
+                        " same as for LINPACK, so the MFLOPS are directly comparable."
+                    ),
+                    (
+                        "The benchmark is run with a single BLAS thread on one core,"
+                        " and with one BLAS thread per vCPU."
+                    ),
+                ],
+                charts=["numpy-linalg-single.png", "numpy-linalg-multi.png"],
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="NumPy linalg.solve:",
+                    ref_link="https://numpy.org/doc/stable/reference/generated/numpy.linalg.solve.html",
+                ),
+            )
+        )
+        benchmark_list.append("NumPy Linear Solve")
+
+    if getenv("N_STREAM") in env_benchmarks:
+        sections.append(
+            Section(
+                heading="STREAM Memory Benchmark",
+                paragraphs_1=[
+                    (
+                        f"The STREAM benchmark [{doc_numbers.next_reference}] measures"
+                        " sustainable memory bandwidth using four simple vector"
+                        " kernels over arrays much larger than the caches: Copy"
+                        " (a = b), Scale (a = q.b), Add (a = b + c) and Triad"
+                        " (a = b + q.c). The kernels are run with one thread per"
+                        " vCPU, and the best rate of each kernel is reported in MB"
+                        " per second."
+                    ),
+                    (
+                        "Memory latency is measured by pointer chasing: a single"
+                        " thread follows a chain of dependent loads through a"
+                        " working set in a random order, which defeats hardware"
+                        " prefetching. The working set doubles from 4 KiB, within"
+                        " the L1 cache, to several times the size of the last-level"
+                        " cache, so that the steps in the latency curve show the"
+                        " latency of each cache level and of DRAM. The latency at"
+                        " the largest working set is included in the Latency"
+                        " section."
+                    ),
+                ],
+                charts=[
+                    "stream-copy.png",
+                    "stream-scale.png",
+                    "stream-add.png",
+                    "stream-triad.png",
+                ]
+                + [
+                    sweep.output_file
+                    for sweep in selected_sweeps(getenv("N_STREAM"))
+                    if sweep.output_file in (sweep_charts or [])
+                ],
+                reference=Reference(
+                    ref_number=str(doc_numbers.reference_number),
+                    ref_text="STREAM:",
+                    ref_link="https://www.cs.virginia.edu/stream/",
+                ),
+            )
         )
+        benchmark_list.append("STREAM")
+
+    # 'Provider / Region / Instance Type' labels, disambiguating identical rows
+    labels = instance_labels(
+        df, [getenv("H_PROVIDER"), getenv("H_REGION"), getenv("H_INSTANCE_TYPE")]
+    )
+
+    # Whether any best-performing instance's lead is not significant
+    any_insignificant_lead = any(
+        not significant_lead(df, benchmark_header)
+        for benchmark_header in benchmark_headers
+        if df[benchmark_header].count() > 0
     )
-    benchmark_list.append("MySQL TPC-C (Sysbench)")
-    benchmark_headers.append(getenv("H_MYSQL_TPCC"))
 
-if getenv("N_COREMARK_STD") in env_benchmarks:
-    sections.append(
+    # Concluding sections
+    sections += [
         Section(
-            heading="CoreMark Benchmark",
+            heading="Overall Summary of Results",
             paragraphs_1=[
-                f"The CoreMark benchmark [{doc_numbers.next_reference}] stresses the"
-                " CPU pipeline. The benchmark is compiled and run twice, once in"
-                " single-threaded form, and once in a form compiled to run with"
-                " multiple threads, one per vCPU."
+                "The table below shows the best and worst performing instance types for the"
+                " benchmark(s) performed."
             ],
-            charts=["coremark-single.png", "coremark-multi.png"],
-            reference=Reference(
-                ref_number=str(doc_numbers.reference_number),
-                ref_text="CoreMark:",
-                ref_link="https://github.com/eembc/coremark.git",
+            table_text=performance_table(df, labels, benchmark_headers),
+            paragraphs_2=(
+                [
+                    f"{NOT_SIGNIFICANT.strip()} The lead of this instance over the"
+                    " next best-performing instance is not statistically"
+                    f" significant: their {CONFIDENCE_LEVEL:.0%} confidence"
+                    " intervals, from repeated benchmark trials, overlap."
+                ]
+                if any_insignificant_lead
+                else None
             ),
         ),
-    )
-    benchmark_list.append("CoreMark")
-    benchmark_headers += [getenv("H_COREMARK_STD_SC"), getenv("H_COREMARK_STD_MC")]
-
-if getenv("N_COREMARK_PRO") in env_benchmarks:
-    sections.append(
         Section(
-            heading="CoreMark Pro Benchmark",
+            page_break_before=False,
+            heading="Benchmark Percentiles",
             paragraphs_1=[
-                (
-                    f"The CoreMark Pro benchmark [{doc_numbers.next_reference}] tests"
-                    " the entire processor, adding comprehensive support for"
-                    " multi-core technology, a combination of integer and"
-                    " floating-point workloads, and data sets for utilising larger"
-                    " memory subsystems."
-                ),
-                "The benchmark is compiled on the target instance before it's run.",
+                "The table below shows the benchmark scores at the 10th, 25th, 50th,"
+                " 75th and 90th percentiles across all instances."
             ],
-            charts=["coremark-pro-single.png", "coremark-pro-multi.png"],
-            reference=Reference(
-                ref_number=str(doc_numbers.reference_number),
-                ref_text="CoreMark Pro:",
-                ref_link="https://github.com/eembc/coremark-pro.git",
-            ),
+            table_text=percentile_table(df, benchmark_headers),
+        ),
+    ]
+    if REPORT_TOP_N > 0:
+        sections.append(
+            Section(
+                heading="Benchmark Rankings",
+                paragraphs_1=[
+                    f"The table below shows the top {REPORT_TOP_N} and bottom"
+                    f" {REPORT_TOP_N} instances for each benchmark, ranked by score."
+                ],
+                table_text=ranking_table(df, labels, benchmark_headers, REPORT_TOP_N),
+            )
         )
-    )
-    benchmark_list.append("CoreMark Pro")
-    benchmark_headers += [getenv("H_COREMARK_PRO_SC"), getenv("H_COREMARK_PRO_MC")]
-
-if getenv("N_LINPACK") in env_benchmarks:
-    sections.append(
+    if latency_charts:
+        sections.append(
+            Section(
+                heading="Latency",
+                paragraphs_1=[
+                    "The charts below show the 95th percentile latency of each"
+                    " instance in the sysbench and MySQL TPC-C benchmarks, and the"
+                    " STREAM pointer-chasing latency at the largest working set, as"
+                    " the median across trials. Lower latency is better."
+                ],
+                charts=latency_charts,
+            )
+        )
+    if system_charts:
+        sections.append(
+            Section(
+                heading="System Activity",
+                paragraphs_1=[
+                    "While the benchmarks run, the CPU utilisation, CPU frequency,"
+                    " memory use and disk throughput of each instance are sampled at"
+                    " a regular interval. The charts below show these over each"
+                    " instance's run, with the benchmark measurement phases shaded"
+                    " and named, so that a result can be checked against how the"
+                    " instance behaved while it was measured.",
+                    "CPU time stolen by the hypervisor ('steal'), or a CPU"
+                    " frequency that falls during a phase, indicates that the"
+                    " instance was throttled, e.g., a burstable instance that has"
+                    " exhausted its CPU credits. The mean of each metric during"
+                    " each phase is saved in the phases file alongside the"
+                    " summary CSV file.",
+                ],
+                charts=system_charts,
+            )
+        )
+    if has_prices(df):
+        selected = selected_benchmarks(env_benchmarks)
+        currencies = ", ".join(sorted(df[CURRENCY_COLUMN].dropna().unique()))
+        sections.append(
+            Section(
+                heading="Price-Performance",
+                paragraphs_1=[
+                    "The price-performance of each instance is its benchmark score"
+                    " divided by its on-demand hourly price. Prices are in"
+                    f" {currencies}. The table below shows the instance types with"
+                    " the best score per unit of hourly price, and the best score"
+                    " per vCPU, for each benchmark.",
+                ],
+                table_text=price_performance_table(df, labels, benchmark_headers),
+                charts=[
+                    chart
+                    for benchmark in selected
+                    for chart in (
+                        per_price_benchmark(benchmark).output_file,
+                        pareto_chart_file(benchmark),
+                    )
+                ],
+                paragraphs_2=[
+                    "In the price against performance charts, the Pareto frontier"
+                    " links the instances for which no other instance is both"
+                    " cheaper and better-performing."
+                ],
+            )
+        )
+    if history_charts:
+        sections.append(
+            Section(
+                heading="Results over Time",
+                paragraphs_1=[
+                    "The charts below show the results of earlier benchmark runs"
+                    " for instance types included in this run, from the results"
+                    " store. For each benchmark, the instance types with the"
+                    " largest downward trend in results are shown."
+                ],
+                charts=history_charts,
+            )
+        )
+    sections += [
         Section(
-            heading="LINPACK Benchmark",
+            page_break_before=False,
+            heading="Disclaimer",
             paragraphs_1=[
-                (
-                    f"The LINPACK benchmark [{doc_numbers.next_reference}] is a test"
-                    " problem used to rate the performance of a computer on a simple"
-                    " linear algebra problem. The benchmark reports the number of"
-                    " millions of floating point operations per second (MFLOPS)."
-                ),
-                "The benchmark is compiled on the target instance before being run.",
+                "While YellowDog does its best to provide helpful and accurate results, the"
+                " benchmark(s) presented in this report are intended to be illustrative"
+                " only, and do not necessarily represent the performance that would be"
+                " achieved under real world conditions. Results should be independently"
+                " confirmed with representative compute instances, software and workloads,"
+                " before decisions are made."
             ],
-            charts=["linpack.png"],
-            reference=Reference(
-                ref_number=str(doc_numbers.reference_number),
-                ref_text="LINPACK:",
-                ref_link="https://people.sc.fsu.edu/~jburkardt/c_src/linpack_bench/linpack_bench.html",
-            ),
-        )
-    )
-    benchmark_list.append("LINPACK")
-    benchmark_headers.append(getenv("H_LINPACK"))
-
-# Concluding sections
-sections += [
-    Section(
-        heading="Overall Summary of Results",
-        paragraphs_1=[
-            "The table below shows the best and worst performing instance types for the"
-            " benchmark(s) performed."
-        ],
-        table_text=performance_table(df, benchmark_headers),
-    ),
-    Section(
-        page_break_before=False,
-        heading="Disclaimer",
-        paragraphs_1=[
-            "While YellowDog does its best to provide helpful and accurate results, the"
-            " benchmark(s) presented in this report are intended to be illustrative"
-            " only, and do not necessarily represent the performance that would be"
-            " achieved under real world conditions. Results should be independently"
-            " confirmed with representative compute instances, software and workloads,"
-            " before decisions are made."
+        ),
+    ]
+
+    # Skip regeneration if the report's content is unchanged  ##################
+
+    manifest = RenderManifest(path.dirname(path.abspath(pdf_report)))
+    report_file = path.basename(pdf_report)
+    digest = content_hash(
+        sha256(pd.util.hash_pandas_object(df).values.tobytes()).hexdigest(),
+        sections,
+        [
+            (
+                data_hash(charts[chart])
+                if chart in charts
+                else (
+                    file_hash(path.join(chart_directory, chart_path(chart)))
+                    if path.exists(path.join(chart_directory, chart_path(chart)))
+                    else None
+                )
+            )
+            for section in sections
+            if section.charts is not None
+            for chart in section.charts
         ],
-    ),
-]
+    )
+    if not force and manifest.is_current(report_file, digest):
+        print(f"Unchanged '{report_file}'")
+        return
 
-# Create the PDF document object  ##############################################
+    # Create the PDF document object  ##########################################
 
-pdf = YellowPDF()
+    # Imported here, so that an unchanged report doesn't pay for importing
+    # fpdf and PIL
+    from tabulate import tabulate
 
-# Title  #######################################################################
+    from yellowdog_pdf import YellowPDF
 
-pdf.print_title("YellowDog Benchmark Report")
+    pdf = YellowPDF(
+        header_image=path.join(SCRIPT_DIRECTORY, "yellowdog_header.png"),
+        footer_image=path.join(SCRIPT_DIRECTORY, "yellowdog_footer.png"),
+    )
 
-# Introductory Sections  #######################################################
+    # Title  ###################################################################
 
-pdf.print_heading(f"{doc_numbers.next_section}. Introduction")
-pdf.print_paragraph(
-    "This is an automatically generated benchmark report created using the "
-    f"YellowDog Platform, produced on {now.strftime('%A, %d %B')} at "
-    f"{now.strftime('%H:%M')} UTC."
-)
-pdf.print_horizontal_line()
-pdf.print_paragraph(
-    "As organisations accelerate the migration of workloads to the cloud it becomes"
-    " increasingly important to ensure optimisation of cloud compute choices for these"
-    " workloads.  YellowDog has visibility of thousands of different compute instance"
-    " types across the major cloud providers. Compute needs vary across cloud"
-    " consumers, with a range of motivations to optimise for cost, performance,"
-    " environmental impact, and geographic locality."
-)
-pdf.print_paragraph(
-    "This complimentary report has been generated by YellowDog's benchmarking tool. To"
-    " discuss more complex benchmarking needs, please speak to our support team [1]."
-)
+    pdf.print_title("YellowDog Benchmark Report")
 
-# Report the benchmarks that were run
-pdf.print_heading(f"{doc_numbers.next_section}. Benchmarks and Instances")
-benchmarks = ""
-for index, benchmark in enumerate(benchmark_list):
-    if index == len(benchmark_list) - 1 and len(benchmark_list) != 1:
-        benchmarks += "and "
-    benchmarks = f"{benchmarks}**{benchmark}**"
-    if index < len(benchmark_list) - 1:
-        if len(benchmark_list) > 2:
-            benchmarks += ", "
-        else:
-            benchmarks += " "
-if len(benchmark_list) == 0:
-    pdf.print_paragraph(f"No benchmarks were selected.")
-elif len(benchmark_list) == 1:
-    pdf.print_paragraph(f"The following benchmark was selected: {benchmarks}.")
-else:
-    pdf.print_paragraph(f"The following benchmarks were selected: {benchmarks}.")
-
-# Report data on the instance types that were used
-df.sort_values(by=[getenv("H_RAM"), getenv("H_VCPUS")], ascending=True, inplace=True)
-if len(df) == 1:
-    pdf.print_paragraph(f"The following instance was provisioned:")
-else:
-    pdf.print_paragraph(f"The following **{len(df)} instances** were provisioned:")
-
-# Create and print the instance table
-headers = [
-    getenv("H_PROVIDER"),
-    getenv("H_REGION"),
-    getenv("H_INSTANCE_TYPE"),
-    getenv("H_RAM"),
-    getenv("H_VCPUS"),
-    getenv("H_CPU_MODEL"),
-    getenv("H_INSTANCE_PRICE"),
-]
-table = tabulate(
-    df[headers], headers=headers, showindex="never", tablefmt="pretty", numalign="left"
-)
+    # Introductory Sections  ###################################################
 
-table_width = table.index("\n")
-if table_width > 110:
-    table_font = 7.0
-elif table_width > 99:
-    table_font = 7.75
-elif table_width > 88:
-    table_font = 8.0
-else:
-    table_font = 9.0
-pdf.print_paragraph(
-    table, align="C", font_size=table_font, bold=True, fixed_width=True, markdown=False
-)
-pdf.print_paragraph(
-    "The 'Price/Hr' is the on-demand price for the Instance Type, for the "
-    "given Provider and Region, and for an OS image without additional "
-    "licensing fees.",
-    font_size=9.0,
-    italic=True,
-)
-# Main Sections  ###############################################################
-
-for benchmark in sections:
-    if benchmark.page_break_before:
-        pdf.insert_page_break()
-    if benchmark.heading is not None:
-        pdf.print_heading(f"{doc_numbers.next_section}. {benchmark.heading}")
-    if benchmark.paragraphs_1 is not None:
-        for paragraph in benchmark.paragraphs_1:
-            pdf.print_paragraph(paragraph)
-    if benchmark.table_text is not None:
-        pdf.print_paragraph(
-            benchmark.table_text,
-            align="C",
-            font_size=8.0,
-            bold=True,
-            fixed_width=True,
-            markdown=False,
-        )
-    if benchmark.bulleted_list_1 is not None:
-        for bulleted_list_item in benchmark.bulleted_list_1:
-            pdf.print_bulleted_text(bulleted_list_item)
-    if benchmark.charts is not None:
-        for chart in benchmark.charts:
-            pdf.print_image(f"{chart_directory}/{chart}")
-    if benchmark.paragraphs_2 is not None:
-        for paragraph in benchmark.paragraphs_2:
-            pdf.print_paragraph(paragraph)
-    if benchmark.bulleted_list_2 is not None:
-        for bulleted_list_item in benchmark.bulleted_list_2:
-            pdf.print_bulleted_text(bulleted_list_item)
-    if benchmark.page_break_after:
-        pdf.insert_page_break()
-
-
-# References  ##################################################################
-
-
-def print_reference(ref_number: str, ref_text: str, ref_link: str):
-    """
-    Print a reference with its hyperlink
-    """
+    pdf.print_heading(f"{doc_numbers.next_section}. Introduction")
     pdf.print_paragraph(
-        f"[{ref_number}] {ref_text}",
-        align="L",
-        after=0.1,
+        "This is an automatically generated benchmark report created using the "
+        f"YellowDog Platform, produced on {now.strftime('%A, %d %B')} at "
+        f"{now.strftime('%H:%M')} UTC."
     )
-    pdf.print_hyperlink(
-        indent=6,
-        before=0.1,
-        url_text=ref_link,
-        url=ref_link,
+    pdf.print_horizontal_line()
+    pdf.print_paragraph(
+        "As organisations accelerate the migration of workloads to the cloud it becomes"
+        " increasingly important to ensure optimisation of cloud compute choices for these"
+        " workloads.  YellowDog has visibility of thousands of different compute instance"
+        " types across the major cloud providers. Compute needs vary across cloud"
+        " consumers, with a range of motivations to optimise for cost, performance,"
+        " environmental impact, and geographic locality."
+    )
+    pdf.print_paragraph(
+        "This complimentary report has been generated by YellowDog's benchmarking tool. To"
+        " discuss more complex benchmarking needs, please speak to our support team [1]."
     )
 
+    # Report the benchmarks that were run
+    pdf.print_heading(f"{doc_numbers.next_section}. Benchmarks and Instances")
+    benchmarks = ""
+    for index, benchmark in enumerate(benchmark_list):
+        if index == len(benchmark_list) - 1 and len(benchmark_list) != 1:
+            benchmarks += "and "
+        benchmarks = f"{benchmarks}**{benchmark}**"
+        if index < len(benchmark_list) - 1:
+            if len(benchmark_list) > 2:
+                benchmarks += ", "
+            else:
+                benchmarks += " "
+    if len(benchmark_list) == 0:
+        pdf.print_paragraph(f"No benchmarks were selected.")
+    elif len(benchmark_list) == 1:
+        pdf.print_paragraph(f"The following benchmark was selected: {benchmarks}.")
+    else:
+        pdf.print_paragraph(f"The following benchmarks were selected: {benchmarks}.")
 
-pdf.insert_page_break()
-pdf.print_heading(f"{doc_numbers.next_section}. References")
-print_reference(
-    "1",
-    "Contact YellowDog:",
-    "https://yellowdog.co/contact",
-)
-for section in sections:
-    if section.reference is not None:
-        print_reference(
-            str(section.reference.ref_number),
-            section.reference.ref_text,
-            section.reference.ref_link,
+    # Report data on the instance types that were used
+    df = df.sort_values(by=[getenv("H_RAM"), getenv("H_VCPUS")], ascending=True)
+    if len(df) == 1:
+        pdf.print_paragraph(f"The following instance was provisioned:")
+    else:
+        pdf.print_paragraph(f"The following **{len(df)} instances** were provisioned:")
+
+    # Create and print the instance table
+    headers = [
+        getenv("H_PROVIDER"),
+        getenv("H_REGION"),
+        getenv("H_INSTANCE_TYPE"),
+        getenv("H_RAM"),
+        getenv("H_VCPUS"),
+        getenv("H_CPU_MODEL"),
+        getenv("H_INSTANCE_PRICE"),
+    ]
+    table = tabulate(
+        df[headers],
+        headers=headers,
+        showindex="never",
+        tablefmt="pretty",
+        numalign="left",
+    )
+
+    table_width = table.index("\n")
+    if table_width > 110:
+        table_font = 7.0
+    elif table_width > 99:
+        table_font = 7.75
+    elif table_width > 88:
+        table_font = 8.0
+    else:
+        table_font = 9.0
+    pdf.print_paragraph(
+        table,
+        align="C",
+        font_size=table_font,
+        bold=True,
+        fixed_width=True,
+        markdown=False,
+    )
+    pdf.print_paragraph(
+        "The 'Price/Hr' is the on-demand price for the Instance Type, for the "
+        "given Provider and Region, and for an OS image without additional "
+        "licensing fees.",
+        font_size=9.0,
+        italic=True,
+    )
+    # Main Sections  ###########################################################
+
+    for benchmark in sections:
+        if benchmark.page_break_before:
+            pdf.insert_page_break()
+        if benchmark.heading is not None:
+            pdf.print_heading(f"{doc_numbers.next_section}. {benchmark.heading}")
+        if benchmark.paragraphs_1 is not None:
+            for paragraph in benchmark.paragraphs_1:
+                pdf.print_paragraph(paragraph)
+        if benchmark.table_text is not None:
+            pdf.print_paragraph(
+                benchmark.table_text,
+                align="C",
+                font_size=8.0,
+                bold=True,
+                fixed_width=True,
+                markdown=False,
+            )
+        if benchmark.bulleted_list_1 is not None:
+            for bulleted_list_item in benchmark.bulleted_list_1:
+                pdf.print_bulleted_text(bulleted_list_item)
+        if benchmark.charts is not None:
+            for chart in benchmark.charts:
+                chart_file = path.join(chart_directory, chart_path(chart))
+                if chart in charts:
+                    pdf.print_image(charts[chart])
+                elif path.exists(chart_file):
+                    pdf.print_image(chart_file)
+                else:
+                    # The chart failed to render
+                    print(f"Chart '{chart_path(chart)}' not found: omitted from report")
+        if benchmark.paragraphs_2 is not None:
+            for paragraph in benchmark.paragraphs_2:
+                pdf.print_paragraph(paragraph)
+        if benchmark.bulleted_list_2 is not None:
+            for bulleted_list_item in benchmark.bulleted_list_2:
+                pdf.print_bulleted_text(bulleted_list_item)
+        if benchmark.page_break_after:
+            pdf.insert_page_break()
+
+    # References  ##############################################################
+
+    def print_reference(ref_number: str, ref_text: str, ref_link: str):
+        """
+        Print a reference with its hyperlink
+        """
+        pdf.print_paragraph(
+            f"[{ref_number}] {ref_text}",
+            align="L",
+            after=0.1,
         )
+        pdf.print_hyperlink(
+            indent=6,
+            before=0.1,
+            url_text=ref_link,
+            url=ref_link,
+        )
+
+    pdf.insert_page_break()
+    pdf.print_heading(f"{doc_numbers.next_section}. References")
+    print_reference(
+        "1",
+        "Contact YellowDog:",
+        "https://yellowdog.co/contact",
+    )
+    for section in sections:
+        if section.reference is not None:
+            print_reference(
+                str(section.reference.ref_number),
+                section.reference.ref_text,
+                section.reference.ref_link,
+            )
 
-# Generate the document  #######################################################
+    # Generate the document  ###################################################
+
+    print(f"Generating '{path.basename(pdf_report)}'")
+    pdf.generate_pdf_file(pdf_report)
+    manifest.update(report_file, digest)
+    manifest.save()
+
+
+def main():
+    if PROFILE_IMPORTS_OPTION in argv[1:]:
+        exit(profile_imports(argv))
+
+    # Regenerate the report, even if its content is unchanged
+    force = "--force" in argv[1:]
+    arguments = [argument for argument in argv[1:] if argument != "--force"]
+    try:
+        chart_directory = arguments[0]
+        csv_summary_file = arguments[1]
+        pdf_report = arguments[2]
+    except IndexError as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    df = load_summary(csv_summary_file)
+    add_price_performance(
+        df,
+        [benchmark.column_title for benchmark in selected_benchmarks(env_benchmarks)],
+    )
+    history_charts = [
+        history_chart_file(benchmark)
+        for benchmark in selected_benchmarks(env_benchmarks)
+        if path.exists(
+            path.join(chart_directory, chart_path(history_chart_file(benchmark)))
+        )
+    ]
+    latency_charts = [
+        benchmark.output_file
+        for benchmark in selected_benchmarks(env_benchmarks, LATENCY_REGISTRY)
+        if path.exists(path.join(chart_directory, chart_path(benchmark.output_file)))
+    ]
+    sweep_charts = [
+        sweep_chart
+        for sweep_chart in sweep_chart_files(df, selected_sweeps(env_benchmarks))
+        if path.exists(path.join(chart_directory, chart_path(sweep_chart)))
+    ]
+    system_charts = [
+        system_chart
+        for system_chart in system_chart_files(df)
+        if path.exists(path.join(chart_directory, chart_path(system_chart)))
+    ]
+    generate_report(
+        df,
+        chart_directory,
+        pdf_report,
+        force,
+        history_charts,
+        latency_charts,
+        sweep_charts,
+        system_charts,
+    )
 
-print(f"Generating '{path.basename(pdf_report)}'")
-pdf.generate_pdf_file(pdf_report)
 
-################################################################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Compare ways of passing the charts to the PDF report, on a synthetic fleet:
+rendering them with 'charts.py' and building the report with 'pdf_report.py'
+in separate processes, which reads the chart files back; rendering them and
+building the report in one process with 'generate_report.py', which passes
+the charts to the report in memory and also writes them to files; and the
+same with the '--no-chart-files' option, which writes no chart files. Each
+is a full build, in a new directory, and reports the time taken and the
+number and total size of the chart files written.
+- Optional first command line parameter is the number of instances
+  (default 200).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from synthetic import BENCHMARK_DIR, load_environment, write_summary_csv
+
+load_environment()
+
+
+def script(name: str) -> List[str]:
+    return [sys.executable, os.path.join(BENCHMARK_DIR, name)]
+
+
+PIPELINES = [
+    (
+        "Separate processes, files",
+        [
+            script("charts.py") + ["summary.csv", "--force"],
+            script("pdf_report.py") + [".", "summary.csv", "report.pdf", "--force"],
+        ],
+    ),
+    (
+        "One process, memory and files",
+        [script("generate_report.py") + ["summary.csv", "report.pdf", "--force"]],
+    ),
+    (
+        "One process, memory only",
+        [
+            script("generate_report.py")
+            + ["summary.csv", "report.pdf", "--force", "--no-chart-files"]
+        ],
+    ),
+]
+
+
+def run_pipeline(
+    commands: List[List[str]], num_instances: int
+) -> Tuple[float, int, float]:
+    """
+    Run a pipeline in a new directory, returning the time taken, and the
+    number and total size in MB of the chart files it wrote.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_summary_csv(os.path.join(directory, "summary.csv"), num_instances)
+        env = dict(os.environ, MPLBACKEND="Agg", RESULTS_STORE_FILE="")
+        start = time.perf_counter()
+        for command in commands:
+            subprocess.run(
+                command, cwd=directory, env=env, check=True, capture_output=True
+            )
+        elapsed = time.perf_counter() - start
+        chart_files = [
+            os.path.join(directory, filename)
+            for filename in os.listdir(directory)
+            if filename.endswith((".png", ".svg"))
+        ]
+        size = sum(os.path.getsize(chart_file) for chart_file in chart_files)
+    return elapsed, len(chart_files), size / 1024 / 1024
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    results = [
+        (name, *run_pipeline(commands, num_instances)) for name, commands in PIPELINES
+    ]
+
+    print(f"Instances: {num_instances}")
+    for name, elapsed, num_files, size in results:
+        print(f"{name:<30} {elapsed:6.2f}s  {num_files:>3} chart files, {size:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""
+Compare serial and parallel chart rendering on a synthetic fleet.
+- Optional first command line parameter is the number of instances
+  (default 1,000).
+- Optional second command line parameter is the number of parallel workers
+  (default: the number of CPUs).
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import load_environment, write_summary_csv
+
+load_environment()
+
+import pandas as pd
+
+from benchmark_registry import selected_benchmarks
+from charts import render_charts
+
+
+def time_rendering(df: pd.DataFrame, label_column: str, workers: int) -> float:
+    start = time.perf_counter()
+    render_charts(df, label_column, selected_benchmarks(), workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        write_summary_csv("summary.csv", num_instances)
+        df = pd.read_csv("summary.csv", skipinitialspace=True)
+        label_column = "Label"
+        df[label_column] = (
+            df[os.getenv("H_INSTANCE_TYPE")] + " / " + df[os.getenv("H_REGION")]
+        )
+
+        serial = time_rendering(df, label_column, workers=1)
+        parallel = time_rendering(df, label_column, workers=workers)
+
+    print()
+    print(f"Instances:          {num_instances}")
+    print(f"Charts:             {len(selected_benchmarks())}")
+    print(f"Serial:             {serial:.2f}s")
+    print(f"Parallel ({workers:>2} wks): {parallel:.2f}s")
+    print(f"Speedup:            {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+Compare loading the summary data separately for the chart and report stages,
+with inferred column types, against loading it once with the shared typed
+loader. Reports the time taken and the memory used by the DataFrames.
+- Optional first command line parameter is the number of instances
+  (default 100,000).
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import load_environment, write_summary_csv
+
+load_environment()
+
+import pandas as pd
+
+from benchmark_data import LABEL_COLUMN, instance_labels, load_summary
+
+
+def legacy_load(csv_file: str) -> pd.DataFrame:
+    """
+    Load the CSV file using inferred column types, and add the label column.
+    """
+    df = pd.read_csv(csv_file, skipinitialspace=True)
+    df[LABEL_COLUMN] = instance_labels(
+        df, [os.getenv("H_INSTANCE_TYPE"), os.getenv("H_REGION")]
+    )
+    return df
+
+
+def measure(function, *args):
+    """
+    Return the result of a function, the time it took, and its peak traced
+    memory allocation. Time and memory are measured in separate calls, since
+    tracing slows the function down.
+    """
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    mb = 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, "summary.csv")
+        write_summary_csv(csv_file, num_instances)
+
+        # Previously, the chart and report stages each loaded the data
+        legacy_df, legacy_time, legacy_peak = measure(
+            lambda: [legacy_load(csv_file) for _ in range(2)][0]
+        )
+        shared_df, shared_time, shared_peak = measure(load_summary, csv_file)
+
+    print(f"Instances:           {num_instances}")
+    print(f"Separate loads:      {legacy_time:.2f}s")
+    print(f"Shared typed load:   {shared_time:.2f}s (including rank columns)")
+    print(f"Separate peak alloc: {legacy_peak / mb:.1f}MB")
+    print(f"Shared peak alloc:   {shared_peak / mb:.1f}MB")
+    print(
+        f"DataFrame size:      {legacy_df.memory_usage(deep=True).sum() / mb:.1f}MB"
+        f" -> {shared_df.memory_usage(deep=True).sum() / mb:.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Measure incremental regeneration of the charts and PDF report on a synthetic
+fleet: a full build, then re-runs with unchanged data, with one extra priced
+instance, and with one extra instance that has no price.
+- Optional first command line parameter is the number of instances
+  (default 200).
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from synthetic import load_environment, write_summary_csv
+
+load_environment()
+os.environ.setdefault("CHART_WORKERS", "1")
+
+import pandas as pd
+
+from benchmark_data import LABEL_COLUMN, load_summary
+from benchmark_registry import PRICE_COLUMN, selected_benchmarks
+from charts import bar_chart_jobs, price_performance_chart_jobs, render_jobs
+from pdf_report import generate_report
+from price_performance import add_price_performance
+
+
+def build(csv_file: str, force: bool = False):
+    """
+    Run the chart and report stages, as 'generate_report.py' does. Return the
+    time taken and the number of outputs regenerated.
+    """
+    output = StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        benchmarks = selected_benchmarks()
+        headers = [benchmark.column_title for benchmark in benchmarks]
+        df = load_summary(csv_file, headers)
+        add_price_performance(df, headers)
+        charts = render_jobs(
+            bar_chart_jobs(df, LABEL_COLUMN, benchmarks)
+            + price_performance_chart_jobs(df, LABEL_COLUMN, benchmarks),
+            force=force,
+        )
+        generate_report(df, os.getcwd(), "report.pdf", force, charts=charts)
+    elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue().count("Generating")
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        write_summary_csv("fleet.csv", num_instances + 1)
+        fleet = pd.read_csv("fleet.csv")
+        fleet.iloc[:-1].to_csv("summary.csv", index=False)
+
+        results = [("Full build", *build("summary.csv", force=True))]
+        results.append(("Unchanged re-run", *build("summary.csv")))
+
+        fleet.to_csv("summary.csv", index=False)
+        results.append(("One extra instance", *build("summary.csv")))
+
+        fleet.loc[len(fleet)] = fleet.iloc[-1]
+        fleet.loc[len(fleet) - 1, os.getenv("H_INSTANCE_TYPE")] = "unpriced.type"
+        fleet.loc[len(fleet) - 1, PRICE_COLUMN] = "No price found"
+        fleet.to_csv("summary.csv", index=False)
+        results.append(("One extra, unpriced", *build("summary.csv")))
+
+    full_time = results[0][1]
+    print(f"Instances: {num_instances}")
+    for name, elapsed, regenerated in results:
+        print(
+            f"{name:<20} {elapsed:6.2f}s  {regenerated:>2} output(s) regenerated"
+            f"  ({full_time / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""
+Compare the vectorised 'Instance Type / Region' label generation with the
+original row-by-row implementation on a synthetic fleet. That the labels are
+identical is checked by 'tests/test_benchmark_data.py'.
+- Optional first command line parameter is the number of instances
+  (default 10,000).
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import load_environment, write_summary_csv
+
+load_environment()
+
+import pandas as pd
+
+from benchmark_data import instance_labels
+
+
+def legacy_labels(df: pd.DataFrame, label_column: str) -> pd.DataFrame:
+    """
+    The original implementation from 'charts.py'.
+    """
+    instance_type = os.getenv("H_INSTANCE_TYPE")
+    region = os.getenv("H_REGION")
+    df[label_column] = df.apply(lambda x: f"{x[instance_type]} / {x[region]}", axis=1)
+    df.sort_values(by=[label_column], inplace=True, ignore_index=True)
+    current_duplicate = ""
+    duplicate_counter = 1
+    for index, row in enumerate(df.duplicated(keep=False, subset=[label_column])):
+        if row is True:
+            if df.iloc[index][label_column] != current_duplicate:
+                current_duplicate = df.iloc[index][label_column]
+                duplicate_counter = 1
+            df.at[index, label_column] = f"{current_duplicate} ({duplicate_counter})"
+            duplicate_counter += 1
+    return df
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, "summary.csv")
+        write_summary_csv(csv_file, num_instances)
+        df = pd.read_csv(csv_file, skipinitialspace=True)
+
+    label_column = "Label"
+    columns = [os.getenv("H_INSTANCE_TYPE"), os.getenv("H_REGION")]
+
+    start = time.perf_counter()
+    legacy = legacy_labels(df.copy(), label_column)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorised = df.copy()
+    vectorised[label_column] = instance_labels(vectorised, columns)
+    vectorised_time = time.perf_counter() - start
+
+    print(f"Instances:   {num_instances}")
+    print(f"Duplicated:  {legacy[label_column].str.endswith(')').sum()}")
+    print(f"Original:    {legacy_time * 1000:.1f}ms")
+    print(f"Vectorised:  {vectorised_time * 1000:.1f}ms")
+    print(f"Speedup:     {legacy_time / vectorised_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
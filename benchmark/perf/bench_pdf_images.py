@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""
+Measure the time taken to build a PDF report of chart images, and its size,
+with the YellowPDF image registry against the previous approach of opening
+each image with PIL and passing the decoded image to FPDF (which also
+re-hashes the header and footer images on every page). The charts are
+rendered by matplotlib as RGBA PNGs, matplotlib's default, which FPDF has to
+decode, and are also converted to RGB PNGs, as 'charts.py' saves them, which
+the registry embeds without decoding or recompressing.
+- Optional first command line parameter is the number of charts
+  (default 100).
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from synthetic import BENCHMARK_DIR, load_environment
+
+load_environment()
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from yellowdog_pdf import A4_HEIGHT, LEFT_MARGIN, TOP_GUTTER, WIDTH, YellowPDF
+
+HEADER_IMAGE = os.path.join(BENCHMARK_DIR, "yellowdog_header.png")
+FOOTER_IMAGE = os.path.join(BENCHMARK_DIR, "yellowdog_footer.png")
+
+
+class LegacyPDF(YellowPDF):
+    """
+    YellowPDF, embedding images as decoded PIL images.
+    """
+
+    def __init__(self):
+        self._legacy_header = Image.open(HEADER_IMAGE)
+        self._legacy_footer = Image.open(FOOTER_IMAGE)
+        super().__init__(header_image=HEADER_IMAGE, footer_image=FOOTER_IMAGE)
+
+    def header(self):
+        self.image(self._legacy_header, x=LEFT_MARGIN, y=TOP_GUTTER, w=WIDTH)
+
+    def footer(self):
+        self.image(
+            self._legacy_footer,
+            x=LEFT_MARGIN,
+            y=A4_HEIGHT - self._bottom_margin_cached,
+            w=WIDTH,
+        )
+
+    def print_image(self, image_file: str, **kwargs):
+        image = Image.open(image_file)
+        dpi_x, _ = image.info.get("dpi", (300, 300))
+        self.set_y(self.y + 2.0)
+        self.image(image, x=LEFT_MARGIN, w=min(image.width / (dpi_x / 25.4), WIDTH))
+        self.set_y(self.y + 2.0)
+
+
+def write_charts(directory: str, num_charts: int) -> List[str]:
+    """
+    Render bar charts like those of 'charts.py', and return their file names.
+    """
+    chart_files = []
+    for i in range(num_charts):
+        chart_file = os.path.join(directory, f"chart-{i}.png")
+        figure = plt.figure(figsize=(10, 6))
+        plt.bar([f"type-{j}" for j in range(20)], [(i + j) % 7 + 1 for j in range(20)])
+        plt.title(f"Benchmark {i}")
+        plt.xticks(rotation="vertical")
+        plt.tight_layout()
+        plt.savefig(chart_file)
+        plt.close(figure)
+        chart_files.append(chart_file)
+    return chart_files
+
+
+def to_rgb(chart_files: List[str]) -> List[str]:
+    """
+    Convert the charts to RGB PNGs, and return their file names.
+    """
+    rgb_files = []
+    for chart_file in chart_files:
+        rgb_file = chart_file.replace(".png", "-rgb.png")
+        with Image.open(chart_file) as image:
+            image.convert("RGB").save(rgb_file, dpi=image.info["dpi"])
+        rgb_files.append(rgb_file)
+    return rgb_files
+
+
+def build(pdf_class, chart_files: List[str], pdf_file: str):
+    """
+    Build a report with one chart per page, returning the time taken and the
+    size of the PDF file in MB.
+    """
+    start = time.perf_counter()
+    pdf = (
+        pdf_class() if pdf_class is LegacyPDF else pdf_class(HEADER_IMAGE, FOOTER_IMAGE)
+    )
+    for chart_file in chart_files:
+        pdf.print_title("Benchmark", font_size=20)
+        pdf.print_image(chart_file)
+        pdf.insert_page_break()
+    pdf.generate_pdf_file(pdf_file)
+    return time.perf_counter() - start, os.path.getsize(pdf_file) / 1024 / 1024
+
+
+def main():
+    num_charts = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        rgba_files = write_charts(directory, num_charts)
+        rgb_files = to_rgb(rgba_files)
+        pdf_file = os.path.join(directory, "report.pdf")
+        results = [
+            ("PIL images, RGBA charts", *build(LegacyPDF, rgba_files, pdf_file)),
+            ("Registry, RGBA charts", *build(YellowPDF, rgba_files, pdf_file)),
+            ("PIL images, RGB charts", *build(LegacyPDF, rgb_files, pdf_file)),
+            ("Registry, RGB charts", *build(YellowPDF, rgb_files, pdf_file)),
+        ]
+
+    print(f"Charts: {num_charts}")
+    for name, elapsed, size in results:
+        print(f"{name:<26} {elapsed:6.2f}s  {size:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
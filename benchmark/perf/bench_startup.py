@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+Measure the startup time of the summary stage: the time to import each of
+its Python entry points in a new interpreter, with its imports as they are
+(lazy where possible) and with all the heavy packages imported up front, as
+if every import were eager. Also lists the heavy packages each entry point
+imports.
+- Optional first command line parameter is the number of repetitions of each
+  measurement (default 5); the median is reported.
+- The '--environment' option also times setting up the Python environment
+  from 'requirements.txt', as 'summarise.sh' does: a new venv installed from
+  PyPI, a new venv installed offline from a wheelhouse, and a reused venv.
+  This needs network access.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import venv
+from typing import List
+
+from synthetic import BENCHMARK_DIR, load_environment
+
+load_environment()
+
+ENTRY_POINTS = [
+    "aggregate_results",
+    "results_store",
+    "price_performance",
+    "charts",
+    "pdf_report",
+    "generate_report",
+    "yellowdog_pdf",
+]
+
+HEAVY_PACKAGES = [
+    "matplotlib.pyplot",
+    "numpy",
+    "pandas",
+    "pyarrow",
+    "fpdf",
+    "PIL",
+    "tabulate",
+    "requests",
+]
+
+REQUIREMENTS = os.path.join(BENCHMARK_DIR, "requirements.txt")
+
+
+def run_python(python: str, code: str) -> str:
+    """
+    Run Python code in a new interpreter, with the benchmark modules
+    importable, and return its output.
+    """
+    env = dict(os.environ, PYTHONPATH=BENCHMARK_DIR, MPLBACKEND="Agg")
+    return subprocess.run(
+        [python, "-c", code], env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def median_time(command: List[str], repetitions: int, **kwargs) -> float:
+    """
+    The median wall-clock time of a command, in seconds.
+    """
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True, **kwargs)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def import_time(module: str, repetitions: int, eager: bool) -> float:
+    """
+    The median time to start an interpreter and import a module, after
+    importing all the heavy packages, if 'eager'.
+    """
+    env = dict(os.environ, PYTHONPATH=BENCHMARK_DIR, MPLBACKEND="Agg")
+    preload = "".join(f"import {package}; " for package in HEAVY_PACKAGES)
+    code = f"{preload if eager else ''}import {module}"
+    return median_time([sys.executable, "-c", code], repetitions, env=env)
+
+
+def imported_packages(module: str) -> List[str]:
+    """
+    The heavy packages that importing a module imports.
+    """
+    output = run_python(
+        sys.executable,
+        f"import sys, {module}; "
+        f"print(' '.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))",
+    )
+    return output.split()
+
+
+def environment_times(repetitions: int):
+    """
+    Print the time to set up the Python environment from PyPI, from a
+    wheelhouse, and by reusing a venv.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        wheels = os.path.join(directory, "wheels")
+        python = os.path.join(directory, "py", "bin", "python")
+
+        start = time.perf_counter()
+        venv.create(os.path.join(directory, "py"), with_pip=True)
+        pip = [python, "-m", "pip", "install", "-q", "-r", REQUIREMENTS]
+        subprocess.run(pip, check=True)
+        fresh = time.perf_counter() - start
+        subprocess.run(
+            [python, "-m", "pip", "wheel", "-q", "-r", REQUIREMENTS, "-w", wheels],
+            check=True,
+        )
+
+        start = time.perf_counter()
+        venv.create(os.path.join(directory, "offline"), with_pip=True)
+        subprocess.run(
+            [os.path.join(directory, "offline", "bin", "python"), "-m", "pip"]
+            + ["install", "-q", "--no-index", "--find-links", wheels]
+            + ["-r", REQUIREMENTS],
+            check=True,
+        )
+        offline = time.perf_counter() - start
+
+        # A reused venv only needs its packages to be importable
+        code = "".join(f"import {package}; " for package in HEAVY_PACKAGES)
+        reused = median_time([python, "-c", code], repetitions)
+
+    print("Python environment setup:")
+    for name, elapsed in (
+        ("New venv from PyPI", fresh),
+        ("New venv from wheelhouse", offline),
+        ("Reused venv", reused),
+    ):
+        print(f"  {name:<26} {elapsed:7.2f}s  ({fresh / elapsed:.1f}x)")
+    print()
+
+
+def main():
+    arguments = [argument for argument in sys.argv[1:] if argument != "--environment"]
+    repetitions = int(arguments[0]) if len(arguments) > 0 else 5
+
+    if "--environment" in sys.argv[1:]:
+        environment_times(repetitions)
+
+    baseline = median_time([sys.executable, "-c", "pass"], repetitions)
+    print(f"Interpreter startup: {baseline:.3f}s")
+    print(f"{'Entry point':<20} {'Import':>8} {'Eager':>8}  Heavy packages imported")
+    for module in ENTRY_POINTS:
+        lazy = import_time(module, repetitions, eager=False)
+        eager = import_time(module, repetitions, eager=True)
+        packages = ", ".join(imported_packages(module)) or "-"
+        print(f"{module:<20} {lazy:7.3f}s {eager:7.3f}s  {packages}")
+
+
+if __name__ == "__main__":
+    main()
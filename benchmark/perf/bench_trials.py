@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Compare the vectorised bootstrap confidence intervals of the trial medians
+with a per-instance loop, on synthetic trials for a fleet of instances.
+- Optional first command line parameter is the number of instances
+  (default 200).
+- Optional second command line parameter is the number of trials per
+  instance (default 3).
+"""
+
+import sys
+import time
+
+from synthetic import load_environment
+
+load_environment()
+
+import numpy as np
+
+from trial_statistics import BOOTSTRAP_RESAMPLES, CONFIDENCE_LEVEL, bootstrap_interval
+
+
+def loop_interval(values: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES):
+    """
+    Bootstrap each instance's trials separately.
+    """
+    rng = np.random.default_rng(0)
+    tail = (1 - CONFIDENCE_LEVEL) / 2
+    low = np.full(len(values), np.nan)
+    high = np.full(len(values), np.nan)
+    for row, row_values in enumerate(values):
+        trials = row_values[~np.isnan(row_values)]
+        if len(trials) == 0:
+            continue
+        medians = [
+            np.median(rng.choice(trials, size=len(trials))) for _ in range(resamples)
+        ]
+        low[row], high[row] = np.quantile(medians, [tail, 1 - tail])
+    return low, high
+
+
+def main():
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    num_trials = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    rng = np.random.default_rng(1)
+    scores = rng.uniform(10, 100000, size=(num_instances, 1))
+    values = scores * rng.normal(1, 0.03, size=(num_instances, num_trials))
+    values[rng.random(values.shape) < 0.05] = np.nan  # Some failed trials
+
+    start = time.perf_counter()
+    loop_low, loop_high = loop_interval(values)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    low, high = bootstrap_interval(values)
+    vectorised_time = time.perf_counter() - start
+
+    # The resamples differ, so compare the average interval widths
+    relative_width = np.nanmean((high - low) / scores[:, 0])
+    loop_relative_width = np.nanmean((loop_high - loop_low) / scores[:, 0])
+
+    print(f"Instances:         {num_instances} x {num_trials} trials")
+    print(f"Resamples:         {BOOTSTRAP_RESAMPLES}")
+    print(f"Per-instance loop: {loop_time:.2f}s")
+    print(f"Vectorised:        {vectorised_time:.2f}s")
+    print(f"Speedup:           {loop_time / vectorised_time:.1f}x")
+    print(
+        f"Mean CI width:     {loop_relative_width:.2%} (loop),"
+        f" {relative_width:.2%} (vectorised)"
+    )
+
+
+if __name__ == "__main__":
+    main()
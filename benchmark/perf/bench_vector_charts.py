@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""
+Compare saving the charts as PNG images with saving them as SVG vector
+images (CHART_FORMAT=svg), which the PDF report embeds as vector paths: the
+time to render the charts, the time to build a PDF report of them, the size
+of the report, and the peak memory use. Each format is measured in a new
+process, so that its peak memory is its own; the charts are bar charts like
+those of 'charts.py', encoded by 'charts.encode_figure'.
+- Optional first command line parameter is the number of charts
+  (default 20).
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import BENCHMARK_DIR, load_environment
+
+CHART_FORMATS = ["png", "svg"]
+
+HEADER_IMAGE = os.path.join(BENCHMARK_DIR, "yellowdog_header.png")
+FOOTER_IMAGE = os.path.join(BENCHMARK_DIR, "yellowdog_footer.png")
+
+
+def measure(chart_format: str, num_charts: int, directory: str):
+    """
+    Render the charts and build the report in one format, printing the
+    render time, build time, report size in MB, and the peak memory in MB
+    after rendering and after building.
+    """
+    os.environ["CHART_FORMAT"] = chart_format
+    load_environment()
+
+    from benchmark_data import chart_path
+    from charts import encode_figure, pyplot
+    from yellowdog_pdf import YellowPDF
+
+    plt = pyplot()
+    chart_files = []
+    start = time.perf_counter()
+    for i in range(num_charts):
+        chart_file = os.path.join(directory, f"chart-{i}.png")
+        figure = plt.figure(figsize=(10, 6))
+        plt.bar([f"type-{j}" for j in range(20)], [(i + j) % 7 + 1 for j in range(20)])
+        plt.title(f"Benchmark {i}")
+        plt.xticks(rotation="vertical")
+        plt.tight_layout()
+        with open(chart_path(chart_file), "wb") as f:
+            f.write(encode_figure(figure))
+        plt.close(figure)
+        chart_files.append(chart_path(chart_file))
+    render = time.perf_counter() - start
+    # The maximum resident set size is in KB on Linux
+    render_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    start = time.perf_counter()
+    pdf = YellowPDF(HEADER_IMAGE, FOOTER_IMAGE)
+    for chart_file in chart_files:
+        pdf.print_title("Benchmark", font_size=20)
+        pdf.print_image(chart_file)
+        pdf.insert_page_break()
+    pdf_file = os.path.join(directory, f"report-{chart_format}.pdf")
+    pdf.generate_pdf_file(pdf_file)
+    build = time.perf_counter() - start
+
+    build_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size = os.path.getsize(pdf_file) / 1024 / 1024
+    print(f"{render} {build} {size} {render_peak} {build_peak}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+
+    num_charts = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for chart_format in CHART_FORMATS:
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", chart_format]
+                + [str(num_charts), directory],
+                env=dict(os.environ, MPLBACKEND="Agg"),
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results.append((chart_format, *map(float, output.split()[-5:])))
+
+    print(f"Charts: {num_charts}")
+    print(
+        f"{'Format':<8} {'Render':>8} {'Build':>8} {'PDF size':>10}"
+        f" {'Peak memory (render, build)':>28}"
+    )
+    for chart_format, render, build, size, render_peak, build_peak in results:
+        print(
+            f"{chart_format:<8} {render:7.2f}s {build:7.2f}s {size:7.2f} MB"
+            f" {render_peak:12.0f} MB {build_peak:10.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
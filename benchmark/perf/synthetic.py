@@ -0,0 +1,86 @@
+"""
+Helpers for the performance scripts in this directory: set up the benchmark
+environment normally provided by 'common.sh', and generate synthetic summary
+data for large instance fleets.
+"""
+
+import csv
+import os
+import random
+import re
+import sys
+from typing import List
+
+BENCHMARK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ALL_BENCHMARKS = (
+    "sysbench,mysql-tpcc,coremark-standard,coremark-pro,linpack,numpy-linalg,stream"
+)
+
+
+def load_environment(benchmarks: str = ALL_BENCHMARKS):
+    """
+    Export the benchmark names and column headings defined in 'common.sh',
+    select the benchmarks, and make the benchmark modules importable. Must be
+    called before importing any of the benchmark modules.
+    """
+    with open(os.path.join(BENCHMARK_DIR, "common.sh")) as f:
+        for name, value in re.findall(r'^export (\w+)="(.*)"$', f.read(), re.M):
+            os.environ.setdefault(name, value)
+    os.environ.setdefault("BENCHMARKS", benchmarks)
+    if BENCHMARK_DIR not in sys.path:
+        sys.path.insert(0, BENCHMARK_DIR)
+
+
+def synthetic_rows(num_instances: int, seed: int = 0) -> List[List[str]]:
+    """
+    Generate the 'summary.txt' fields for a synthetic fleet, including
+    duplicated instance types and CPU models containing commas.
+    """
+    from benchmark_registry import selected_benchmarks
+
+    rng = random.Random(seed)
+    providers = {
+        "AWS": ["eu-west-1", "us-east-1", "ap-south-1"],
+        "GOOGLE": ["europe-west2", "us-central1"],
+        "AZURE": ["uksouth", "eastus"],
+    }
+    cpu_models = ["Intel(R) Xeon(R) Platinum", "AMD EPYC 7R13", "Neoverse-N1, r3p1"]
+    num_scores = len(selected_benchmarks())
+    rows = []
+    for _ in range(num_instances):
+        provider = rng.choice(list(providers))
+        vcpus = rng.choice([2, 4, 8, 16, 32, 64])
+        fields = [
+            provider,
+            f"type-{rng.randrange(num_instances // 4 + 1)}.{vcpus}x",
+            rng.choice(providers[provider]),
+            rng.choice(cpu_models),
+            str(vcpus),
+            str(vcpus * rng.choice([2, 4, 8])),
+        ]
+        fields += [f"{rng.uniform(10, 100000):.2f}" for _ in range(num_scores)]
+        fields += ["2024-01-01_000000_UTC", "2024-01-01_001000_UTC"]
+        rows.append(fields)
+    return rows
+
+
+def summary_lines(num_instances: int, seed: int = 0) -> List[str]:
+    """
+    Generate 'summary.txt' lines for a synthetic fleet.
+    """
+    return [", ".join(row) for row in synthetic_rows(num_instances, seed)]
+
+
+def write_summary_csv(filename: str, num_instances: int, seed: int = 0):
+    """
+    Write a synthetic 'summary.csv' file, as generated by the summary stage.
+    """
+    from benchmark_registry import PRICE_COLUMN, selected_benchmarks, summary_columns
+
+    rng = random.Random(seed)
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(summary_columns(selected_benchmarks()) + [PRICE_COLUMN])
+        for row in synthetic_rows(num_instances, seed):
+            writer.writerow(row + [f"USD {rng.uniform(0.01, 5):.4f}"])
@@ -0,0 +1,189 @@
+"""
+Persistent on-disk cache of instance prices, stored in a SQLite database.
+Entries are keyed on provider, region, instance type and usage type, expire
+after a configurable TTL, and are evicted least-recently-used first once the
+cache exceeds its maximum number of entries. Instances for which the API has
+no price are cached too, with a shorter TTL.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from os import getenv, makedirs, path
+from threading import Lock, Thread
+from time import monotonic, time
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_CACHE_FILE = path.expanduser("~/.cache/yellowdog/instance_prices.sqlite")
+
+# Cache configuration, from the environment. Set PRICE_CACHE_FILE to an empty
+# string to disable the cache.
+CACHE_FILE = getenv("PRICE_CACHE_FILE", DEFAULT_CACHE_FILE)
+CACHE_TTL = float(getenv("PRICE_CACHE_TTL", str(7 * 24 * 60 * 60)))  # Seconds
+NEGATIVE_TTL = float(getenv("PRICE_CACHE_NEGATIVE_TTL", str(60 * 60)))  # Seconds
+CACHE_MAX_ENTRIES = int(getenv("PRICE_CACHE_MAX_ENTRIES", "10000"))
+STALE_WHILE_REVALIDATE = getenv("PRICE_CACHE_STALE", "true").lower() == "true"
+
+# The price of an instance for which there is no price
+NO_PRICE = "No price found"
+
+# (provider, region, instance type, usage type)
+CacheKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached price, and whether it is still within its TTL.
+    """
+
+    price: str
+    fresh: bool
+
+
+class PriceCache:
+    """
+    A SQLite-backed price cache that can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        filename: str = CACHE_FILE,
+        ttl: float = CACHE_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        stale_while_revalidate: bool = STALE_WHILE_REVALIDATE,
+        negative_ttl: float = NEGATIVE_TTL,
+    ):
+        """
+        Constructor.
+
+        Args:
+            filename (str, optional): The SQLite database file.
+            ttl (float, optional): The time in seconds for which an entry is
+                considered fresh.
+            max_entries (int, optional): The maximum number of entries to
+                retain before evicting the least recently used.
+            stale_while_revalidate (bool, optional): Whether expired entries
+                may be served while they are refreshed.
+            negative_ttl (float, optional): The time in seconds for which a
+                NO_PRICE entry is considered fresh. Expired NO_PRICE entries
+                are treated as misses.
+        """
+        directory = path.dirname(filename)
+        if directory != "":
+            makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.closed = False
+        self._lock = Lock()
+        self._background: List[Thread] = []
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " provider TEXT, region TEXT, instance_type TEXT, usage_type TEXT,"
+            " price TEXT, fetched_at REAL, last_used REAL,"
+            " PRIMARY KEY (provider, region, instance_type, usage_type))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS prices_last_used ON prices (last_used)"
+        )
+        self._db.commit()
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """
+        Look up a price, recording a hit or a miss. Expired entries are
+        returned with 'fresh' set to False.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT price, fetched_at FROM prices WHERE provider = ?"
+                " AND region = ? AND instance_type = ? AND usage_type = ?",
+                key,
+            ).fetchone()
+            now = time()
+            if row is None or (
+                row[0] == NO_PRICE and now - row[1] >= self.negative_ttl
+            ):
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE prices SET last_used = ? WHERE provider = ?"
+                " AND region = ? AND instance_type = ? AND usage_type = ?",
+                (now, *key),
+            )
+            self._db.commit()
+            price, fetched_at = row
+            fresh = now - fetched_at < (
+                self.negative_ttl if price == NO_PRICE else self.ttl
+            )
+            if fresh:
+                self.hits += 1
+            elif self.stale_while_revalidate:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+            return CacheEntry(price=price, fresh=fresh)
+
+    def put(self, key: CacheKey, price: str):
+        """
+        Store a price, evicting the least recently used entries if the cache
+        is full. Prices stored after the cache is closed are dropped.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            now = time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, price, now, now),
+            )
+            self._db.execute(
+                "DELETE FROM prices WHERE rowid IN (SELECT rowid FROM prices"
+                " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def run_in_background(self, function: Callable, *args):
+        """
+        Call a function, e.g., to refresh expired prices, in a background
+        daemon thread, which doesn't keep the process alive.
+        """
+        thread = Thread(target=function, args=args, daemon=True)
+        thread.start()
+        self._background.append(thread)
+
+    def close(self, wait: float = 0.0):
+        """
+        Close the cache.
+
+        Args:
+            wait (float, optional): The maximum time in seconds to wait for
+                the background threads to finish. By default they aren't
+                waited for, and anything they store afterwards is dropped.
+        """
+        deadline = monotonic() + wait
+        for thread in self._background:
+            thread.join(max(0.0, deadline - monotonic()))
+        with self._lock:
+            self.closed = True
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def statistics(self) -> str:
+        """
+        Summarise the cache hit and miss counts.
+        """
+        return (
+            f"Price cache: {self.hits} hit(s), {self.stale_hits} stale hit(s),"
+            f" {self.misses} miss(es)"
+        )
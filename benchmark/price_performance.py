@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+Price-performance analysis of the benchmark summary data. The 'Price/Hr'
+strings (e.g., 'USD 0.123') are parsed into currency and numeric price
+columns, and for every selected benchmark the score per unit of hourly price,
+the score per vCPU, and the Pareto frontier of price against performance are
+computed.
+
+When run as a script:
+- First command line parameter is the pathname of the summary CSV file.
+- Second command line parameter is the pathname of the price-performance CSV
+  file to generate.
+"""
+
+import sys
+from dataclasses import replace
+from os import getenv, path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import load_summary
+from benchmark_registry import PRICE_COLUMN, Benchmark, selected_benchmarks
+
+CURRENCY_COLUMN = "Currency"
+PRICE_VALUE_COLUMN = "Hourly Price"
+
+
+def per_price_column(column_title: str) -> str:
+    """
+    The name of the score per unit of hourly price column for a benchmark.
+    """
+    return f"{column_title} per Hourly Price"
+
+
+def per_vcpu_column(column_title: str) -> str:
+    """
+    The name of the score per vCPU column for a benchmark.
+    """
+    return f"{column_title} per vCPU"
+
+
+def pareto_column(column_title: str) -> str:
+    """
+    The name of the Pareto frontier membership column for a benchmark.
+    """
+    return f"{column_title} Pareto-Optimal"
+
+
+def parse_prices(df: pd.DataFrame):
+    """
+    Split the 'CURRENCY VALUE' price strings into a categorical currency
+    column and a numeric price column. Missing or unparseable prices are
+    left empty.
+    """
+    parts = df[PRICE_COLUMN].astype("string").str.extract(r"^\s*(\S+)\s+(\S+)\s*$")
+    df[CURRENCY_COLUMN] = parts[0].astype("category")
+    df[PRICE_VALUE_COLUMN] = pd.to_numeric(parts[1], errors="coerce")
+    df.loc[~(df[PRICE_VALUE_COLUMN] > 0), PRICE_VALUE_COLUMN] = np.nan
+
+
+def pareto_frontier(price: pd.Series, score: pd.Series) -> pd.Series:
+    """
+    Find the instances for which no other instance is both cheaper (or the same
+    price) and better-performing. Return a boolean Series with the same index.
+    """
+    valid = price.notna() & score.notna()
+    ordered = pd.DataFrame({"price": price[valid], "score": score[valid]})
+    ordered = ordered.sort_values(by=["price", "score"], ascending=[True, False])
+    best_so_far = ordered["score"].cummax().shift(fill_value=-np.inf)
+    frontier = pd.Series(False, index=price.index)
+    frontier[ordered.index[ordered["score"] > best_so_far]] = True
+    return frontier
+
+
+def add_price_performance(df: pd.DataFrame, benchmark_headers: List[str]):
+    """
+    Add the parsed price columns, and the per-price, per-vCPU and Pareto
+    frontier columns for each benchmark.
+    """
+    parse_prices(df)
+    vcpus = df[getenv("H_VCPUS")].astype("float32")
+    vcpus[~(vcpus > 0)] = np.nan
+    for column in benchmark_headers:
+        df[per_price_column(column)] = (df[column] / df[PRICE_VALUE_COLUMN]).astype(
+            "float32"
+        )
+        df[per_vcpu_column(column)] = (df[column] / vcpus).astype("float32")
+        df[pareto_column(column)] = pareto_frontier(df[PRICE_VALUE_COLUMN], df[column])
+
+
+def has_prices(df: pd.DataFrame) -> bool:
+    """
+    Whether any instance has a parsed price.
+    """
+    return PRICE_VALUE_COLUMN in df and bool(df[PRICE_VALUE_COLUMN].notna().any())
+
+
+def per_price_benchmark(benchmark: Benchmark) -> Benchmark:
+    """
+    The chart definition for a benchmark's score per unit of hourly price.
+    """
+    return replace(
+        benchmark,
+        column_title=per_price_column(benchmark.column_title),
+        chart_title=f"{benchmark.chart_title} per Hourly Price",
+        y_axis_label=f"{benchmark.y_axis_label} per Unit Price/Hr",
+        output_file=f"{path.splitext(benchmark.output_file)[0]}-per-price.png",
+    )
+
+
+def pareto_chart_file(benchmark: Benchmark) -> str:
+    """
+    The file name of a benchmark's price against performance chart.
+    """
+    return f"{path.splitext(benchmark.output_file)[0]}-pareto.png"
+
+
+def main():
+    try:
+        csv_summary_file = sys.argv[1]
+        csv_output_file = sys.argv[2]
+    except IndexError as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    benchmark_headers = [benchmark.column_title for benchmark in selected_benchmarks()]
+    df = load_summary(csv_summary_file, benchmark_headers)
+    add_price_performance(df, benchmark_headers)
+    print(f"Generating '{path.basename(csv_output_file)}'")
+    df.to_csv(csv_output_file, index=False)
+
+
+if __name__ == "__main__":
+    main()
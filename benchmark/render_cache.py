@@ -0,0 +1,107 @@
+"""
+A manifest of content hashes for generated charts and reports, used to skip
+regenerating outputs whose inputs have not changed since the previous run.
+The manifest is stored as a JSON file in the output directory.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, is_dataclass
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from os import path
+from typing import Any, Dict
+
+MANIFEST_FILE = ".render_manifest.json"
+
+
+@lru_cache(maxsize=None)
+def _matplotlib_version() -> str:
+    """
+    The installed matplotlib version, read from the package metadata, so that
+    hashing doesn't import matplotlib.
+    """
+    try:
+        return version("matplotlib")
+    except PackageNotFoundError:
+        return ""
+
+
+def _serialise(item: Any) -> Any:
+    """
+    Convert items that JSON can't represent directly.
+    """
+    if is_dataclass(item):
+        return asdict(item)
+    return str(item)
+
+
+def content_hash(*items: Any) -> str:
+    """
+    Hash the given items, which can include dataclasses, lists and scalars.
+    The matplotlib version is included, since it affects the rendered output.
+    """
+    digest = hashlib.sha256(_matplotlib_version().encode())
+    for item in items:
+        digest.update(json.dumps(item, default=_serialise).encode())
+    return digest.hexdigest()
+
+
+def file_hash(filename: str) -> str:
+    """
+    Hash the contents of a file.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def data_hash(data: bytes) -> str:
+    """
+    Hash data held in memory, as 'file_hash' hashes the same data in a file.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class RenderManifest:
+    """
+    The content hashes of the outputs in a directory.
+    """
+
+    def __init__(self, directory: str = "."):
+        """
+        Constructor.
+
+        Args:
+            directory (str, optional): The directory containing the outputs
+                and the manifest file.
+        """
+        self._directory = directory
+        self._filename = path.join(directory, MANIFEST_FILE)
+        self._hashes: Dict[str, str] = {}
+        try:
+            with open(self._filename) as f:
+                self._hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, output_file: str, digest: str) -> bool:
+        """
+        Whether the output file exists and was generated from inputs with
+        the given hash.
+        """
+        return self._hashes.get(output_file) == digest and path.exists(
+            path.join(self._directory, output_file)
+        )
+
+    def update(self, output_file: str, digest: str):
+        """
+        Record the hash of the inputs from which an output file was generated.
+        """
+        self._hashes[output_file] = digest
+
+    def save(self):
+        with open(self._filename, "w") as f:
+            json.dump(self._hashes, f, indent=2, sort_keys=True)
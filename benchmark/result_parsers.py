@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+
+"""
+Parse the raw output of each benchmark into a typed result record. Records
+are appended as JSON lines to a per-instance results file, which is ingested
+directly by the summary stage. Each record holds:
+- 'test': the benchmark test that was run, e.g. 'sysbench-singlecore'
+- 'trial': the trial number
+- 'source': the name of the output file that was parsed
+- 'metrics': the numeric results, including throughput and latency
+  percentiles where the benchmark reports them
+- 'metadata': the build and run details reported by the benchmark, e.g. the
+  number of threads, or the compiler version and flags
+- 'error': present if a required metric could not be found, e.g. because
+  the benchmark failed or its output format has changed
+
+This module uses only the Python standard library, so that it can run on the
+benchmark nodes.
+
+When run as a script, parses a benchmark output file and appends its record:
+- First command line parameter is the pathname of the results file.
+- Second command line parameter is the test name.
+- Third command line parameter is the trial number.
+- Fourth command line parameter is the pathname of the benchmark output file.
+- Any further parameters are the names of metrics to print, one per line
+  (empty if not found), for inclusion in the 'summary.txt' line.
+"""
+
+import json
+import math
+import re
+import sys
+from os import path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULTS_FILE = "results.jsonl"
+
+Metrics = Dict[str, float]
+Metadata = Dict[str, Any]
+
+
+class ParseError(Exception):
+    pass
+
+
+def _search(pattern: str, text: str) -> Optional[str]:
+    """
+    The first group of the first match of a multiline pattern, or None.
+    """
+    match = re.search(pattern, text, re.M)
+    return None if match is None else match.group(1)
+
+
+def _float(value: Optional[str]) -> Optional[float]:
+    """
+    A field of the output as a finite number, or None if it isn't one.
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _number(pattern: str, text: str) -> Optional[float]:
+    """
+    The first group of the first match of a multiline pattern, as a number.
+    """
+    return _float(_search(pattern, text))
+
+
+def _add(metrics: Metrics, name: str, value: Optional[float]):
+    """
+    Add a metric, if it was found.
+    """
+    if value is not None:
+        metrics[name] = value
+
+
+def _require(metrics: Metrics, names: List[str]):
+    """
+    Raise a ParseError if any of the required metrics was not found.
+    """
+    missing = [name for name in names if name not in metrics]
+    if len(missing) > 0:
+        raise ParseError(f"Required metric(s) not found: {', '.join(missing)}")
+
+
+# Parsers  #####################################################################
+
+
+def _thread_sweep(
+    parser: Callable[[str], Tuple[Metrics, Metadata]], metric: str
+) -> Callable[[str], Tuple[Metrics, Metadata]]:
+    """
+    A parser for the outputs of a benchmark run at each of a range of thread
+    counts, each preceded by a 'Threads = <n>' line, using the parser of a
+    single run. The given metric of each run is reported as '<metric>_<n>t'.
+    Runs whose output can't be parsed are omitted.
+    """
+
+    def parse(text: str) -> Tuple[Metrics, Metadata]:
+        metrics: Metrics = {}
+        metadata: Metadata = {}
+        sections = re.split(r"^Threads = (\d+)$", text, flags=re.M)
+        for threads, output in zip(sections[1::2], sections[2::2]):
+            try:
+                run_metrics, run_metadata = parser(output)
+            except ParseError:
+                continue
+            _add(metrics, f"{metric}_{threads}t", run_metrics.get(metric))
+            if len(metadata) == 0:
+                metadata = run_metadata
+        if len(metrics) == 0:
+            raise ParseError(f"Required metric(s) not found: {metric}")
+        metadata["threads"] = [int(threads) for threads in sections[1::2]]
+        return metrics, metadata
+
+    return parse
+
+
+def _sysbench_common(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The general statistics, latency and thread fairness reported by every
+    sysbench test.
+    """
+    metrics: Metrics = {}
+    _add(metrics, "total_time_s", _number(r"total time:\s+([\d.]+)s", text))
+    _add(metrics, "total_events", _number(r"total number of events:\s+(\d+)", text))
+    for name, label in (
+        ("min", "min"),
+        ("avg", "avg"),
+        ("max", "max"),
+        ("p95", r"95th percentile"),
+        ("sum", "sum"),
+    ):
+        _add(metrics, f"latency_{name}_ms", _number(rf"^\s+{label}:\s+([\d.]+)", text))
+    fairness = re.search(r"events \(avg/stddev\):\s+([\d.]+)/([\d.]+)", text)
+    if fairness is not None:
+        metrics["thread_events_avg"] = float(fairness.group(1))
+        metrics["thread_events_stddev"] = float(fairness.group(2))
+    fairness = re.search(r"execution time \(avg/stddev\):\s+([\d.]+)/([\d.]+)", text)
+    if fairness is not None:
+        metrics["thread_time_avg_s"] = float(fairness.group(1))
+        metrics["thread_time_stddev_s"] = float(fairness.group(2))
+
+    metadata: Metadata = {}
+    version = _search(r"^(sysbench [\d.]+.*)$", text)
+    if version is not None:
+        metadata["version"] = version.strip()
+    threads = _number(r"Number of threads:\s+(\d+)", text)
+    if threads is not None:
+        metadata["threads"] = int(threads)
+    return metrics, metadata
+
+
+def parse_sysbench_cpu(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'sysbench cpu'.
+    """
+    metrics, metadata = _sysbench_common(text)
+    _add(metrics, "events_per_second", _number(r"events per second:\s+([\d.]+)", text))
+    _require(metrics, ["events_per_second"])
+    return metrics, metadata
+
+
+def parse_sysbench_memory(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'sysbench memory'.
+    """
+    metrics, metadata = _sysbench_common(text)
+    operations = re.search(r"Total operations:\s+(\d+)\s+\(([\d.]+) per second\)", text)
+    if operations is not None:
+        metrics["total_operations"] = float(operations.group(1))
+        metrics["operations_per_second"] = float(operations.group(2))
+    transferred = re.search(r"([\d.]+) MiB transferred \(([\d.]+) MiB/sec\)", text)
+    if transferred is not None:
+        metrics["transferred_mib"] = float(transferred.group(1))
+        metrics["mib_per_second"] = float(transferred.group(2))
+    _require(metrics, ["operations_per_second"])
+    return metrics, metadata
+
+
+def parse_sysbench_fileio(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'sysbench fileio'.
+    """
+    metrics, metadata = _sysbench_common(text)
+    for name, label in (
+        ("reads_per_second", "reads/s"),
+        ("writes_per_second", "writes/s"),
+        ("fsyncs_per_second", "fsyncs/s"),
+        ("read_mib_per_second", "read, MiB/s"),
+        ("written_mib_per_second", "written, MiB/s"),
+    ):
+        _add(metrics, name, _number(rf"^\s+{re.escape(label)}:\s+([\d.]+)", text))
+    _require(metrics, ["reads_per_second", "writes_per_second", "fsyncs_per_second"])
+    return metrics, metadata
+
+
+def parse_sysbench_fileio_matrix(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The outputs of a matrix of 'sysbench fileio' runs, each preceded by a
+    'Configuration:' line giving its access pattern, block size, thread count
+    and I/O mode. The IOPS, throughput and 95th percentile latency of each run
+    are reported as '<mode>-<io>_<block size>kib_<threads>t_<metric>'.
+    """
+    metrics: Metrics = {}
+    sections = re.split(
+        r"^Configuration: mode=(\w+) block_kib=(\d+) threads=(\d+) io=(\w+)$",
+        text,
+        flags=re.M,
+    )
+    for mode, block_kib, threads, io, output in zip(*[iter(sections[1:])] * 5):
+        run_metrics, _ = _sysbench_common(output)
+        operations = [
+            _number(rf"^\s+{re.escape(label)}:\s+([\d.]+)", output)
+            for label in ("reads/s", "writes/s")
+        ]
+        throughput = [
+            _number(rf"^\s+{re.escape(label)}:\s+([\d.]+)", output)
+            for label in ("read, MiB/s", "written, MiB/s")
+        ]
+        prefix = f"{mode}-{io}_{block_kib}kib_{threads}t"
+        if None not in operations:
+            metrics[f"{prefix}_iops"] = sum(operations)
+        if None not in throughput:
+            metrics[f"{prefix}_mib_s"] = sum(throughput)
+        _add(metrics, f"{prefix}_p95_ms", run_metrics.get("latency_p95_ms"))
+    if not any(name.endswith("_iops") for name in metrics):
+        raise ParseError("Required metric(s) not found: iops")
+
+    metadata: Metadata = {}
+    for name, pattern in (
+        ("version", r"^(sysbench [\d.]+.*)$"),
+        ("file_total_size", r"^File size = (.*)$"),
+        ("run_time", r"^Run time = (.*)$"),
+    ):
+        value = _search(pattern, text)
+        if value is not None:
+            metadata[name] = value.strip()
+    return metrics, metadata
+
+
+def parse_sysbench_tpcc(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of the Percona TPC-C sysbench scripts.
+    """
+    metrics, metadata = _sysbench_common(text)
+    for name, label in (
+        ("transactions", "transactions"),
+        ("queries", "queries"),
+        ("ignored_errors", "ignored errors"),
+        ("reconnects", "reconnects"),
+    ):
+        counts = re.search(
+            rf"^\s+{label}:\s+(\d+)\s+\(([\d.]+) per sec\.\)", text, re.M
+        )
+        if counts is not None:
+            metrics[name] = float(counts.group(1))
+            metrics[f"{name}_per_second"] = float(counts.group(2))
+    _require(metrics, ["transactions_per_second"])
+    return metrics, metadata
+
+
+def parse_coremark(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    A CoreMark 'run1.log' or 'run2.log' file.
+    """
+    metrics: Metrics = {}
+    _add(metrics, "score", _number(r"^CoreMark 1\.0 : ([\d.]+)", text))
+    _add(
+        metrics, "iterations_per_second", _number(r"^Iterations/Sec\s+: ([\d.]+)", text)
+    )
+    _add(metrics, "iterations", _number(r"^Iterations\s+: (\d+)", text))
+    _add(metrics, "total_ticks", _number(r"^Total ticks\s+: (\d+)", text))
+    _add(metrics, "total_time_s", _number(r"^Total time \(secs\)\s*: ([\d.]+)", text))
+    _require(metrics, ["score"])
+
+    metadata: Metadata = {
+        "validated": "Correct operation validated" in text,
+        "threads": int(_number(r"^Parallel \w+\s*: (\d+)", text) or 1),
+    }
+    for name, label in (
+        ("size", "CoreMark Size"),
+        ("compiler_version", "Compiler version"),
+        ("compiler_flags", "Compiler flags"),
+    ):
+        value = _search(rf"^{label}\s+: (.*)$", text)
+        if value is not None:
+            metadata[name] = value.strip()
+    return metrics, metadata
+
+
+def parse_coremark_pro(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The results tables of CoreMark Pro, with the single-core and multicore
+    scores and scaling of the overall mark and of each workload.
+    """
+    metrics: Metrics = {}
+    for name, multi_core, single_core, scaling in re.findall(
+        r"^(\S+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*$", text, re.M
+    ):
+        prefix = "" if name == "CoreMark-PRO" else f"{name}_"
+        metrics[f"{prefix}multi_core"] = float(multi_core)
+        metrics[f"{prefix}single_core"] = float(single_core)
+        metrics[f"{prefix}scaling"] = float(scaling)
+    _require(metrics, ["multi_core", "single_core"])
+    return metrics, {}
+
+
+def parse_linpack(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'linpack_bench.c'.
+    """
+    metrics: Metrics = {}
+    values = _search(r"Factor\s+Solve\s+Total\s+MFLOPS.*\n\s*\n(.*)$", text)
+    if values is not None:
+        for name, value in zip(
+            ["factor_s", "solve_s", "total_s", "mflops", "unit", "cray_ratio"],
+            values.split(),
+        ):
+            _add(metrics, name, _float(value))
+    _add(
+        metrics,
+        "normalised_residual",
+        _number(r"Norm\. Resid.*\n\s*\n\s*(\S+)", text),
+    )
+    _require(metrics, ["mflops"])
+
+    return metrics, _linear_solve_metadata(text)
+
+
+def parse_numpy_linalg(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'numpy_linalg.py'.
+    """
+    metrics: Metrics = {}
+    _add(metrics, "total_s", _number(r"^\s+Total\s+= ([\d.]+)", text))
+    _add(metrics, "mflops", _number(r"^\s+MFLOPS\s+= ([\d.]+)", text))
+    _add(
+        metrics,
+        "normalised_residual",
+        _number(r"^\s+Norm\. Resid\s+= ([\d.]+)", text),
+    )
+    _require(metrics, ["mflops"])
+
+    metadata = _linear_solve_metadata(text)
+    for name, label in (
+        ("numpy_version", "NumPy version"),
+        ("blas_library", "BLAS library"),
+    ):
+        value = _search(rf"^\s+{label}\s+= (.*)$", text)
+        if value is not None:
+            metadata[name] = value.strip()
+    return metrics, metadata
+
+
+def parse_stream(text: str) -> Tuple[Metrics, Metadata]:
+    """
+    The output of 'stream_bench.c': the best bandwidth of each kernel, and the
+    pointer-chasing latency at each working set size, as 'latency_ns_<n>kib'.
+    The latencies at the smallest and largest working sets are also reported
+    as the L1 cache and DRAM latencies.
+    """
+    metrics: Metrics = {}
+    for name, label in (
+        ("copy_mb_s", "Copy"),
+        ("scale_mb_s", "Scale"),
+        ("add_mb_s", "Add"),
+        ("triad_mb_s", "Triad"),
+    ):
+        _add(metrics, name, _number(rf"^{label}:\s+([\d.]+)", text))
+    latencies = re.findall(r"^\s+(\d+)\s+([\d.]+)\s*$", text, re.M)
+    for kib, latency in latencies:
+        metrics[f"latency_ns_{kib}kib"] = float(latency)
+    if len(latencies) > 0:
+        metrics["l1_latency_ns"] = float(latencies[0][1])
+        metrics["dram_latency_ns"] = float(latencies[-1][1])
+    _require(metrics, ["triad_mb_s"])
+
+    metadata: Metadata = {"validated": "Solution Validates" in text}
+    for name, label in (("array_size", "Array size"), ("threads", "Threads")):
+        value = _number(rf"^\s+{label}\s+= (\d+)", text)
+        if value is not None:
+            metadata[name] = int(value)
+    return metrics, metadata
+
+
+def _linear_solve_metadata(text: str) -> Metadata:
+    """
+    The problem size and thread count of a LINPACK or NumPy linear solve.
+    """
+    metadata: Metadata = {}
+    for name, label in (("n", "Matrix order N"), ("threads", "Threads")):
+        value = _number(rf"^\s+{label}\s+= (\d+)", text)
+        if value is not None:
+            metadata[name] = int(value)
+    return metadata
+
+
+# The parser for each benchmark test
+PARSERS: Dict[str, Callable[[str], Tuple[Metrics, Metadata]]] = {
+    "sysbench-singlecore": parse_sysbench_cpu,
+    "sysbench-multicore": parse_sysbench_cpu,
+    "sysbench-scaling": _thread_sweep(parse_sysbench_cpu, "events_per_second"),
+    "sysbench-memory": parse_sysbench_memory,
+    "sysbench-storage": parse_sysbench_fileio,
+    "sysbench-storage-matrix": parse_sysbench_fileio_matrix,
+    "mysql-tpcc": parse_sysbench_tpcc,
+    "coremark-singlecore": parse_coremark,
+    "coremark-multicore": parse_coremark,
+    "coremark-scaling": _thread_sweep(parse_coremark, "score"),
+    "coremark-pro": parse_coremark_pro,
+    "linpack-singlecore": parse_linpack,
+    "linpack-multicore": parse_linpack,
+    "numpy-linalg-singlecore": parse_numpy_linalg,
+    "numpy-linalg-multicore": parse_numpy_linalg,
+    "stream": parse_stream,
+}
+
+
+# Records  #####################################################################
+
+
+def parse_output(test: str, trial: int, output_file: str) -> Dict[str, Any]:
+    """
+    Parse a benchmark output file into a result record. If the output can't
+    be parsed, the record includes an 'error' with the reason, along with any
+    metrics that were found.
+    """
+    record: Dict[str, Any] = {
+        "test": test,
+        "trial": trial,
+        "source": path.basename(output_file),
+        "metrics": {},
+        "metadata": {},
+    }
+    parser = PARSERS.get(test)
+    if parser is None:
+        record["error"] = f"Unknown test '{test}'"
+        return record
+    try:
+        with open(output_file, errors="replace") as f:
+            text = f.read()
+        record["metrics"], record["metadata"] = parser(text)
+    except ParseError as e:
+        record["error"] = str(e)
+    except OSError as e:
+        record["error"] = f"Unable to read output: {e}"
+    return record
+
+
+def append_record(results_file: str, record: Dict[str, Any]):
+    """
+    Append a result record to a results file.
+    """
+    with open(results_file, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def load_records(results_file: str) -> List[Dict[str, Any]]:
+    """
+    Load the result records in a results file. Malformed lines are skipped.
+    """
+    records = []
+    with open(results_file) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                if line.strip() != "":
+                    print(f"Skipping malformed record in '{results_file}': {line}")
+    return records
+
+
+def main():
+    try:
+        results_file = sys.argv[1]
+        test = sys.argv[2]
+        trial = int(sys.argv[3])
+        output_file = sys.argv[4]
+    except (IndexError, ValueError) as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    record = parse_output(test, trial, output_file)
+    append_record(results_file, record)
+    if "error" in record:
+        print(f"Error: '{output_file}': {record['error']}", file=sys.stderr)
+    for metric in sys.argv[5:]:
+        print(record["metrics"].get(metric, ""))
+
+
+if __name__ == "__main__":
+    main()
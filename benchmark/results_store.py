@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+Append-only historical store of benchmark results, kept in a SQLite database.
+Each benchmark run is recorded once, keyed on its start time, with one row
+per instance and benchmark. Results are indexed on provider, region, instance
+type and benchmark, to support queries for the latest, median and trend
+values per instance type without rereading earlier summary files.
+
+When run as a script, records the results in a summary CSV file:
+- First command line parameter is the pathname of the summary CSV file.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+from os import getenv, makedirs, path
+from time import time
+from typing import List, Optional
+
+import pandas as pd
+
+from benchmark_data import load_summary
+from benchmark_registry import TIMING_COLUMNS, Benchmark, selected_benchmarks
+
+DEFAULT_STORE_FILE = path.expanduser(
+    "~/.local/share/yellowdog/benchmark_results.sqlite"
+)
+
+# Set RESULTS_STORE_FILE to an empty string to disable the results store
+STORE_FILE = getenv("RESULTS_STORE_FILE", DEFAULT_STORE_FILE)
+
+# The format of the benchmark start and end times
+TIME_FORMAT = "%Y-%m-%d_%H%M%S_UTC"
+
+INSTANCE_KEY = ["provider", "region", "instance_type"]
+
+
+class ResultsStore:
+    """
+    A SQLite-backed store of the results of successive benchmark runs.
+    """
+
+    def __init__(self, filename: str = STORE_FILE):
+        """
+        Constructor.
+
+        Args:
+            filename (str, optional): The SQLite database file.
+        """
+        directory = path.dirname(filename)
+        if directory != "":
+            makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(filename)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id INTEGER PRIMARY KEY, started_at TEXT UNIQUE,"
+            " recorded_at REAL, instances INTEGER);"
+            "CREATE TABLE IF NOT EXISTS results ("
+            " run_id INTEGER REFERENCES runs (run_id), started_at TEXT,"
+            " provider TEXT, region TEXT, instance_type TEXT, benchmark TEXT,"
+            " score REAL);"
+            "CREATE INDEX IF NOT EXISTS results_instance_benchmark ON results"
+            " (provider, region, instance_type, benchmark, started_at);"
+            "CREATE INDEX IF NOT EXISTS results_benchmark ON results"
+            " (benchmark, started_at);"
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record_run(
+        self,
+        df: pd.DataFrame,
+        benchmark_headers: List[str],
+        started_at: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Append the results of a benchmark run. The run is keyed on its start
+        time, which defaults to the earliest instance start time in the
+        results. Return the run ID, or None if the run was already recorded.
+        """
+        if started_at is None:
+            started_at = df[TIMING_COLUMNS[0]].dropna().astype(str).min()
+        if pd.isna(started_at):
+            started_at = datetime.utcnow().strftime(TIME_FORMAT)
+        results = df[
+            [getenv("H_PROVIDER"), getenv("H_REGION"), getenv("H_INSTANCE_TYPE")]
+            + benchmark_headers
+        ].melt(
+            id_vars=[
+                getenv("H_PROVIDER"),
+                getenv("H_REGION"),
+                getenv("H_INSTANCE_TYPE"),
+            ],
+            var_name="benchmark",
+            value_name="score",
+        )
+        results = results.dropna(subset=["score"])
+
+        with self._db:
+            try:
+                run_id = self._db.execute(
+                    "INSERT INTO runs (started_at, recorded_at, instances)"
+                    " VALUES (?, ?, ?)",
+                    (started_at, time(), len(df)),
+                ).lastrowid
+            except sqlite3.IntegrityError:
+                return None
+            self._db.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, started_at, str(provider), str(region), str(instance))
+                    + (benchmark, float(score))
+                    for provider, region, instance, benchmark, score in (
+                        results.itertuples(index=False, name=None)
+                    )
+                ],
+            )
+        return run_id
+
+    def runs(self) -> pd.DataFrame:
+        """
+        The recorded runs, oldest first.
+        """
+        return pd.read_sql_query(
+            "SELECT run_id, started_at, instances FROM runs ORDER BY started_at",
+            self._db,
+        )
+
+    def history(
+        self,
+        benchmark: str,
+        provider: Optional[str] = None,
+        region: Optional[str] = None,
+        instance_type: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        The results of a benchmark across all runs, optionally restricted to
+        a provider, region and instance type, ordered by run start time.
+        """
+        query = (
+            "SELECT run_id, started_at, provider, region, instance_type, score"
+            " FROM results WHERE benchmark = ?"
+        )
+        parameters = [benchmark]
+        for column, value in (
+            ("provider", provider),
+            ("region", region),
+            ("instance_type", instance_type),
+        ):
+            if value is not None:
+                query += f" AND {column} = ?"
+                parameters.append(value)
+        df = pd.read_sql_query(
+            query + " ORDER BY started_at", self._db, params=parameters
+        )
+        df["started_at"] = pd.to_datetime(df["started_at"], format=TIME_FORMAT)
+        return df
+
+    def latest(self, benchmark: str) -> pd.DataFrame:
+        """
+        The most recent result of a benchmark for each instance type. Where an
+        instance type was benchmarked more than once in a run, the mean
+        result is used.
+        """
+        return self.statistics(benchmark)[INSTANCE_KEY + ["latest"]]
+
+    def medians(self, benchmark: str) -> pd.DataFrame:
+        """
+        The median per-run result of a benchmark for each instance type.
+        """
+        return self.statistics(benchmark)[INSTANCE_KEY + ["median"]]
+
+    def statistics(self, benchmark: str) -> pd.DataFrame:
+        """
+        Summarise the history of a benchmark for each instance type: the
+        number of runs, the latest and median results, and the trend as the
+        least-squares change in result per run, relative to the median.
+        """
+        per_run = (
+            self.history(benchmark)
+            .groupby(INSTANCE_KEY + ["run_id", "started_at"])["score"]
+            .mean()
+            .reset_index()
+            .sort_values(by="started_at")
+        )
+        per_run["run_number"] = per_run.groupby(INSTANCE_KEY).cumcount()
+
+        groups = per_run.groupby(INSTANCE_KEY)
+        statistics = groups["score"].agg(runs="count", latest="last", median="median")
+
+        # Least-squares slope of score against run number, for each instance type
+        x_mean = groups["run_number"].transform("mean")
+        y_mean = groups["score"].transform("mean")
+        per_run["xy"] = (per_run["run_number"] - x_mean) * (per_run["score"] - y_mean)
+        per_run["xx"] = (per_run["run_number"] - x_mean) ** 2
+        sums = per_run.groupby(INSTANCE_KEY)[["xy", "xx"]].sum()
+        statistics["trend"] = (sums["xy"] / sums["xx"]) / statistics["median"]
+        statistics.loc[statistics["runs"] < 2, "trend"] = float("nan")
+        return statistics.reset_index()
+
+
+def history_chart_file(benchmark: Benchmark) -> str:
+    """
+    The file name of a benchmark's results over time chart.
+    """
+    return f"{path.splitext(benchmark.output_file)[0]}-history.png"
+
+
+def open_store() -> Optional[ResultsStore]:
+    """
+    Open the results store, unless it has been disabled.
+    """
+    if STORE_FILE == "":
+        return None
+    try:
+        return ResultsStore()
+    except Exception as e:
+        print(f"Results store unavailable: {e}")
+        return None
+
+
+def main():
+    try:
+        csv_summary_file = sys.argv[1]
+    except IndexError as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    benchmark_headers = [benchmark.column_title for benchmark in selected_benchmarks()]
+    store = open_store()
+    if store is None:
+        return
+    with store:
+        run_id = store.record_run(load_summary(csv_summary_file), benchmark_headers)
+        if run_id is None:
+            print("Results already recorded in the results store")
+        else:
+            print(f"Recorded run {run_id} in the results store '{STORE_FILE}'")
+
+
+if __name__ == "__main__":
+    main()
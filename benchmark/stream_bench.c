@@ -0,0 +1,398 @@
+# include <stdlib.h>
+# include <stdio.h>
+# include <stdint.h>
+# include <float.h>
+# include <math.h>
+# include <time.h>
+# ifdef _OPENMP
+# include <omp.h>
+# endif
+
+/*
+  A STREAM-style memory benchmark, after John McCalpin's STREAM
+  (https://www.cs.virginia.edu/stream/). It measures the sustainable memory
+  bandwidth of the Copy, Scale, Add and Triad kernels over arrays much larger
+  than the caches, shared between OpenMP threads, and the latency of
+  dependent loads ("pointer chasing") in a single thread over working sets
+  from the L1 cache to DRAM. Compile with '-fopenmp' for the multithreaded
+  version; the number of threads is set by OMP_NUM_THREADS.
+*/
+
+# ifndef NTIMES
+# define NTIMES 10
+# endif
+
+/* The size of a pointer-chasing node: one cache line */
+# define LINE 64
+
+/* The smallest pointer-chasing working set, in KiB */
+# define MIN_CHASE_KIB 4
+
+/* The minimum number of dependent loads timed at each working set size */
+# define MIN_LOADS 4194304
+
+typedef struct node
+{
+  struct node *next;
+  char pad[LINE - sizeof ( struct node * )];
+} node;
+
+int main ( int argc, char *argv[] );
+double chase_latency ( size_t kib, uint64_t *seed );
+int check_results ( size_t n, double a[], double b[], double c[] );
+uint64_t xorshift ( uint64_t *state );
+double wall_time ( );
+
+/******************************************************************************/
+
+int main ( int argc, char *argv[] )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    MAIN runs the bandwidth and latency measurements.
+
+  Parameters:
+
+    Optional first command line argument is the number of elements in each
+    bandwidth array (default 10,000,000).
+
+    Optional second command line argument is the largest pointer-chasing
+    working set, in KiB (default 262144). Working sets double in size from
+    4 KiB up to this size.
+*/
+{
+  static const char *labels[4] = { "Copy:", "Scale:", "Add:", "Triad:" };
+  double *a;
+  double avgtime[4] = { 0.0, 0.0, 0.0, 0.0 };
+  double *b;
+  double bytes[4];
+  double *c;
+  size_t i;
+  int k;
+  size_t kib;
+  size_t max_kib = 262144;
+  double maxtime[4] = { 0.0, 0.0, 0.0, 0.0 };
+  double mintime[4] = { FLT_MAX, FLT_MAX, FLT_MAX, FLT_MAX };
+  size_t n = 10000000;
+  double scalar = 3.0;
+  uint64_t seed = 88172645463325252ULL;
+  int threads = 1;
+  double times[4][NTIMES];
+
+  if ( 1 < argc )
+  {
+    n = strtoull ( argv[1], NULL, 10 );
+  }
+  if ( 2 < argc )
+  {
+    max_kib = strtoull ( argv[2], NULL, 10 );
+  }
+  if ( n < 1000 || max_kib < MIN_CHASE_KIB )
+  {
+    printf ( "STREAM_BENCH - Fatal error!\n" );
+    printf ( "  The array size must be at least 1000 elements, and the\n" );
+    printf ( "  largest working set at least %d KiB.\n", MIN_CHASE_KIB );
+    return 1;
+  }
+
+# ifdef _OPENMP
+  threads = omp_get_max_threads ( );
+# endif
+
+  bytes[0] = 2.0 * sizeof ( double ) * ( double ) n;
+  bytes[1] = 2.0 * sizeof ( double ) * ( double ) n;
+  bytes[2] = 3.0 * sizeof ( double ) * ( double ) n;
+  bytes[3] = 3.0 * sizeof ( double ) * ( double ) n;
+
+  printf ( "STREAM_BENCH\n" );
+  printf ( "  Array size                   = %zu\n", n );
+  printf ( "  Memory per array (MiB)       = %.1f\n",
+    sizeof ( double ) * ( double ) n / 1048576.0 );
+  printf ( "  Threads                      = %d\n", threads );
+  printf ( "  Trials                       = %d\n", NTIMES );
+  printf ( "\n" );
+
+  a = ( double * ) malloc ( n * sizeof ( double ) );
+  b = ( double * ) malloc ( n * sizeof ( double ) );
+  c = ( double * ) malloc ( n * sizeof ( double ) );
+  if ( a == NULL || b == NULL || c == NULL )
+  {
+    printf ( "STREAM_BENCH - Fatal error!\n" );
+    printf ( "  Unable to allocate the arrays.\n" );
+    return 1;
+  }
+/*
+  Initialise the arrays in parallel, so that each page is placed on the NUMA
+  node of the thread that uses it.
+*/
+# pragma omp parallel for
+  for ( i = 0; i < n; i++ )
+  {
+    a[i] = 1.0;
+    b[i] = 2.0;
+    c[i] = 0.0;
+  }
+
+  for ( k = 0; k < NTIMES; k++ )
+  {
+    times[0][k] = wall_time ( );
+# pragma omp parallel for
+    for ( i = 0; i < n; i++ )
+    {
+      c[i] = a[i];
+    }
+    times[0][k] = wall_time ( ) - times[0][k];
+
+    times[1][k] = wall_time ( );
+# pragma omp parallel for
+    for ( i = 0; i < n; i++ )
+    {
+      b[i] = scalar * c[i];
+    }
+    times[1][k] = wall_time ( ) - times[1][k];
+
+    times[2][k] = wall_time ( );
+# pragma omp parallel for
+    for ( i = 0; i < n; i++ )
+    {
+      c[i] = a[i] + b[i];
+    }
+    times[2][k] = wall_time ( ) - times[2][k];
+
+    times[3][k] = wall_time ( );
+# pragma omp parallel for
+    for ( i = 0; i < n; i++ )
+    {
+      a[i] = b[i] + scalar * c[i];
+    }
+    times[3][k] = wall_time ( ) - times[3][k];
+  }
+/*
+  The first iteration is excluded, as it includes any remaining page faults.
+*/
+  for ( k = 1; k < NTIMES; k++ )
+  {
+    for ( i = 0; i < 4; i++ )
+    {
+      avgtime[i] = avgtime[i] + times[i][k];
+      mintime[i] = fmin ( mintime[i], times[i][k] );
+      maxtime[i] = fmax ( maxtime[i], times[i][k] );
+    }
+  }
+
+  printf ( "Function    Best Rate MB/s  Avg time     Min time     Max time\n" );
+  for ( i = 0; i < 4; i++ )
+  {
+    avgtime[i] = avgtime[i] / ( double ) ( NTIMES - 1 );
+    printf ( "%-8s  %12.1f  %11.6f  %11.6f  %11.6f\n", labels[i],
+      1.0E-06 * bytes[i] / mintime[i], avgtime[i], mintime[i], maxtime[i] );
+  }
+  printf ( "\n" );
+  if ( check_results ( n, a, b, c ) )
+  {
+    printf ( "Solution Validates\n" );
+  }
+  else
+  {
+    printf ( "Failed Validation\n" );
+  }
+  printf ( "\n" );
+
+  free ( a );
+  free ( b );
+  free ( c );
+
+  printf ( "Pointer-Chase Latency\n" );
+  printf ( "  Working Set (KiB)  Latency (ns)\n" );
+  for ( kib = MIN_CHASE_KIB; kib <= max_kib; kib = kib * 2 )
+  {
+    printf ( "  %17zu  %12.2f\n", kib, chase_latency ( kib, &seed ) );
+    fflush ( stdout );
+  }
+
+  return 0;
+}
+/******************************************************************************/
+
+double chase_latency ( size_t kib, uint64_t *seed )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    CHASE_LATENCY measures the average latency of a dependent load.
+
+  Discussion:
+
+    The working set is divided into cache-line nodes, linked into a single
+    cycle in a random order (Sattolo's algorithm), so that hardware
+    prefetching can't anticipate the next load. The cycle is traversed once
+    to warm the caches, then timed over at least MIN_LOADS loads.
+
+  Parameters:
+
+    Input, size_t KIB, the size of the working set in KiB.
+
+    Input/output, uint64_t *SEED, the state of the random number generator.
+
+    Output, double CHASE_LATENCY, the average latency in nanoseconds.
+*/
+{
+  size_t count = kib * 1024 / LINE;
+  size_t i;
+  size_t j;
+  size_t loads;
+  node *nodes;
+  size_t *order;
+  node *p;
+  double seconds;
+  size_t t;
+
+  nodes = ( node * ) malloc ( count * sizeof ( node ) );
+  order = ( size_t * ) malloc ( count * sizeof ( size_t ) );
+  if ( nodes == NULL || order == NULL )
+  {
+    free ( nodes );
+    free ( order );
+    return NAN;
+  }
+
+  for ( i = 0; i < count; i++ )
+  {
+    order[i] = i;
+  }
+  for ( i = count - 1; 0 < i; i-- )
+  {
+    j = xorshift ( seed ) % i;
+    t = order[i];
+    order[i] = order[j];
+    order[j] = t;
+  }
+  for ( i = 0; i < count; i++ )
+  {
+    nodes[i].next = &nodes[order[i]];
+  }
+  free ( order );
+
+  p = &nodes[0];
+  for ( i = 0; i < count; i++ )
+  {
+    p = p->next;
+  }
+
+  loads = count < MIN_LOADS ? MIN_LOADS : count;
+  seconds = wall_time ( );
+  for ( i = 0; i < loads; i++ )
+  {
+    p = p->next;
+  }
+  seconds = wall_time ( ) - seconds;
+/*
+  Use the final node, so that the traversal isn't optimised away.
+*/
+  if ( p == NULL )
+  {
+    printf ( "\n" );
+  }
+  free ( nodes );
+
+  return 1.0E+09 * seconds / ( double ) loads;
+}
+/******************************************************************************/
+
+int check_results ( size_t n, double a[], double b[], double c[] )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    CHECK_RESULTS validates the final values of the bandwidth arrays.
+
+  Discussion:
+
+    Every element of each array has the same value, which is found by
+    repeating the kernels on scalars. The average absolute error of each
+    array, relative to its expected value, must be within a tolerance.
+
+  Parameters:
+
+    Input, size_t N, the number of elements in each array.
+
+    Input, double A[N], B[N], C[N], the arrays.
+
+    Output, int CHECK_RESULTS, 1 if the arrays are valid, 0 otherwise.
+*/
+{
+  double aj = 1.0;
+  double bj = 2.0;
+  double cj = 0.0;
+  double error[3] = { 0.0, 0.0, 0.0 };
+  size_t i;
+  int k;
+  double scalar = 3.0;
+
+  for ( k = 0; k < NTIMES; k++ )
+  {
+    cj = aj;
+    bj = scalar * cj;
+    cj = aj + bj;
+    aj = bj + scalar * cj;
+  }
+
+  for ( i = 0; i < n; i++ )
+  {
+    error[0] = error[0] + fabs ( a[i] - aj );
+    error[1] = error[1] + fabs ( b[i] - bj );
+    error[2] = error[2] + fabs ( c[i] - cj );
+  }
+
+  return error[0] / ( double ) n / fabs ( aj ) < 1.0E-13
+    && error[1] / ( double ) n / fabs ( bj ) < 1.0E-13
+    && error[2] / ( double ) n / fabs ( cj ) < 1.0E-13;
+}
+/******************************************************************************/
+
+uint64_t xorshift ( uint64_t *state )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    XORSHIFT returns the next value of a xorshift64 random number generator.
+
+  Parameters:
+
+    Input/output, uint64_t *STATE, the state of the generator, which must
+    not be zero.
+
+    Output, uint64_t XORSHIFT, the next pseudorandom value.
+*/
+{
+  *state ^= *state << 13;
+  *state ^= *state >> 7;
+  *state ^= *state << 17;
+  return *state;
+}
+/******************************************************************************/
+
+double wall_time ( )
+
+/******************************************************************************/
+/*
+  Purpose:
+
+    WALL_TIME returns the elapsed wall-clock time in seconds.
+
+  Parameters:
+
+    Output, double WALL_TIME, the reading of the monotonic clock, in seconds.
+*/
+{
+  struct timespec now;
+
+  clock_gettime ( CLOCK_MONOTONIC, &now );
+
+  return ( double ) now.tv_sec + 1.0E-09 * ( double ) now.tv_nsec;
+}
@@ -4,88 +4,136 @@ source $WR_NAME/common.sh
 
 ################################################################################
 
+# Python Environment  ##########################################################
+
+# The summary stage's Python packages are pinned in 'requirements.txt'. Its
+# environment is keyed by the hash of that file, the Python version and the CPU
+# architecture, and is cached in two forms:
+# - A venv in PYTHON_CACHE_DIR, if set (e.g., a directory that persists on the
+#   node), which is reused as is.
+# - A wheelhouse archive, found in PYTHON_CACHE_DIR or in any 'python-cache'
+#   directory under the Task directory (where archives in the Object Store are
+#   downloaded as optional Task inputs), from which a new venv is installed
+#   without network access.
+# The wheels are only downloaded on a cache miss, and the new archive is then
+# saved in the Task's 'python-cache' directory (uploaded as a Task output) and
+# in PYTHON_CACHE_DIR.
+
+TASK_DIR=$(pwd)
+PYTHON_CACHE_DIR=${PYTHON_CACHE_DIR:-}
+PYTHON_CACHE_OUTPUT="$TASK_DIR/python-cache"
+REQUIREMENTS="$WR_NAME/requirements.txt"
+PYTHON_ENV_KEY=$({ cat "$REQUIREMENTS"; python3 --version; uname -m; } \
+                 | sha256sum | cut -c1-12)
+WHEELHOUSE="python-wheels-$PYTHON_ENV_KEY"
+
+# Print the most recent cached wheelhouse archive, or nothing if there is none
+find_wheelhouse () {
+  {
+    if [[ -n $PYTHON_CACHE_DIR && -d $PYTHON_CACHE_DIR ]]
+    then
+      find "$PYTHON_CACHE_DIR" -maxdepth 1 -name "$WHEELHOUSE.tar.gz" \
+           -printf "%T@ %p\n"
+    fi
+    find "$TASK_DIR" -path "*python-cache/$WHEELHOUSE.tar.gz" -printf "%T@ %p\n"
+  } | sort -nr | head -1 | cut -d" " -f2-
+}
+
+# Install the packages into a new venv, from the cached wheelhouse if there is
+# one: install_environment <venv directory>
+install_environment () {
+  local ARCHIVE WHEELS
+  rm -rf "$1"
+  python3 -m venv "$1"
+  WHEELS=$(mktemp -d)
+  ARCHIVE=$(find_wheelhouse)
+  if [[ -n $ARCHIVE ]]
+  then
+    yd_print "Using cached wheelhouse '$(basename "$ARCHIVE" .tar.gz)'"
+    tar -xzf "$ARCHIVE" -C "$WHEELS"
+  else
+    yd_print "No cached wheelhouse for '$WHEELHOUSE': downloading packages"
+    "$1/bin/python" -m pip wheel -q -r "$REQUIREMENTS" -w "$WHEELS"
+    mkdir -p "$PYTHON_CACHE_OUTPUT"
+    tar -czf "$PYTHON_CACHE_OUTPUT/$WHEELHOUSE.tar.gz" -C "$WHEELS" .
+    if [[ -n $PYTHON_CACHE_DIR ]] && mkdir -p "$PYTHON_CACHE_DIR"
+    then
+      cp "$PYTHON_CACHE_OUTPUT/$WHEELHOUSE.tar.gz" "$PYTHON_CACHE_DIR" || true
+    fi
+  fi
+  "$1/bin/python" -m pip install -q --no-index --find-links "$WHEELS" \
+                  -r "$REQUIREMENTS"
+  rm -rf "$WHEELS"
+  # Marks the venv as complete, so that it can be reused
+  touch "$1/.installed"
+}
+
 yd_print "Set up Python for report generation"
 yd_print "Python version: $(python3 --version)"
-python3 -m venv py
-source py/bin/activate
-pip install -Uq matplotlib==3.7.1 \
-                numpy==1.26.4 \
-                pandas==2.0.1 \
-                fpdf2==2.7.3 \
-                tabulate==0.9.0 \
-                requests
+STARTUP_START=$SECONDS
+if [[ -n $PYTHON_CACHE_DIR ]]
+then
+  VENV="$PYTHON_CACHE_DIR/python-env-$PYTHON_ENV_KEY"
+else
+  VENV="$TASK_DIR/py"
+fi
+if [[ -f "$VENV/.installed" ]]
+then
+  yd_print "Using cached Python environment '$(basename "$VENV")'"
+else
+  mkdir -p "$(dirname "$VENV")"
+  install_environment "$VENV"
+fi
+source "$VENV/bin/activate"
+yd_print "Python environment ready in $((SECONDS - STARTUP_START)) seconds"
 echo
 
 # CSV Summary Generation  ######################################################
 
-# Collect the per-instance summaries in the 'summary.txt' files and combine
-# into a single CSV file with a header row
+# Collect the per-instance summaries in the 'summary.txt' files, add the
+# on-demand hourly price of each instance from the YellowDog Cloud Info
+# service, and combine into single CSV and Parquet files
 
 CURRENT_DIR="$(pwd)"
 
 OUTPUT_CSV=$CURRENT_DIR/summary.csv
 yd_print "Generating" $OUTPUT_CSV "..."
+python "$WR_NAME/aggregate_results.py" $WR_NAME $OUTPUT_CSV
+echo
 
-# Create the CSV header row
+# Results Store  ##############################################################
 
-# Mandatory columns
-echo -n "$H_PROVIDER, $H_INSTANCE_TYPE, $H_REGION, $H_CPU_MODEL, $H_VCPUS, \
-$H_RAM" > $OUTPUT_CSV
+# Append the results of this run to the historical results store, from which
+# the results over time charts are generated
 
-# Optional columns
-if [[ $BENCHMARKS == *$N_SYSBENCH* ]]
-then
-  echo -n ", $H_SYSBENCH_SC, $H_SYSBENCH_MC, $H_SYSBENCH_MEM, \
-$H_SYSBENCH_ST_R, $H_SYSBENCH_ST_W, $H_SYSBENCH_ST_F" >> $OUTPUT_CSV
-fi
-if [[ $BENCHMARKS == *$N_MYSQL_TPCC* ]]
-then
-  echo -n ", $H_MYSQL_TPCC" >> $OUTPUT_CSV
-fi
-if [[ $BENCHMARKS == *$N_COREMARK_STD* ]]
-then
-  echo -n ", $H_COREMARK_STD_SC, $H_COREMARK_STD_MC" >> $OUTPUT_CSV
-fi
-if [[ $BENCHMARKS == *$N_COREMARK_PRO* ]]
-then
-  echo -n ", $H_COREMARK_PRO_SC, $H_COREMARK_PRO_MC" >> $OUTPUT_CSV
-fi
-if [[ $BENCHMARKS == *$N_LINPACK* ]]
-then
-  echo -n ", $H_LINPACK" >> $OUTPUT_CSV
-fi
+yd_print "Recording results in the results store ..."
+python "$WR_NAME/results_store.py" $OUTPUT_CSV
+echo
+
+# Price-Performance Analysis  ##################################################
 
-# Final header row columns
-echo ", $H_START_TIME, $H_END_TIME, $H_INSTANCE_PRICE" >> $OUTPUT_CSV
-
-# CSV rows, one per instance
-for SUMMARY in $(find $WR_NAME -name summary.txt)
-do
-  yd_print "Adding $SUMMARY"
-  PROVIDER=$(cat $SUMMARY | awk -F ", " '{print $1}')
-  INSTANCE_TYPE=$(cat $SUMMARY | awk -F ", " '{print $2}')
-  REGION=$(cat $SUMMARY | awk -F ", " '{print $3}')
-  # Fetch the on-demand hourly price of the instance from the YellowDog
-  # Cloud Info service
-  PRICE=$(python $WR_NAME/get_instance_price.py $PROVIDER \
-          $REGION $INSTANCE_TYPE )
-  yd_print "Adding instance price: $PRICE"
-  echo "$(cat $SUMMARY), $PRICE" >> $OUTPUT_CSV
-done
+# Add the numeric prices, and the score per hourly price, score per vCPU and
+# Pareto frontier membership for each benchmark
 
+PRICE_PERFORMANCE_CSV=$CURRENT_DIR/price_performance.csv
+yd_print "Generating" $PRICE_PERFORMANCE_CSV "..."
+python "$WR_NAME/price_performance.py" $OUTPUT_CSV $PRICE_PERFORMANCE_CSV
 echo
 
 # Generate Charts and PDF report  ##############################################
 
-yd_print "Run 'charts.py' ..."
-python "$WR_NAME/charts.py" $OUTPUT_CSV
-echo
+# The charts and the report are generated in a single process, which loads the
+# summary data once and passes the rendered charts to the report in memory.
+# Set CHART_FILES=false to skip writing the chart files.
 
-yd_print "Run 'pdf_report.py' ..."
+yd_print "Run 'generate_report.py' ..."
 REPORT="$CURRENT_DIR/report.pdf"
-cd "$WR_NAME" || exit
-python pdf_report.py $CURRENT_DIR $OUTPUT_CSV $REPORT
-cd "$CURRENT_DIR" || exit
+CHART_FILES_OPTION=""
+if [[ "${CHART_FILES:-true}" == "false" ]]
+then
+  CHART_FILES_OPTION="--no-chart-files"
+fi
+python "$WR_NAME/generate_report.py" $OUTPUT_CSV $REPORT $CHART_FILES_OPTION
 echo
 
 ################################################################################
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+Sample the utilisation of an instance while the benchmarks run, writing one
+CSV line per sample until stopped (by SIGTERM or SIGINT). Each sample holds:
+- 'time': the time of the sample, in seconds since the epoch
+- 'cpu_percent', 'iowait_percent', 'steal_percent': the share of the CPU time
+  of all vCPUs since the previous sample that was busy, waiting for I/O, and
+  stolen by the hypervisor (e.g., once a burstable instance's CPU credits are
+  exhausted), from '/proc/stat'
+- 'frequency_mhz': the mean current frequency of the vCPUs, from cpufreq, or
+  from '/proc/cpuinfo' if cpufreq isn't available
+- 'memory_used_mib': the memory in use (total less available), from
+  '/proc/meminfo'
+- 'disk_read_mib_s', 'disk_write_mib_s': the read and write throughput of the
+  block devices since the previous sample, from '/proc/diskstats'
+Any value that isn't available is left empty.
+
+This module uses only the Python standard library, so that it can run on the
+benchmark nodes.
+
+When run as a script:
+- First command line parameter is the pathname of the CSV file to write.
+- Optional second command line parameter is the sampling interval in seconds
+  (default: 1).
+"""
+
+import glob
+import os
+import re
+import signal
+import sys
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+SAMPLES_FILE = "system-samples.csv"
+
+SAMPLE_COLUMNS = [
+    "time",
+    "cpu_percent",
+    "iowait_percent",
+    "steal_percent",
+    "frequency_mhz",
+    "memory_used_mib",
+    "disk_read_mib_s",
+    "disk_write_mib_s",
+]
+
+SECTOR_BYTES = 512
+
+# Block devices that aren't physical disks, or that duplicate the I/O of the
+# disks beneath them
+VIRTUAL_DEVICES = ("loop", "ram", "zram", "dm-", "md")
+
+Sample = Dict[str, Optional[float]]
+
+
+def _read(filename: str) -> Optional[str]:
+    """
+    The contents of a file, or None if it can't be read.
+    """
+    try:
+        with open(filename) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def cpu_times() -> Optional[List[int]]:
+    """
+    The aggregate CPU times of all vCPUs from '/proc/stat': user, nice,
+    system, idle, iowait, irq, softirq and steal, in clock ticks.
+    """
+    text = _read("/proc/stat")
+    if text is None or not text.startswith("cpu "):
+        return None
+    return [int(value) for value in text.split("\n", 1)[0].split()[1:9]]
+
+
+def frequency_mhz() -> Optional[float]:
+    """
+    The mean current frequency of the vCPUs, in MHz.
+    """
+    frequencies = []
+    for filename in glob.glob(
+        "/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"
+    ):
+        value = _read(filename)
+        if value is not None and value.strip().isdigit():
+            frequencies.append(int(value) / 1000)
+    if len(frequencies) == 0:
+        frequencies = [
+            float(value)
+            for value in re.findall(
+                r"^cpu MHz\s+: ([\d.]+)", _read("/proc/cpuinfo") or "", re.M
+            )
+        ]
+    return sum(frequencies) / len(frequencies) if len(frequencies) > 0 else None
+
+
+def memory_used_mib() -> Optional[float]:
+    """
+    The memory in use, less the memory available for reuse, in MiB.
+    """
+    text = _read("/proc/meminfo") or ""
+    total = re.search(r"^MemTotal:\s+(\d+) kB", text, re.M)
+    available = re.search(r"^MemAvailable:\s+(\d+) kB", text, re.M)
+    if total is None or available is None:
+        return None
+    return (int(total.group(1)) - int(available.group(1))) / 1024
+
+
+def disk_sectors() -> Optional[Tuple[int, int]]:
+    """
+    The total sectors read and written by the block devices, from
+    '/proc/diskstats'.
+    """
+    text = _read("/proc/diskstats")
+    if text is None:
+        return None
+    devices = set(os.listdir("/sys/block")) if os.path.isdir("/sys/block") else None
+    read = written = 0
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 10 or fields[2].startswith(VIRTUAL_DEVICES):
+            continue
+        # Partitions aren't listed in '/sys/block', and their I/O is included
+        # in that of their disk
+        if devices is not None and fields[2] not in devices:
+            continue
+        read += int(fields[5])
+        written += int(fields[9])
+    return read, written
+
+
+class Sampler:
+    """
+    Takes samples, from the differences between successive readings of the
+    cumulative counters.
+    """
+
+    def __init__(self):
+        """
+        Constructor. Takes the first readings.
+        """
+        self._time = time.time()
+        self._cpu = cpu_times()
+        self._disk = disk_sectors()
+
+    def sample(self) -> Sample:
+        """
+        Take a sample, covering the period since the previous one.
+        """
+        now, cpu, disk = time.time(), cpu_times(), disk_sectors()
+        sample: Sample = {column: None for column in SAMPLE_COLUMNS}
+        sample["time"] = now
+        if cpu is not None and self._cpu is not None:
+            deltas = [current - previous for current, previous in zip(cpu, self._cpu)]
+            total = sum(deltas)
+            if total > 0:
+                user, nice, system, _, iowait, irq, softirq, steal = deltas
+                busy = user + nice + system + irq + softirq
+                sample["cpu_percent"] = 100 * busy / total
+                sample["iowait_percent"] = 100 * iowait / total
+                sample["steal_percent"] = 100 * steal / total
+        if disk is not None and self._disk is not None and now > self._time:
+            for column, current, previous in zip(
+                ("disk_read_mib_s", "disk_write_mib_s"), disk, self._disk
+            ):
+                sample[column] = (
+                    (current - previous) * SECTOR_BYTES / 1048576 / (now - self._time)
+                )
+        sample["frequency_mhz"] = frequency_mhz()
+        sample["memory_used_mib"] = memory_used_mib()
+        self._time, self._cpu, self._disk = now, cpu, disk
+        return sample
+
+
+def write_sample(f: TextIO, sample: Sample):
+    """
+    Write a sample as a CSV line, with the values rounded to keep it compact.
+    """
+    values = []
+    for column in SAMPLE_COLUMNS:
+        value = sample[column]
+        places = 3 if column == "time" else 1
+        values.append("" if value is None else f"{value:.{places}f}")
+    f.write(",".join(values) + "\n")
+    f.flush()
+
+
+def run(output_file: str, interval: float):
+    """
+    Write samples to the output file at the given interval until stopped.
+    """
+    stopped = False
+
+    def stop(*_):
+        nonlocal stopped
+        stopped = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    with open(output_file, "w") as f:
+        f.write(",".join(SAMPLE_COLUMNS) + "\n")
+        sampler = Sampler()
+        next_sample = time.monotonic() + interval
+        while not stopped:
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+            write_sample(f, sampler.sample())
+            next_sample += interval
+
+
+def main():
+    try:
+        output_file = sys.argv[1]
+        interval = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    except (IndexError, ValueError) as e:
+        print(f"Exception: {e}. Missing command line argument. Aborting")
+        exit(1)
+
+    run(output_file, interval)
+
+
+if __name__ == "__main__":
+    main()
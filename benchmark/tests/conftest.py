@@ -0,0 +1,20 @@
+"""
+Set up the benchmark environment normally provided by 'common.sh', and make
+the benchmark modules importable, before any test module imports them.
+"""
+
+import os
+import re
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(BENCHMARK_DIR, "common.sh")) as f:
+    for name, value in re.findall(r'^export (\w+)="(.*)"$', f.read(), re.M):
+        os.environ.setdefault(name, value)
+os.environ.setdefault(
+    "BENCHMARKS",
+    "sysbench,mysql-tpcc,coremark-standard,coremark-pro,linpack,numpy-linalg,stream",
+)
+if BENCHMARK_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARK_DIR)
@@ -0,0 +1,103 @@
+"""
+Tests of loading the system samples and phase timings, and finding the skipped
+benchmark Tasks, in 'aggregate_results.py'.
+"""
+
+import math
+import os
+
+from aggregate_results import (
+    PHASE_TIMINGS_FILE,
+    SAMPLES_FILE,
+    SKIPPED_FILE,
+    SUMMARY_FILE,
+    find_skipped,
+    instance_activity,
+    load_summaries,
+)
+from benchmark_registry import selected_benchmarks, summary_columns
+from system_sampler import SAMPLE_COLUMNS
+
+COLUMNS = summary_columns(selected_benchmarks())
+
+
+def write_instance(root, name: str, samples=None, phases=None):
+    """
+    Write an instance's summary file, and its samples and phase timings files
+    if given, as lists of CSV lines.
+    """
+    directory = os.path.join(root, name)
+    os.makedirs(directory)
+    with open(os.path.join(directory, SUMMARY_FILE), "w") as f:
+        f.write(", ".join([name] * len(COLUMNS)) + "\n")
+    for filename, header, lines in (
+        (SAMPLES_FILE, ",".join(SAMPLE_COLUMNS), samples),
+        (PHASE_TIMINGS_FILE, "phase,kind,start,end,seconds", phases),
+    ):
+        if lines is not None:
+            with open(os.path.join(directory, filename), "w") as f:
+                f.write("\n".join([header] + lines) + "\n")
+
+
+def test_activity_without_files(tmp_path):
+    assert instance_activity(str(tmp_path), 0) == ([], [])
+
+
+def test_phase_means(tmp_path):
+    write_instance(
+        tmp_path,
+        "a",
+        samples=[
+            "1000.0,10.0,,,,,,",
+            "1001.0,20.0,,,,,,",
+            ",99.0,,,,,,",
+            "1002.0,60.0,1.0,,,,,",
+        ],
+        phases=[
+            "build,setup,999.5,1001.0,1.5",
+            "run,measure,1001.5,1003.0,1.5",
+            "idle,measure,1003.5,1004.0,0.5",
+        ],
+    )
+    write_instance(tmp_path, "b")
+    write_instance(
+        tmp_path,
+        "c",
+        samples=["2000.0,50.0,,,,,,", "2001.0,70.0,,,,,,"],
+        phases=["run,measure,2000.0,2001.0,1.0"],
+    )
+
+    df, _, _, samples, phases = load_summaries(str(tmp_path), COLUMNS, [], [])
+
+    rows = {name: row for row, name in enumerate(df[COLUMNS[0]])}
+    a_samples = samples[samples["row"] == rows["a"]]
+    assert a_samples["time"].tolist() == [0.5, 1.5, 2.5]
+    assert not (samples["row"] == rows["b"]).any()
+    assert not (phases["row"] == rows["b"]).any()
+
+    a_phases = phases[phases["row"] == rows["a"]].set_index("phase")
+    assert a_phases.loc["build", ["start", "end"]].tolist() == [0.0, 1.5]
+    assert a_phases.loc["build", "cpu_percent"] == 15.0
+    assert a_phases.loc["run", "cpu_percent"] == 60.0
+    assert a_phases.loc["run", "iowait_percent"] == 1.0
+    assert math.isnan(a_phases.loc["build", "iowait_percent"])
+    assert math.isnan(a_phases.loc["idle", "cpu_percent"])
+
+    c_phases = phases[phases["row"] == rows["c"]]
+    assert c_phases["cpu_percent"].tolist() == [60.0]
+
+
+def test_skipped_tasks_reported(tmp_path):
+    write_instance(tmp_path / "task1", "m5.large")
+    skipped = tmp_path / "task2" / "m5.large"
+    skipped.mkdir(parents=True)
+    (skipped / SKIPPED_FILE).write_text(
+        "skipped: duplicate node i-0abc (m5.large) at 2026-10-17_200258_UTC\n"
+    )
+
+    df, _, _, _, _ = load_summaries(str(tmp_path), COLUMNS, [], [])
+
+    assert len(df) == 1
+    assert find_skipped(str(tmp_path)) == [
+        "skipped: duplicate node i-0abc (m5.large) at 2026-10-17_200258_UTC"
+    ]
@@ -0,0 +1,132 @@
+"""
+Tests of the summary data helpers in 'benchmark_data.py'.
+"""
+
+import os
+import random
+
+import pandas as pd
+
+from benchmark_data import instance_labels
+
+INSTANCE_TYPE = os.getenv("H_INSTANCE_TYPE")
+REGION = os.getenv("H_REGION")
+COLUMNS = [INSTANCE_TYPE, REGION]
+
+
+def summary(rows, index=None) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=COLUMNS, index=index)
+
+
+def legacy_labels(df: pd.DataFrame, label_column: str) -> pd.DataFrame:
+    """
+    The original row-by-row implementation from 'charts.py', which sorts the
+    DataFrame by label.
+    """
+    df[label_column] = df.apply(lambda x: f"{x[INSTANCE_TYPE]} / {x[REGION]}", axis=1)
+    df.sort_values(by=[label_column], inplace=True, ignore_index=True)
+    current_duplicate = ""
+    duplicate_counter = 1
+    for index, row in enumerate(df.duplicated(keep=False, subset=[label_column])):
+        if row is True:
+            if df.iloc[index][label_column] != current_duplicate:
+                current_duplicate = df.iloc[index][label_column]
+                duplicate_counter = 1
+            df.at[index, label_column] = f"{current_duplicate} ({duplicate_counter})"
+            duplicate_counter += 1
+    return df
+
+
+def test_unique_labels():
+    df = summary(
+        [["m5.large", "eu-west-1"], ["c5.xlarge", "eu-west-1"]], index=[10, 20]
+    )
+
+    labels = instance_labels(df, COLUMNS)
+
+    assert labels.to_dict() == {
+        10: "m5.large / eu-west-1",
+        20: "c5.xlarge / eu-west-1",
+    }
+
+
+def test_duplicate_labels():
+    df = summary(
+        [
+            ["m5.large", "eu-west-1"],
+            ["c5.xlarge", "eu-west-1"],
+            ["m5.large", "eu-west-1"],
+            ["m5.large", "us-east-1"],
+        ]
+    )
+
+    labels = instance_labels(df, COLUMNS)
+
+    assert labels.tolist() == [
+        "m5.large / eu-west-1 (1)",
+        "c5.xlarge / eu-west-1",
+        "m5.large / eu-west-1 (2)",
+        "m5.large / us-east-1",
+    ]
+
+
+def test_multiple_duplicate_labels():
+    df = summary(
+        [
+            ["t3.micro", "us-east-1"],
+            ["m5.large", "eu-west-1"],
+            ["t3.micro", "us-east-1"],
+            ["m5.large", "eu-west-1"],
+            ["c5.xlarge", "eu-west-1"],
+            ["t3.micro", "us-east-1"],
+            ["m5.large", "eu-west-1"],
+            ["m5.large", "eu-west-1"],
+        ],
+        index=list("abcdefgh"),
+    )
+
+    labels = instance_labels(df, COLUMNS)
+
+    assert labels.to_dict() == {
+        "a": "t3.micro / us-east-1 (1)",
+        "b": "m5.large / eu-west-1 (1)",
+        "c": "t3.micro / us-east-1 (2)",
+        "d": "m5.large / eu-west-1 (2)",
+        "e": "c5.xlarge / eu-west-1",
+        "f": "t3.micro / us-east-1 (3)",
+        "g": "m5.large / eu-west-1 (3)",
+        "h": "m5.large / eu-west-1 (4)",
+    }
+    assert labels.is_unique
+
+
+def test_separator_and_columns():
+    df = summary([["m5.large", "eu-west-1"], ["m5.large", "eu-west-1"]])
+    df["Provider"] = ["AWS", "AWS"]
+
+    labels = instance_labels(df, ["Provider"] + COLUMNS, separator=":")
+
+    assert labels.tolist() == [
+        "AWS:m5.large:eu-west-1 (1)",
+        "AWS:m5.large:eu-west-1 (2)",
+    ]
+
+
+def test_matches_legacy_labels():
+    rng = random.Random(0)
+    df = summary(
+        [
+            [f"type-{rng.randrange(50)}", rng.choice(["eu-west-1", "us-east-1"])]
+            for _ in range(1000)
+        ]
+    )
+    df["Row"] = range(len(df))
+
+    legacy = legacy_labels(df.copy(), "Label")
+    df["Label"] = instance_labels(df, COLUMNS)
+
+    assert legacy["Label"].str.endswith(")").sum() > 0
+    # Compare complete rows, since the row order differs
+    assert sorted(legacy.astype(str).itertuples(index=False)) == sorted(
+        df.astype(str).itertuples(index=False)
+    )
@@ -0,0 +1,174 @@
+"""
+Run the setup phases of 'benchmarks.sh' twice against the same build cache,
+with stub commands in place of git, make, gcc and Python, and check that the
+second run is served entirely from the cache.
+"""
+
+import os
+import platform
+import re
+import stat
+import subprocess
+
+import pytest
+
+from conftest import BENCHMARK_DIR
+
+SETUP_PHASES = [
+    "setup_mysql_tpcc",
+    "setup_coremark",
+    "setup_coremark_pro",
+    "setup_linpack",
+    "setup_stream",
+    "setup_numpy_linalg",
+]
+
+# Each stub logs its command line, then acts just enough like the command
+STUBS = {
+    "git": """
+case $1 in
+  ls-remote) printf '0123456789abcdef0123456789abcdef01234567\\tHEAD\\n';;
+  clone) mkdir -p "$3/.git"; echo source > "$3/README";;
+  -C) echo 0123456789ab;;
+esac
+""",
+    "make": """
+echo built > built
+""",
+    "gcc": """
+if [[ $1 == -dumpfullversion ]]
+then
+  echo 11.4.0
+  exit
+fi
+while [[ $# -gt 0 ]]
+do
+  if [[ $1 == -o ]]
+  then
+    echo binary > "$2"
+  fi
+  shift
+done
+""",
+    "python3": """
+mkdir -p py/bin
+cp "$(dirname "$0")/venv-python" py/bin/python
+cp "$(dirname "$0")/venv-pip" py/bin/pip
+""",
+    "venv-python": """
+echo cpython-311
+""",
+    "venv-pip": """
+if [[ $1 == wheel ]]
+then
+  mkdir -p numpy-wheels
+  echo wheel > numpy-wheels/numpy-1.26.4-cp311-cp311-linux_x86_64.whl
+fi
+""",
+}
+
+
+def setup_script() -> str:
+    """
+    The helper functions and setup phases of 'benchmarks.sh', without the
+    instance setup and measurements.
+    """
+    with open(os.path.join(BENCHMARK_DIR, "benchmarks.sh")) as f:
+        text = f.read()
+    pinned = re.search(r"^pinned \(\) \{.*?^\}$", text, re.M | re.S).group(0)
+    setup = re.search(
+        r"^# Build cache  #+$.*?(?=^# Measurement phases  #+$)", text, re.M | re.S
+    ).group(0)
+    return "\n".join(
+        [
+            "set -euo pipefail",
+            'yd_print () { echo "$*"; }',
+            pinned,
+            setup,
+            'cd "$BENCHMARK_DIR"',
+            *SETUP_PHASES,
+        ]
+    )
+
+
+@pytest.fixture
+def stubs(tmp_path):
+    directory = tmp_path / "bin"
+    directory.mkdir()
+    for name, body in STUBS.items():
+        stub = directory / name
+        stub.write_text(
+            f'#!/bin/bash\necho "{name} $*" >> "$STUB_LOG"\n{body.lstrip()}'
+        )
+        stub.chmod(stub.stat().st_mode | stat.S_IXUSR)
+    return directory
+
+
+def run_setup(tmp_path, stubs, run: str) -> str:
+    """
+    Run the setup phases in a new Task directory, returning the commands
+    that were run.
+    """
+    task_dir = tmp_path / run
+    task_dir.mkdir()
+    log = tmp_path / f"{run}.log"
+    log.touch()
+    env = dict(
+        os.environ,
+        PATH=f"{stubs}:{os.environ['PATH']}",
+        STUB_LOG=str(log),
+        TASK_DIR=str(task_dir),
+        BENCHMARK_DIR=str(task_dir),
+        BUILD_CACHE_DIR=str(tmp_path / "cache"),
+        BUILD_ONLY="true",
+        SETUP_CPUS="",
+        CPU_MODEL="Test CPU",
+        LINPACK_CFLAGS="-O3 -fopenmp",
+        STREAM_CFLAGS="-O3 -fopenmp",
+    )
+    for source in ("linpack_bench.c", "stream_bench.c"):
+        (task_dir / source).write_text(source)
+    subprocess.run(
+        ["bash", "-c", setup_script()],
+        cwd=task_dir,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    return log.read_text()
+
+
+def test_build_cache_hit(tmp_path, stubs):
+    first = run_setup(tmp_path, stubs, "first")
+    second = run_setup(tmp_path, stubs, "second")
+
+    build = rf"[0-9a-f]{{12}}-gcc11\.4\.0-{platform.machine()}"
+    archives = sorted(os.listdir(tmp_path / "cache"))
+    assert len(archives) == 6
+    for archive, pattern in zip(
+        archives,
+        [
+            r"coremark-0123456789ab",
+            rf"coremark-pro-{build}",
+            rf"linpack-{build}",
+            rf"numpy-1\.26\.4-cpython-311-{platform.machine()}",
+            rf"stream-{build}",
+            r"sysbench-tpcc-0123456789ab",
+        ],
+    ):
+        assert re.fullmatch(rf"{pattern}\.tar\.gz", archive)
+    for command in ("git clone", "make build", "gcc -O3", "pip wheel"):
+        assert command in first
+        assert command not in second
+
+    task_dir = tmp_path / "second"
+    for built in (
+        "coremark/README",
+        "coremark-pro/built",
+        "linpack/linpack",
+        "stream/stream",
+        "sysbench/sysbench-tpcc/README",
+        "numpy-linalg/numpy-wheels/numpy-1.26.4-cp311-cp311-linux_x86_64.whl",
+    ):
+        assert (task_dir / built).is_file()
+    assert "pip install -q --no-index --find-links numpy-wheels" in second
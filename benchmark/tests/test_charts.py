@@ -0,0 +1,132 @@
+"""
+Tests of chart rendering in 'charts.py', and of the report's handling of
+charts that failed to render.
+"""
+
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from conftest import BENCHMARK_DIR
+
+from benchmark_data import chart_path, load_summary
+from charts import ChartJob, render_jobs
+from render_cache import MANIFEST_FILE
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "perf"))
+
+from synthetic import write_summary_csv  # noqa: E402
+
+
+def good_chart(name: str) -> bytes:
+    return f"chart {name}".encode()
+
+
+def bad_chart(name: str) -> bytes:
+    raise ValueError(f"no data for {name}")
+
+
+JOBS = [
+    ChartJob("first.png", good_chart, ("first",)),
+    ChartJob("second.png", bad_chart, ("second",)),
+    ChartJob("third.png", good_chart, ("third",)),
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_failure(workers, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    # An earlier version of the chart that fails
+    (tmp_path / chart_path("second.png")).write_bytes(b"stale chart")
+
+    charts = render_jobs(JOBS, workers=workers)
+
+    assert charts == {"first.png": b"chart first", "third.png": b"chart third"}
+    assert "Error: unable to generate 'second.png': no data for second" in (
+        capsys.readouterr().out
+    )
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [MANIFEST_FILE, chart_path("first.png"), chart_path("third.png")]
+    )
+
+    # The failed chart is retried, and the others are unchanged
+    charts = render_jobs(JOBS, workers=workers)
+
+    assert charts == {}
+    output = capsys.readouterr().out
+    assert "Unchanged 'first.png'" in output
+    assert "Error: unable to generate 'second.png'" in output
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_without_files(workers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / chart_path("second.png")).write_bytes(b"stale chart")
+
+    charts = render_jobs(JOBS, workers=workers, save=False)
+
+    assert set(charts) == {"first.png", "third.png"}
+    # The stale version of the failed chart is removed, and nothing is saved
+    assert os.listdir(tmp_path) == [MANIFEST_FILE]
+
+
+def png_chart(width: int, height: int) -> bytes:
+    chart = io.BytesIO()
+    Image.new("RGB", (width, height)).save(chart, format="PNG")
+    return chart.getvalue()
+
+
+def summary(tmp_path):
+    csv_file = str(tmp_path / "summary.csv")
+    write_summary_csv(csv_file, 20)
+    return load_summary(csv_file)
+
+
+def test_report_omits_missing_charts(tmp_path, capsys):
+    from pdf_report import generate_report
+
+    df = summary(tmp_path)
+    original = df.copy()
+
+    # Only one chart was rendered, and none were saved
+    generate_report(
+        df,
+        str(tmp_path),
+        str(tmp_path / "report.pdf"),
+        charts={"sysbench-single.png": png_chart(100, 60)},
+    )
+
+    assert (tmp_path / "report.pdf").stat().st_size > 0
+    # The caller's summary isn't reordered
+    pd.testing.assert_frame_equal(df, original)
+    assert f"Chart '{chart_path('sysbench-multi.png')}' not found" in (
+        capsys.readouterr().out
+    )
+
+
+@pytest.mark.parametrize("save", [True, False])
+def test_report_omits_failed_charts(save, tmp_path, monkeypatch, capsys):
+    from pdf_report import generate_report
+
+    monkeypatch.chdir(tmp_path)
+    df = summary(tmp_path)
+    # A chart from an earlier run, which fails to render in this one
+    (tmp_path / chart_path("sysbench-multi.png")).write_bytes(png_chart(123, 45))
+    jobs = [
+        ChartJob("sysbench-single.png", png_chart, (100, 60)),
+        ChartJob("sysbench-multi.png", bad_chart, ("sysbench-multi",)),
+    ]
+
+    charts = render_jobs(jobs, workers=1, save=save)
+    generate_report(df, str(tmp_path), str(tmp_path / "report.pdf"), charts=charts)
+
+    pdf = (tmp_path / "report.pdf").read_bytes()
+    assert b"/Width 100" in pdf
+    assert b"/Width 123" not in pdf
+    assert f"Chart '{chart_path('sysbench-multi.png')}' not found" in (
+        capsys.readouterr().out
+    )
@@ -0,0 +1,269 @@
+"""
+Look up prices against a stub of the price API, from the command line with
+'get_instance_price.py --batch' and through the price cache.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from conftest import BENCHMARK_DIR
+
+import aggregate_results
+import get_instance_price
+from benchmark_registry import selected_benchmarks, summary_columns
+from get_instance_price import NO_PRICE, get_prices
+from price_cache import PriceCache
+
+# Prices by (provider, region, instance type); other instances have no price
+PRICES = {
+    ("AWS", "eu-west-1", "m5.large"): 0.107,
+    ("AWS", "eu-west-1", "c5.xlarge"): 0.192,
+    ("AWS", "us-east-1", "m5.large"): 0.096,
+    ("GOOGLE", "europe-west2", "n2-standard-2"): 0.1127,
+}
+
+SUMMARY_LINES = [
+    "GOOGLE, n2-standard-2, europe-west2, Intel Xeon, 2, 8, 100\n",
+    "AWS, m5.large, us-east-1, Intel Xeon, 2, 8, 100\n",
+    "AWS, m5.large, eu-west-1, Intel Xeon, 2, 8, 100\n",
+    "AWS, m5.large, eu-west-1, Intel Xeon, 2, 8, 101\n",
+    "AWS, t2.nano, eu-west-1, Intel Xeon, 1, 0.5, 50\n",
+    "AWS, c5.xlarge, eu-west-1, Intel Xeon, 4, 8, 200\n",
+    "GOOGLE, n2-standard-2, europe-west2, Intel Xeon, 2, 8, 99\n",
+    "incomplete line\n",
+]
+
+
+class PriceServer(HTTPServer):
+    requests: List[Tuple[str, str, str]]
+    prices: Dict[Tuple[str, str, str], float]
+    delay: float
+
+
+class PriceHandler(BaseHTTPRequestHandler):
+    server: PriceServer
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        key = (query["providers"][0], query["region"][0], query["instanceType"][0])
+        self.server.requests.append(key)
+        time.sleep(self.server.delay)
+        items = (
+            [{"price": {"currency": "USD", "value": self.server.prices[key]}}]
+            if url.path == "/api/cloudInfo/instanceTypePrices"
+            and key in self.server.prices
+            else []
+        )
+        body = json.dumps({"items": items}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def price_server():
+    server = PriceServer(("127.0.0.1", 0), PriceHandler)
+    server.requests = []
+    server.prices = dict(PRICES)
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_batch(server: PriceServer, lines: List[str]) -> Dict[Tuple[str, ...], str]:
+    """
+    Run a batch lookup, returning the printed price of each instance.
+    """
+    env = dict(
+        os.environ,
+        YD_API_URL=f"http://127.0.0.1:{server.server_address[1]}/api",
+        PRICE_CACHE_FILE="",
+        # One worker, so that the requests are made in order
+        PRICE_LOOKUP_WORKERS="1",
+    )
+    output = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "get_instance_price.py")]
+        + ["--batch"],
+        input="".join(lines),
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    prices = {}
+    for line in output.splitlines():
+        provider, instance_type, region, price = line.split("\t")
+        prices[(provider, instance_type, region)] = price
+    return prices
+
+
+def test_batch_prices(price_server):
+    prices = run_batch(price_server, SUMMARY_LINES)
+
+    assert prices == {
+        ("GOOGLE", "n2-standard-2", "europe-west2"): "USD 0.1127",
+        ("AWS", "m5.large", "us-east-1"): "USD 0.096",
+        ("AWS", "m5.large", "eu-west-1"): "USD 0.107",
+        ("AWS", "t2.nano", "eu-west-1"): "No price found",
+        ("AWS", "c5.xlarge", "eu-west-1"): "USD 0.192",
+    }
+    # Printed in the order the instances were first seen
+    assert list(prices) == [
+        ("GOOGLE", "n2-standard-2", "europe-west2"),
+        ("AWS", "m5.large", "us-east-1"),
+        ("AWS", "m5.large", "eu-west-1"),
+        ("AWS", "t2.nano", "eu-west-1"),
+        ("AWS", "c5.xlarge", "eu-west-1"),
+    ]
+
+
+def test_batch_requests_deduplicated_and_grouped(price_server):
+    run_batch(price_server, SUMMARY_LINES)
+
+    # One request per instance, grouped by provider/region
+    assert price_server.requests == [
+        ("AWS", "eu-west-1", "m5.large"),
+        ("AWS", "eu-west-1", "t2.nano"),
+        ("AWS", "eu-west-1", "c5.xlarge"),
+        ("AWS", "us-east-1", "m5.large"),
+        ("GOOGLE", "europe-west2", "n2-standard-2"),
+    ]
+
+
+def test_single_price(price_server):
+    env = dict(
+        os.environ,
+        YD_API_URL=f"http://127.0.0.1:{price_server.server_address[1]}/api",
+        PRICE_CACHE_FILE="",
+    )
+    output = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "get_instance_price.py")]
+        + ["AWS", "us-east-1", "m5.large"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert output == "USD 0.096\n"
+    assert price_server.requests == [("AWS", "us-east-1", "m5.large")]
+
+
+@pytest.fixture
+def stub_api(price_server, monkeypatch):
+    monkeypatch.setattr(
+        get_instance_price,
+        "PRICES_URL",
+        f"http://127.0.0.1:{price_server.server_address[1]}"
+        "/api/cloudInfo/instanceTypePrices",
+    )
+    return price_server
+
+
+INSTANCES = [("AWS", "eu-west-1", "m5.large"), ("AWS", "eu-west-1", "t2.nano")]
+
+
+def test_no_price_cached(stub_api, tmp_path):
+    with PriceCache(str(tmp_path / "prices.sqlite")) as cache:
+        first = get_prices(INSTANCES, cache=cache)
+        second = get_prices(INSTANCES, cache=cache)
+
+    assert first == second == {INSTANCES[0]: "USD 0.107", INSTANCES[1]: NO_PRICE}
+    assert sorted(stub_api.requests) == INSTANCES
+
+
+def test_no_price_expires(stub_api, tmp_path):
+    with PriceCache(str(tmp_path / "prices.sqlite"), negative_ttl=0) as cache:
+        get_prices(INSTANCES, cache=cache)
+        stub_api.prices[INSTANCES[1]] = 0.0058
+        prices = get_prices(INSTANCES, cache=cache)
+
+    assert prices == {INSTANCES[0]: "USD 0.107", INSTANCES[1]: "USD 0.0058"}
+    assert sorted(stub_api.requests) == sorted(INSTANCES + [INSTANCES[1]])
+
+
+def test_failed_lookup_not_cached(stub_api, tmp_path, monkeypatch):
+    with PriceCache(str(tmp_path / "prices.sqlite")) as cache:
+        with monkeypatch.context() as m:
+            m.setattr(get_instance_price, "PRICES_URL", "http://127.0.0.1:9/")
+            assert get_prices(INSTANCES, cache=cache) == {
+                INSTANCES[0]: NO_PRICE,
+                INSTANCES[1]: NO_PRICE,
+            }
+        prices = get_prices(INSTANCES, cache=cache)
+
+    assert prices == {INSTANCES[0]: "USD 0.107", INSTANCES[1]: NO_PRICE}
+    assert sorted(stub_api.requests) == INSTANCES
+
+
+def test_revalidation_in_background(stub_api, tmp_path):
+    filename = str(tmp_path / "prices.sqlite")
+    with PriceCache(filename) as cache:
+        get_prices(INSTANCES[:1], cache=cache)
+
+    stub_api.prices[INSTANCES[0]] = 0.115
+    stub_api.delay = 1.0
+    cache = PriceCache(filename, ttl=0)
+    start = time.perf_counter()
+    prices = get_prices(INSTANCES[:1], cache=cache)
+    # The expired price is returned without waiting for the refresh
+    assert time.perf_counter() - start < stub_api.delay
+    assert prices == {INSTANCES[0]: "USD 0.107"}
+    cache.close(wait=5.0)
+
+    # Closing the cache can wait for the refreshed price to be stored
+    with PriceCache(filename) as cache:
+        assert cache.get((*INSTANCES[0], "ON_DEMAND")).price == "USD 0.115"
+    assert stub_api.requests == INSTANCES[:1] * 2
+
+
+def test_summary_not_held_up_by_revalidation(stub_api, tmp_path, monkeypatch):
+    filename = str(tmp_path / "prices.sqlite")
+    with PriceCache(filename) as cache:
+        get_prices(INSTANCES[:1], cache=cache)
+    root = tmp_path / "wr"
+    (root / "task1").mkdir(parents=True)
+    columns = summary_columns(selected_benchmarks())
+    (root / "task1" / "summary.txt").write_text(
+        ", ".join(["AWS", "m5.large", "eu-west-1"] + ["1"] * (len(columns) - 3))
+    )
+    caches = []
+
+    def open_cache():
+        caches.append(PriceCache(filename, ttl=0))
+        return caches[-1]
+
+    monkeypatch.setattr(aggregate_results, "open_cache", open_cache)
+    monkeypatch.setattr(
+        sys, "argv", ["aggregate_results.py", str(root), str(tmp_path / "out.csv")]
+    )
+    stub_api.delay = 3.0
+    start = time.perf_counter()
+    aggregate_results.main()
+
+    # The summary uses the expired price without waiting for the refresh
+    assert time.perf_counter() - start < 2.0
+    assert "USD 0.107" in (tmp_path / "out.csv").read_text()
+    # The refresh gives up, and stores nothing in the closed cache
+    for thread in caches[0]._background:
+        thread.join(get_instance_price.REVALIDATE_TIMEOUT + 1.0)
+        assert not thread.is_alive()
+    with PriceCache(filename, ttl=0) as cache:
+        assert cache.get((*INSTANCES[0], "ON_DEMAND")).price == "USD 0.107"
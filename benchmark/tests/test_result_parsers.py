@@ -0,0 +1,350 @@
+"""
+Parse the captured benchmark outputs in 'fixtures', one '<test>_out.txt' file
+for each test in 'result_parsers.PARSERS'.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BENCHMARK_DIR
+
+import result_parsers
+from result_parsers import (
+    PARSERS,
+    ParseError,
+    append_record,
+    load_records,
+    parse_output,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SYSBENCH_VERSION = "sysbench 1.0.20 (using system LuaJIT 2.1.0-beta3)"
+COREMARK_FLAGS = "-O2 -DPERFORMANCE_RUN=1  -lrt"
+NUMPY_METADATA = {
+    "numpy_version": "2.4.6",
+    "blas_library": "scipy-openblas 0.3.31.188.0",
+}
+
+# A selection of the metrics, and all of the metadata, of each fixture
+EXPECTED = {
+    "sysbench-singlecore": (
+        {
+            "events_per_second": 120.72,
+            "total_time_s": 10.0071,
+            "total_events": 1208,
+            "latency_p95_ms": 8.43,
+            "thread_events_stddev": 0,
+        },
+        {"version": SYSBENCH_VERSION, "threads": 1},
+    ),
+    "sysbench-multicore": (
+        {
+            "events_per_second": 239.87,
+            "latency_max_ms": 12.37,
+            "thread_events_avg": 1200,
+        },
+        {"version": SYSBENCH_VERSION, "threads": 2},
+    ),
+    "sysbench-scaling": (
+        {"events_per_second_1t": 120.51, "events_per_second_2t": 239.87},
+        {"version": SYSBENCH_VERSION, "threads": [1, 2]},
+    ),
+    "sysbench-memory": (
+        {
+            "operations_per_second": 12458.02,
+            "total_operations": 10240,
+            "mib_per_second": 12458.02,
+            "transferred_mib": 10240,
+        },
+        {"version": SYSBENCH_VERSION, "threads": 2},
+    ),
+    "sysbench-storage": (
+        {
+            "reads_per_second": 1516.41,
+            "writes_per_second": 1010.94,
+            "fsyncs_per_second": 3240.19,
+            "read_mib_per_second": 23.69,
+            "written_mib_per_second": 15.8,
+            "latency_p95_ms": 1.21,
+        },
+        {"version": SYSBENCH_VERSION, "threads": 2},
+    ),
+    "sysbench-storage-matrix": (
+        {
+            "rndrd-buffered_4kib_1t_iops": 9120.55,
+            "rndrd-buffered_4kib_1t_mib_s": 35.63,
+            "rndrd-buffered_4kib_1t_p95_ms": 0.15,
+            "rndrd-buffered_4kib_2t_iops": 15871.3,
+            "rndwr-buffered_4kib_1t_iops": 3412.77,
+            "rndwr-buffered_4kib_1t_mib_s": 13.33,
+        },
+        {"version": SYSBENCH_VERSION, "file_total_size": "2G", "run_time": "10"},
+    ),
+    "mysql-tpcc": (
+        {
+            "transactions": 93610,
+            "transactions_per_second": 155.93,
+            "queries_per_second": 4435.83,
+            "ignored_errors": 406,
+            "reconnects_per_second": 0,
+            "latency_p95_ms": 92.42,
+        },
+        {"version": SYSBENCH_VERSION, "threads": 8},
+    ),
+    "coremark-singlecore": (
+        {
+            "score": 26917.900404,
+            "iterations_per_second": 26917.900404,
+            "iterations": 400000,
+            "total_ticks": 14860,
+            "total_time_s": 14.86,
+        },
+        {
+            "validated": True,
+            "threads": 1,
+            "size": "666",
+            "compiler_version": "GCC11.4.0",
+            "compiler_flags": COREMARK_FLAGS,
+        },
+    ),
+    "coremark-multicore": (
+        {"score": 52966.101695, "iterations": 800000},
+        {
+            "validated": True,
+            "threads": 2,
+            "size": "666",
+            "compiler_version": "GCC11.4.0",
+            "compiler_flags": "-O2 -DMULTITHREAD=2 -DUSE_PTHREAD -pthread"
+            " -DPERFORMANCE_RUN=1  -lrt",
+        },
+    ),
+    "coremark-scaling": (
+        {"score_1t": 26917.900404, "score_2t": 52966.101695},
+        {
+            "validated": True,
+            "threads": [1, 2],
+            "size": "666",
+            "compiler_version": "GCC11.4.0",
+            "compiler_flags": COREMARK_FLAGS,
+        },
+    ),
+    "coremark-pro": (
+        {
+            "multi_core": 18012.12,
+            "single_core": 5046.95,
+            "scaling": 3.57,
+            "cjpeg-rose7-preset_multi_core": 555.56,
+            "zip-test_single_core": 125,
+            "core_scaling": 3.95,
+        },
+        {},
+    ),
+    "linpack-singlecore": (
+        {
+            "mflops": 2886.038951,
+            "factor_s": 0.028655,
+            "solve_s": 0.000393,
+            "total_s": 0.029048,
+            "cray_ratio": 0.518712,
+            "normalised_residual": 4.930061,
+        },
+        {"n": 500, "threads": 1},
+    ),
+    "linpack-multicore": (
+        {"mflops": 4367.098016, "total_s": 0.019197},
+        {"n": 500, "threads": 2},
+    ),
+    "numpy-linalg-singlecore": (
+        {"mflops": 10569.466907, "total_s": 0.007932, "normalised_residual": 3.008007},
+        {"n": 500, "threads": 1, **NUMPY_METADATA},
+    ),
+    "numpy-linalg-multicore": (
+        {"mflops": 13768.241141, "total_s": 0.006089},
+        {"n": 500, "threads": 2, **NUMPY_METADATA},
+    ),
+    "stream": (
+        {
+            "copy_mb_s": 11079.2,
+            "scale_mb_s": 11797.3,
+            "add_mb_s": 13699.2,
+            "triad_mb_s": 14764.5,
+            "latency_ns_4kib": 2.2,
+            "latency_ns_2048kib": 23.9,
+            "l1_latency_ns": 2.2,
+            "dram_latency_ns": 147.38,
+        },
+        {"validated": True, "array_size": 2000000, "threads": 2},
+    ),
+}
+
+# The metric whose absence makes the output of each test unparseable
+REQUIRED = {
+    "sysbench-singlecore": "events_per_second",
+    "sysbench-multicore": "events_per_second",
+    "sysbench-scaling": "events_per_second",
+    "sysbench-memory": "operations_per_second",
+    "sysbench-storage": "reads_per_second",
+    "sysbench-storage-matrix": "iops",
+    "mysql-tpcc": "transactions_per_second",
+    "coremark-singlecore": "score",
+    "coremark-multicore": "score",
+    "coremark-scaling": "score",
+    "coremark-pro": "multi_core",
+    "linpack-singlecore": "mflops",
+    "linpack-multicore": "mflops",
+    "numpy-linalg-singlecore": "mflops",
+    "numpy-linalg-multicore": "mflops",
+    "stream": "triad_mb_s",
+}
+
+
+def fixture(test: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{test}_out.txt")
+
+
+def test_every_parser_has_a_fixture():
+    assert set(EXPECTED) == set(REQUIRED) == set(PARSERS)
+    for test in PARSERS:
+        assert os.path.isfile(fixture(test))
+
+
+@pytest.mark.parametrize("test", sorted(PARSERS))
+def test_parse_fixture(test):
+    metrics, metadata = EXPECTED[test]
+
+    record = parse_output(test, 2, fixture(test))
+
+    assert "error" not in record
+    assert record["test"] == test
+    assert record["trial"] == 2
+    assert record["source"] == f"{test}_out.txt"
+    assert {name: record["metrics"].get(name) for name in metrics} == pytest.approx(
+        metrics
+    )
+    assert all(isinstance(value, float) for value in record["metrics"].values())
+    assert record["metadata"] == metadata
+
+
+@pytest.mark.parametrize("test", sorted(PARSERS))
+def test_missing_metric(test):
+    # Only the header written by 'benchmarks.sh', as if the benchmark failed
+    with open(fixture(test)) as f:
+        header = f.readline()
+
+    with pytest.raises(ParseError, match=REQUIRED[test]):
+        PARSERS[test](header)
+
+
+def test_thread_sweep_omits_failed_runs():
+    with open(fixture("sysbench-scaling")) as f:
+        text = f.read()
+    text += "\nThreads = 4\nFATAL: sysbench failed\n"
+
+    metrics, metadata = PARSERS["sysbench-scaling"](text)
+
+    assert set(metrics) == {"events_per_second_1t", "events_per_second_2t"}
+    assert metadata["threads"] == [1, 2, 4]
+
+
+def test_parse_output_missing_metric(tmp_path):
+    output_file = tmp_path / "stream-trial1_out.txt"
+    output_file.write_text("Instance Type = n2-standard-2\n\nSTREAM_BENCH\n")
+
+    record = parse_output("stream", 1, str(output_file))
+
+    assert record["error"] == "Required metric(s) not found: triad_mb_s"
+    assert record["metrics"] == {}
+
+
+def test_parse_output_malformed_numbers(tmp_path):
+    with open(fixture("linpack-multicore")) as f:
+        text = f.read()
+    text = text.replace("4.930061        0.000000", "nan        -nan")
+    text = text.replace(
+        "0.018980   0.000217   0.019197  4367.098016", "nan -nan garbage x"
+    )
+    output_file = tmp_path / "linpack-multicore-trial1_out.txt"
+    output_file.write_text(text)
+
+    record = parse_output("linpack-multicore", 1, str(output_file))
+
+    assert record["error"] == "Required metric(s) not found: mflops"
+    assert record["metrics"] == {}
+
+
+def test_script_records_malformed_output(tmp_path):
+    results_file = str(tmp_path / result_parsers.RESULTS_FILE)
+    output_file = tmp_path / "linpack-multicore-trial1_out.txt"
+    output_file.write_text(
+        "      Factor     Solve      Total     MFLOPS       Unit      Cray-Ratio\n\n"
+        "   nan -nan garbage x\n"
+    )
+
+    output = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "result_parsers.py")]
+        + [results_file, "linpack-multicore", "1", str(output_file), "mflops"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    assert output == "\n"
+    assert load_records(results_file)[0]["error"] == (
+        "Required metric(s) not found: mflops"
+    )
+
+
+def test_parse_output_unknown_test():
+    record = parse_output("no-such-test", 1, fixture("stream"))
+
+    assert record["error"] == "Unknown test 'no-such-test'"
+
+
+def test_parse_output_parser_key_error(monkeypatch):
+    # A bug in a parser isn't reported as an unknown test
+    def parser(text):
+        return {}, {}["missing"]
+
+    monkeypatch.setitem(PARSERS, "stream", parser)
+
+    with pytest.raises(KeyError):
+        parse_output("stream", 1, fixture("stream"))
+
+
+def test_parse_output_unreadable(tmp_path):
+    record = parse_output("stream", 1, str(tmp_path / "missing_out.txt"))
+
+    assert record["error"].startswith("Unable to read output:")
+
+
+def test_records_round_trip(tmp_path):
+    results_file = str(tmp_path / result_parsers.RESULTS_FILE)
+    records = [parse_output(test, 1, fixture(test)) for test in sorted(PARSERS)]
+    for record in records:
+        append_record(results_file, record)
+    with open(results_file, "a") as f:
+        f.write("{truncated\n")
+
+    assert load_records(results_file) == records
+
+
+def test_script_prints_metrics(tmp_path):
+    results_file = str(tmp_path / result_parsers.RESULTS_FILE)
+
+    output = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "result_parsers.py")]
+        + [results_file, "stream", "1", fixture("stream")]
+        + ["copy_mb_s", "no_such_metric", "triad_mb_s"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    assert output == "11079.2\n\n14764.5\n"
+    with open(results_file) as f:
+        assert json.loads(f.readline())["metrics"]["triad_mb_s"] == 14764.5
@@ -0,0 +1,91 @@
+"""
+Tests of the image handling of 'yellowdog_pdf.py'.
+"""
+
+import io
+import re
+
+import pytest
+from PIL import Image
+
+import yellowdog_pdf
+from yellowdog_pdf import YellowPDF, read_png
+
+
+def png_data(mode: str = "RGB") -> bytes:
+    image = Image.new(mode, (64, 32))
+    for x in range(64):
+        image.putpixel((x, x % 32), (255, 0, 0) if mode == "RGB" else (255, 0, 0, 128))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", dpi=(100, 100))
+    return buffer.getvalue()
+
+
+def build(images, tmp_path) -> bytes:
+    """
+    Print each image twice in a document without a header or footer,
+    returning the PDF file's contents.
+    """
+    pdf = YellowPDF(header_image=None, footer_image=None)
+    for image in images:
+        pdf.print_image(image)
+        pdf.print_image(image)
+    pdf_file = tmp_path / "report.pdf"
+    pdf.generate_pdf_file(str(pdf_file))
+    return pdf_file.read_bytes()
+
+
+def image_objects(pdf: bytes) -> int:
+    return len(re.findall(rb"/Subtype /Image", pdf))
+
+
+# The passthrough can only be tested with the fpdf2 version it supports
+PASSTHROUGH_MODES = [
+    pytest.param(
+        True,
+        marks=pytest.mark.skipif(
+            not yellowdog_pdf.PNG_PASSTHROUGH, reason="Unsupported fpdf2 version"
+        ),
+    ),
+    False,
+]
+
+
+@pytest.mark.parametrize("passthrough", PASSTHROUGH_MODES)
+def test_png_embedded_once(passthrough, tmp_path, monkeypatch):
+    monkeypatch.setattr(yellowdog_pdf, "PNG_PASSTHROUGH", passthrough)
+    data = png_data()
+
+    pdf = build([data], tmp_path)
+
+    assert image_objects(pdf) == 1
+    # The compressed pixel data is only embedded as is by the passthrough
+    assert (read_png(data).data in pdf) == passthrough
+
+
+def test_png_passthrough_fpdf_version():
+    assert yellowdog_pdf.PNG_PASSTHROUGH == yellowdog_pdf.FPDF_VERSION.startswith(
+        "2.7."
+    )
+
+
+@pytest.mark.parametrize("passthrough", PASSTHROUGH_MODES)
+def test_png_size_from_dpi(passthrough, monkeypatch):
+    monkeypatch.setattr(yellowdog_pdf, "PNG_PASSTHROUGH", passthrough)
+    pdf = YellowPDF(header_image=None, footer_image=None)
+
+    image = pdf._register_image(png_data())
+
+    # PNGs give their resolution in pixels per metre
+    assert image.width_mm == pytest.approx(64 / 100 * 25.4, rel=1e-4)
+    assert image.height_mm == pytest.approx(32 / 100 * 25.4, rel=1e-4)
+
+
+def test_transparent_png_decoded(tmp_path):
+    data = png_data("RGBA")
+
+    pdf = build([data], tmp_path)
+
+    # The image, and its transparency as a soft mask
+    assert image_objects(pdf) == 2
+    assert read_png(data).data not in pdf
@@ -0,0 +1,180 @@
+"""
+Statistics of repeated benchmark trials. Each instance's raw trial values are
+taken from the result records saved by 'benchmarks.sh' alongside its
+'summary.txt' (see 'result_parsers.py'). For each benchmark, the median, mean
+and standard deviation of the trials are computed, with a bootstrap confidence
+interval for the median. The bootstrap is vectorised with NumPy across all
+instances.
+"""
+
+from os import getenv
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# The number of bootstrap resamples, and the confidence level of the interval
+BOOTSTRAP_RESAMPLES = int(getenv("BOOTSTRAP_RESAMPLES", "2000"))
+CONFIDENCE_LEVEL = float(getenv("CONFIDENCE_LEVEL", "0.95"))
+
+# A fixed seed, so that the intervals (and the charts drawn from them) are
+# reproducible from the same trials
+BOOTSTRAP_SEED = 0
+
+# The maximum number of resampled values held in memory at once
+BOOTSTRAP_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def mean_column(column_title: str) -> str:
+    """
+    The name of the mean of the trials column for a benchmark.
+    """
+    return f"{column_title} Mean"
+
+
+def stddev_column(column_title: str) -> str:
+    """
+    The name of the standard deviation of the trials column for a benchmark.
+    """
+    return f"{column_title} Std Dev"
+
+
+def ci_low_column(column_title: str) -> str:
+    """
+    The name of the lower confidence bound column for a benchmark.
+    """
+    return f"{column_title} CI Low"
+
+
+def ci_high_column(column_title: str) -> str:
+    """
+    The name of the upper confidence bound column for a benchmark.
+    """
+    return f"{column_title} CI High"
+
+
+def trials_column(column_title: str) -> str:
+    """
+    The name of the number of trials column for a benchmark.
+    """
+    return f"{column_title} Trials"
+
+
+def trial_matrix(
+    trials: pd.DataFrame, column_title: str, index: pd.Index
+) -> np.ndarray:
+    """
+    Arrange the trials of a benchmark as an array with one row per instance
+    (in the order of 'index') and one column per trial. The trials must have
+    a 'row' column identifying their instance. Missing trials are NaN.
+    """
+    values = (
+        trials[trials["benchmark"] == column_title]
+        .groupby(["row", "trial"])["value"]
+        .first()
+        .unstack()
+        .reindex(index)
+    )
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def bootstrap_interval(
+    values: np.ndarray,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = CONFIDENCE_LEVEL,
+    seed: int = BOOTSTRAP_SEED,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The percentile bootstrap confidence interval of the median of each row of
+    'values', ignoring NaNs. Each row is resampled with replacement to its own
+    number of trials. Rows without any values have a NaN interval.
+    """
+    counts = np.count_nonzero(~np.isnan(values), axis=1)
+    low = np.full(len(values), np.nan)
+    high = np.full(len(values), np.nan)
+    if values.shape[1] == 0:
+        return low, high
+
+    # Sorting moves the NaNs to the end of each row, so that a row's values
+    # occupy its first 'count' positions
+    ordered = np.sort(values, axis=1)
+    width = ordered.shape[1]
+    rng = np.random.default_rng(seed)
+    tail = (1 - confidence) / 2
+    valid = np.flatnonzero(counts > 0)
+    block = max(1, BOOTSTRAP_BLOCK_SIZE // (resamples * width))
+    for start in range(0, len(valid), block):
+        rows = valid[start : start + block]
+        n = counts[rows][:, np.newaxis, np.newaxis]
+        positions = (rng.random((len(rows), resamples, width)) * n).astype(np.intp)
+        samples = np.take_along_axis(ordered[rows][:, np.newaxis, :], positions, axis=2)
+        # Each resample draws 'count' values, so the positions beyond that
+        # are ignored: sort them to the end, and take the median of the rest
+        samples = np.sort(np.where(np.arange(width) < n, samples, np.inf), axis=2)
+        medians = (
+            np.take_along_axis(samples, (n - 1) // 2, axis=2)
+            + np.take_along_axis(samples, n // 2, axis=2)
+        )[:, :, 0] / 2
+        low[rows], high[rows] = np.quantile(medians, [tail, 1 - tail], axis=1)
+    return low, high
+
+
+def add_trial_statistics(
+    df: pd.DataFrame, trials: pd.DataFrame, benchmark_headers: List[str]
+) -> pd.DataFrame:
+    """
+    Add the mean, standard deviation, confidence interval and number of trials
+    columns for each benchmark, from the trials of each instance. The trials
+    must have a 'row' column holding the index of their instance in 'df'.
+    Where an instance has trials, its benchmark score is set to their median;
+    otherwise, its score is left as it is. Return the DataFrame with the new
+    columns, which are joined at once rather than inserted one by one.
+    """
+    statistics = {}
+    for column in benchmark_headers:
+        values = trial_matrix(trials, column, df.index)
+        counts = np.count_nonzero(~np.isnan(values), axis=1)
+        has_trials = counts > 0
+        median = np.full(len(df), np.nan)
+        mean = np.full(len(df), np.nan)
+        stddev = np.full(len(df), np.nan)
+        median[has_trials] = np.nanmedian(values[has_trials], axis=1)
+        mean[has_trials] = np.nanmean(values[has_trials], axis=1)
+        repeated = counts > 1
+        stddev[repeated] = np.nanstd(values[repeated], axis=1, ddof=1)
+        low, high = bootstrap_interval(values)
+
+        df[column] = df[column].where(~has_trials, median)
+        statistics[mean_column(column)] = mean
+        statistics[stddev_column(column)] = stddev
+        statistics[ci_low_column(column)] = low
+        statistics[ci_high_column(column)] = high
+        statistics[trials_column(column)] = pd.array(counts, dtype="Int32")
+    return pd.concat([df, pd.DataFrame(statistics, index=df.index)], axis=1)
+
+
+def has_intervals(df: pd.DataFrame, column_title: str) -> bool:
+    """
+    Whether any instance has a confidence interval for a benchmark.
+    """
+    return ci_low_column(column_title) in df and bool(
+        df[ci_low_column(column_title)].notna().any()
+    )
+
+
+def significant_lead(df: pd.DataFrame, column_title: str) -> bool:
+    """
+    Whether the best score for a benchmark leads the runner-up significantly,
+    i.e., their confidence intervals don't overlap. Leads without confidence
+    intervals to compare are treated as significant.
+    """
+    if not has_intervals(df, column_title):
+        return True
+    leaders = df[column_title].nlargest(2).index
+    if len(leaders) < 2:
+        return True
+    best_low = df.at[leaders[0], ci_low_column(column_title)]
+    runner_up_high = df.at[leaders[1], ci_high_column(column_title)]
+    if pd.isna(best_low) or pd.isna(runner_up_high):
+        return True
+    return bool(best_low > runner_up_high)
@@ -1,12 +1,32 @@
 """
 Class for generating YellowDog PDF reports. Subclass of FPDF.
+
+Images are printed from files, or from their data held in memory. They are
+kept in a registry keyed by path and modification time, or by the hash of
+their data, so that each distinct image is read and embedded once, however
+many times it's printed (e.g., the header and footer on every page). The
+dimensions of PNG images are read from their headers, and the compressed
+pixel data of non-transparent, non-interlaced PNGs of up to 8 bits per
+channel is embedded as is, without decoding and recompressing it, by adding
+the image to FPDF's internal image information. This is only done with the
+fpdf2 version whose internal layout it matches (2.7). Other images,
+including RGBA PNGs, and all images with other fpdf2 versions, are decoded
+by FPDF. SVG images are drawn as vector paths, sized from the 'width' and
+'height' attributes of their root element. FPDF copies each SVG group's
+contents into its parent group, so the groups that only name their contents
+(as matplotlib wraps each artist) are unwrapped first.
 """
 
+import hashlib
+import io
+import re
+import struct
+import zlib
 from os import path
-from typing import Tuple
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+from xml.etree import ElementTree
 
-from fpdf import FPDF
-from PIL import Image
+from fpdf import FPDF, FPDF_VERSION
 
 # Constants
 # Note: A4 paper is 210 x 297 mm
@@ -30,6 +50,188 @@ FONT_FAMILY_FIXED = "Courier"
 TEXT_COLOUR_DEFAULT: Tuple[int, int, int] = (69, 67, 96)
 LINE_COLOUR_DEFAULT: Tuple[int, int, int] = (247, 171, 52)
 
+# The resolution assumed for images that don't specify one
+DEFAULT_DPI: float = 300
+MM_PER_INCH: float = 25.4
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG colour types that can be embedded without decoding: greyscale, RGB and
+# palette, with the PDF colour space and the number of colour components
+PNG_COLOUR_SPACES: Dict[int, Tuple[str, int]] = {
+    0: ("DeviceGray", 1),
+    2: ("DeviceRGB", 3),
+    3: ("Indexed", 1),
+}
+
+# Whether PNGs can be embedded without decoding, by writing FPDF's internal
+# image information, whose layout is that of fpdf2 2.7
+PNG_PASSTHROUGH: bool = FPDF_VERSION.split(".")[:2] == ["2", "7"]
+
+
+# The size of each SVG length unit in mm; unitless lengths are in pixels
+SVG_UNITS_MM: Dict[str, float] = {
+    "": MM_PER_INCH / 96,
+    "px": MM_PER_INCH / 96,
+    "pt": MM_PER_INCH / 72,
+    "pc": MM_PER_INCH / 6,
+    "in": MM_PER_INCH,
+    "cm": 10,
+    "mm": 1,
+}
+
+SVG_LENGTH = re.compile(r"^\s*([0-9.eE+-]+)\s*([a-z]*)\s*$")
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+SVG_GROUP = f"{{{SVG_NAMESPACE}}}g"
+
+# Serialise SVG images without namespace prefixes on their elements, which
+# FPDF doesn't recognise as SVG
+ElementTree.register_namespace("", SVG_NAMESPACE)
+ElementTree.register_namespace("xlink", XLINK_NAMESPACE)
+
+
+class PNGImage(NamedTuple):
+    """
+    The header fields and chunks of a PNG image, with its pixel data still
+    compressed.
+    """
+
+    width: int
+    height: int
+    bit_depth: int
+    colour_type: int
+    interlaced: bool
+    dpi: Optional[Tuple[float, float]]
+    palette: Optional[bytes]
+    icc_profile: Optional[bytes]
+    transparency: bool
+    data: bytes
+
+    @property
+    def passthrough(self) -> bool:
+        """
+        Whether the compressed pixel data can be embedded in a PDF as is.
+        """
+        return (
+            self.colour_type in PNG_COLOUR_SPACES
+            and self.bit_depth <= 8
+            and not self.interlaced
+            and not self.transparency
+        )
+
+
+class RegisteredImage(NamedTuple):
+    """
+    An image embedded in a document: its name in the document's images, and
+    its natural size in mm. SVG images aren't held in the document's images,
+    but drawn from their data each time they're printed.
+    """
+
+    name: str
+    width_mm: float
+    height_mm: float
+    svg: Optional[bytes] = None
+
+    @property
+    def source(self):
+        """
+        The image as passed to FPDF.image().
+        """
+        return self.name if self.svg is None else io.BytesIO(self.svg)
+
+
+def read_png(data: bytes) -> Optional[PNGImage]:
+    """
+    Parse the chunks of a PNG image, without decompressing its pixel data.
+    Return None if the data isn't a PNG image.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+    chunks: Dict[bytes, bytes] = {}
+    pixel_data = []
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position : position + 8])
+        chunk = data[position + 8 : position + 8 + length]
+        if chunk_type == b"IDAT":
+            pixel_data.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+        else:
+            chunks.setdefault(chunk_type, chunk)
+        position += length + 12
+
+    width, height, bit_depth, colour_type, _, _, interlace = struct.unpack(
+        ">IIBBBBB", chunks[b"IHDR"]
+    )
+    dpi = None
+    if b"pHYs" in chunks:
+        x_density, y_density, unit = struct.unpack(">IIB", chunks[b"pHYs"])
+        if unit == 1 and x_density > 0 and y_density > 0:  # Pixels per metre
+            dpi = (x_density * MM_PER_INCH / 1000, y_density * MM_PER_INCH / 1000)
+    icc_profile = None
+    if b"iCCP" in chunks:
+        # Profile name, null separator, compression method, then the profile
+        profile = chunks[b"iCCP"]
+        icc_profile = zlib.decompress(profile[profile.index(b"\0") + 2 :])
+    return PNGImage(
+        width=width,
+        height=height,
+        bit_depth=bit_depth,
+        colour_type=colour_type,
+        interlaced=interlace != 0,
+        dpi=dpi,
+        palette=chunks.get(b"PLTE"),
+        icc_profile=icc_profile,
+        transparency=b"tRNS" in chunks,
+        data=b"".join(pixel_data),
+    )
+
+
+def svg_size_mm(data: bytes) -> Optional[Tuple[float, float]]:
+    """
+    The size of an SVG image in mm, from the 'width' and 'height' attributes
+    of its root element. Return None if the data isn't an SVG image, or
+    doesn't specify an absolute size.
+    """
+    try:
+        _, root = next(ElementTree.iterparse(io.BytesIO(data), events=("start",)))
+    except (ElementTree.ParseError, StopIteration):
+        return None
+    if root.tag.rpartition("}")[2] != "svg":
+        return None
+    size = []
+    for attribute in ("width", "height"):
+        match = SVG_LENGTH.match(root.get(attribute, ""))
+        if match is None or match.group(2) not in SVG_UNITS_MM:
+            return None
+        size.append(float(match.group(1)) * SVG_UNITS_MM[match.group(2)])
+    return size[0], size[1]
+
+
+def flatten_svg(data: bytes) -> bytes:
+    """
+    Unwrap the groups of an SVG image that have no attributes other than an
+    'id', moving their children into the enclosing element. The image is
+    drawn the same, but FPDF copies fewer nested groups.
+    """
+
+    def flatten(element: ElementTree.Element):
+        children = []
+        for child in element:
+            flatten(child)
+            if child.tag == SVG_GROUP and set(child.attrib) <= {"id"}:
+                children.extend(child)
+            else:
+                children.append(child)
+        element[:] = children
+
+    root = ElementTree.fromstring(data)
+    flatten(root)
+    return ElementTree.tostring(root)
+
 
 class YellowPDF(FPDF):
     """
@@ -55,24 +257,22 @@ class YellowPDF(FPDF):
             fonts_directory (str, optional): Where to find the locally
                 supplied fonts.
         """
+        super().__init__(orientation="P", unit="mm", format="A4")
+        self._image_registry: Dict[str, RegisteredImage] = {}
+
+        self._header_image: Optional[RegisteredImage] = None
+        self._top_margin_cached = TOP_GUTTER
         if header_image is not None:
-            self._header_image: Image = Image.open(header_image)
-            _, height_mm = self._image_dimensions_mm(self._header_image)
-            self._top_margin_cached = height_mm + TOP_GUTTER + TOP_SPACER
-        else:
-            self._header_image = None
-            self._top_margin_cached = TOP_GUTTER
+            self._header_image = self._register_image(header_image)
+            self._top_margin_cached += self._header_image.height_mm + TOP_SPACER
 
+        self._footer_image: Optional[RegisteredImage] = None
+        self._bottom_margin_cached = BOTTOM_GUTTER
         if footer_image is not None:
-            self._footer_image: Image = Image.open(footer_image)
-            _, height_mm = self._image_dimensions_mm(self._footer_image)
-            self._bottom_margin_cached = height_mm + BOTTOM_GUTTER + BOTTOM_SPACER
-        else:
-            self._footer_image = None
-            self._bottom_margin_cached = BOTTOM_GUTTER
+            self._footer_image = self._register_image(footer_image)
+            self._bottom_margin_cached += self._footer_image.height_mm + BOTTOM_SPACER
 
         self._fonts_directory = fonts_directory
-        super().__init__(orientation="P", unit="mm", format="A4")
         self.add_page()
         self.t_margin = self._top_margin_cached
         self.b_margin = self._bottom_margin_cached
@@ -85,7 +285,7 @@ class YellowPDF(FPDF):
         This sets up the document header. This is done automatically.
         """
         if self._header_image is not None:
-            self.image(self._header_image, x=LEFT_MARGIN, y=TOP_GUTTER, w=WIDTH)
+            self.image(self._header_image.source, x=LEFT_MARGIN, y=TOP_GUTTER, w=WIDTH)
 
     def footer(self):
         """
@@ -93,7 +293,7 @@ class YellowPDF(FPDF):
         """
         if self._footer_image is not None:
             self.image(
-                self._footer_image,
+                self._footer_image.source,
                 x=LEFT_MARGIN,
                 y=A4_HEIGHT - self._bottom_margin_cached,
                 w=WIDTH,
@@ -366,7 +566,7 @@ class YellowPDF(FPDF):
 
     def print_image(
         self,
-        image_file: str,
+        image_file: Union[str, bytes],
         expand: bool = False,
         before: float = 2.0,
         after: float = 2.0,
@@ -377,7 +577,8 @@ class YellowPDF(FPDF):
         Print an image.
 
         Args:
-            image_file (str): The file containing the image.
+            image_file (str | bytes): The file containing the image, or the
+                image's data.
             expand (bool, optional): Whether to expand images to fit the
                 available page width.
             before (float, optional): The vertical space to leave before printing
@@ -389,8 +590,8 @@ class YellowPDF(FPDF):
                 the available width: "L", "C" or "R". 'indent' will be respected.
         """
 
-        image = Image.open(image_file)
-        width_mm, _ = self._image_dimensions_mm(image)
+        image = self._register_image(image_file)
+        width_mm = image.width_mm
 
         self.set_y(self.y + before)
 
@@ -401,10 +602,10 @@ class YellowPDF(FPDF):
                 x_position = A4_WIDTH - RIGHT_MARGIN - width_mm
             else:  # "L" is the default
                 x_position = LEFT_MARGIN + indent
-            self.image(image, x=int(x_position), w=int(width_mm))
+            self.image(image.source, x=int(x_position), w=int(width_mm))
         else:
             x_position = LEFT_MARGIN + indent
-            self.image(image, x=int(x_position), w=int(WIDTH - indent))
+            self.image(image.source, x=int(x_position), w=int(WIDTH - indent))
 
         self.set_y(self.y + after)
 
@@ -480,6 +681,115 @@ class YellowPDF(FPDF):
         """
         self.output(filename)
 
+    def _register_image(self, image_file: Union[str, bytes]) -> RegisteredImage:
+        """
+        Add an image to the document's images, if it isn't already there.
+
+        Args:
+            image_file (str | bytes): The file containing the image, or the
+                image's data.
+
+        Returns:
+            RegisteredImage: The image's name in the document, and its size.
+        """
+        if isinstance(image_file, bytes):
+            key = hashlib.sha256(image_file).hexdigest()
+        else:
+            key = f"{path.abspath(image_file)}:{path.getmtime(image_file)}"
+        if key in self._image_registry:
+            return self._image_registry[key]
+
+        if isinstance(image_file, bytes):
+            data = image_file
+        else:
+            with open(image_file, "rb") as f:
+                data = f.read()
+
+        svg_size = svg_size_mm(data) if not data.startswith(PNG_SIGNATURE) else None
+        if svg_size is not None:
+            registered = RegisteredImage(
+                name=key,
+                width_mm=svg_size[0],
+                height_mm=svg_size[1],
+                svg=flatten_svg(data),
+            )
+            self._image_registry[key] = registered
+            return registered
+
+        png = read_png(data)
+        if PNG_PASSTHROUGH and png is not None and png.passthrough:
+            name = key
+            # Relies on the internals of fpdf2 2.7, hence the PNG_PASSTHROUGH gate
+            self.images[name] = self._png_image_info(png)
+            size, dpi = (png.width, png.height), png.dpi
+        else:
+            # FPDF decodes the image, keyed by the hash of its data
+            name, _, info = self.preload_image(io.BytesIO(data))
+            size = (info["w"], info["h"])
+            dpi = png.dpi if png is not None else self._pil_dpi(data)
+
+        dpi_x, dpi_y = dpi if dpi is not None else (DEFAULT_DPI, DEFAULT_DPI)
+        registered = RegisteredImage(
+            name=name,
+            width_mm=size[0] / (dpi_x / MM_PER_INCH),
+            height_mm=size[1] / (dpi_y / MM_PER_INCH),
+        )
+        self._image_registry[key] = registered
+        return registered
+
+    def _png_image_info(self, png: PNGImage) -> dict:
+        """
+        The FPDF image information for a PNG image whose compressed pixel data
+        can be embedded as is: the PNG's scanline filters are undone by the
+        PDF viewer, using the PNG predictor. Only used with fpdf2 2.7 (see
+        PNG_PASSTHROUGH).
+
+        Args:
+            png (PNGImage): The PNG image.
+
+        Returns:
+            dict: The image information, as FPDF stores it.
+        """
+        colour_space, colours = PNG_COLOUR_SPACES[png.colour_type]
+        info = {
+            "data": png.data,
+            "w": png.width,
+            "h": png.height,
+            "cs": colour_space,
+            "iccp": None,
+            "iccp_i": None,
+            "dpn": colours,
+            "bpc": png.bit_depth,
+            "f": "FlateDecode",
+            "dp": f"/Predictor 15 /Colors {colours} /Columns {png.width}",
+            "i": len(self.images) + 1,
+            "usages": 0,
+        }
+        if png.palette is not None:
+            info["pal"] = png.palette
+        if png.icc_profile is not None and colour_space != "Indexed":
+            info["iccp_i"] = self.icc_profiles.setdefault(
+                png.icc_profile, len(self.icc_profiles)
+            )
+        return info
+
+    @staticmethod
+    def _pil_dpi(data: bytes) -> Optional[Tuple[float, float]]:
+        """
+        The resolution of a non-PNG image, if it specifies one. PIL only reads
+        the image's header.
+
+        Args:
+            data (bytes): The image file's contents.
+
+        Returns:
+            (float, float): The horizontal and vertical resolution in dpi.
+        """
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as image:
+            return image.info.get("dpi")
+
     def _set_text_colour(self, colour: Tuple[int, int, int]):
         """
         Set the text colour.
@@ -552,22 +862,3 @@ class YellowPDF(FPDF):
                 a 'multi_cell', in mm.
         """
         return int(font_size / 2.0)
-
-    @staticmethod
-    def _image_dimensions_mm(image: Image):
-        """Determine the width and height of a PIL image in mm.
-
-        Args:
-            image (Image): The PIL image object.
-
-        Returns:
-            (float, float): The width and height in mm.
-        """
-        try:
-            dpi_x, dpi_y = image.info["dpi"]
-        except KeyError:
-            dpi_x = dpi_y = 300
-        mm_in_inch = 25.4
-        width_mm = image.width / (dpi_x / mm_in_inch)
-        height_mm = image.height / (dpi_y / mm_in_inch)
-        return width_mm, height_mm